@@ -0,0 +1,147 @@
+"""
+Importing and exporting courses as .tar.gz files.
+
+These are used both by the import and export views, which do the work within
+the request, and by the tasks in contentstore.tasks, which do it in the
+background.
+"""
+import logging
+import os
+import tarfile
+import shutil
+from tempfile import mkdtemp
+from path import path
+
+from django.conf import settings
+
+from auth.authz import create_all_course_groups
+
+from xmodule.modulestore.xml_importer import import_from_xml
+from xmodule.contentstore.django import contentstore
+from xmodule.modulestore.xml_exporter import export_to_xml
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore import Location
+
+log = logging.getLogger(__name__)
+
+
+class CourseImportError(Exception):
+    """
+    The uploaded course can't be imported.  The message is shown to the user.
+    """
+    pass
+
+
+def save_course_upload(uploaded_file, org, course, name):
+    """
+    Writes the uploaded .tar.gz file of a course to its own directory in
+    settings.GITHUB_REPO_ROOT, where import_course_tarball expects to find it.
+
+    Returns the path of the saved file.
+    """
+    data_root = path(settings.GITHUB_REPO_ROOT)
+
+    course_subdir = "{0}-{1}-{2}".format(org, course, name)
+    course_dir = data_root / course_subdir
+    if not course_dir.isdir():
+        os.mkdir(course_dir)
+
+    temp_filepath = course_dir / uploaded_file.name
+
+    log.debug('importing course to {0}'.format(temp_filepath))
+
+    # stream out the uploaded files in chunks to disk
+    with open(temp_filepath, 'wb+') as temp_file:
+        for chunk in uploaded_file.chunks():
+            temp_file.write(chunk)
+
+    return temp_filepath
+
+
+def import_course_tarball(tarball_path, location, requester, progress_callback=None):
+    """
+    Replaces the contents of the course at `location` with the course in the
+    .tar.gz file at `tarball_path` (as saved by save_course_upload), and gives
+    `requester` access to the course.
+
+    The directory containing the .tar.gz file is deleted when done.
+
+    `progress_callback` is passed through to import_from_xml.
+
+    Raises CourseImportError if the file doesn't contain a course.
+    Returns the imported course modules.
+    """
+    tarball_path = path(tarball_path)
+    course_dir = tarball_path.dirname()
+
+    try:
+        tar_file = tarfile.open(tarball_path)
+        tar_file.extractall(course_dir + '/')
+
+        # find the 'course.xml' file
+        for dirpath, _dirnames, filenames in os.walk(course_dir):
+            for filename in filenames:
+                if filename == 'course.xml':
+                    break
+            if filename == 'course.xml':
+                break
+
+        if filename != 'course.xml':
+            raise CourseImportError('Could not find the course.xml file in the package.')
+
+        log.debug('found course.xml at {0}'.format(dirpath))
+
+        if dirpath != course_dir:
+            for fname in os.listdir(dirpath):
+                shutil.move(dirpath / fname, course_dir)
+
+        _module_store, course_items = import_from_xml(modulestore('direct'), settings.GITHUB_REPO_ROOT,
+                                                      [course_dir.basename()], load_error_modules=False,
+                                                      static_content_store=contentstore(),
+                                                      target_location_namespace=location,
+                                                      draft_store=modulestore(),
+                                                      progress_callback=progress_callback)
+    finally:
+        # we can blow this away when we're done importing.
+        shutil.rmtree(course_dir)
+
+    log.debug('new course at {0}'.format(course_items[0].location))
+
+    create_all_course_groups(requester, course_items[0].location)
+
+    return course_items
+
+
+def export_course_tarball(location, tarball_path, progress_callback=None):
+    """
+    Serializes the course at `location` to a .tar.gz file at `tarball_path`,
+    containing an XML-based representation of the course.
+
+    If specified, `progress_callback` is called as progress_callback(num_exported, num_total)
+    before and after the course's modules are exported.
+    """
+    loc = Location(location)
+    name = loc.name
+
+    if progress_callback is not None:
+        num_total = len(modulestore('direct').get_items([loc.tag, loc.org, loc.course, None, None, None]))
+        progress_callback(0, num_total)
+
+    root_dir = path(mkdtemp())
+
+    # export out to a tempdir
+    log.debug('root = {0}'.format(root_dir))
+
+    try:
+        export_to_xml(modulestore('direct'), contentstore(), loc, root_dir, name, modulestore())
+
+        if progress_callback is not None:
+            progress_callback(num_total, num_total)
+
+        log.debug('tar file being generated at {0}'.format(tarball_path))
+        tar_file = tarfile.open(name=tarball_path, mode='w:gz')
+        tar_file.add(root_dir / name, arcname=name)
+        tar_file.close()
+    finally:
+        # remove temp dir
+        shutil.rmtree(root_dir)
@@ -0,0 +1,45 @@
+###
+### Script for precomputing the max scores of the problems in existing courses
+###
+from django.core.management.base import BaseCommand, CommandError
+from xmodule.modulestore import Location
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.inheritance import own_metadata
+from xmodule.course_module import CourseDescriptor
+
+#
+# To run from command line: django-admin.py precompute_max_scores [<course_id> ...]
+#
+
+
+class Command(BaseCommand):
+    help = '''Precompute the max score of every problem in the given courses (default: all courses),
+so that the LMS doesn't need to instantiate problems a student hasn't attempted to grade them'''
+
+    def handle(self, *args, **options):
+        ms = modulestore('direct')
+
+        if args:
+            course_ids = args
+        else:
+            course_ids = [course.id for course in ms.get_courses()]
+
+        for course_id in course_ids:
+            try:
+                course_location = CourseDescriptor.id_to_location(course_id)
+            except ValueError:
+                raise CommandError("Invalid course id: {0}".format(course_id))
+
+            print "Precomputing max scores for {0}".format(course_id)
+
+            updated = 0
+            with ms.bulk_write_operations(course_location):
+                # both the published and the draft versions of each problem
+                for revision in (None, 'draft'):
+                    problem_location = Location('i4x', course_location.org, course_location.course, 'problem', None, revision)
+                    for problem in ms.get_items(problem_location):
+                        if problem.precompute_fields():
+                            ms.update_metadata(problem.location, own_metadata(problem))
+                            updated += 1
+
+            print "Updated {0} problems".format(updated)
@@ -0,0 +1,105 @@
+"""
+WE'RE USING MIGRATIONS!
+
+If you make changes to this model, be sure to create an appropriate migration
+file and check it in at the same time as your model changes. To do that,
+
+1. Go to the edx-platform dir
+2. ./manage.py cms schemamigration contentstore --auto description_of_your_change
+3. Add the migration file created in edx-platform/cms/djangoapps/contentstore/migrations/
+"""
+from uuid import uuid4
+import json
+
+from django.contrib.auth.models import User
+from django.db import models, transaction
+
+
+# define custom states used by CourseImportExportJob
+QUEUING = 'QUEUING'
+PROGRESS = 'PROGRESS'
+
+
+class CourseImportExportJob(models.Model):
+    """
+    Stores information about a course import or export that is running (or ran)
+    as a background task.
+
+    `job_type` is either IMPORT or EXPORT.
+    `course_id` identifies the course being imported into or exported from.
+    `task_id` stores the id used by celery for the background task.
+    `task_state` stores the last known state of the celery task.
+    `task_output` stores the progress or output of the celery task, as a
+        JSON-serialized dict.  While the task runs, it contains the number of
+        modules processed ('attempted') and the number to process ('total').
+        On failure it contains the 'exception' and 'message'.
+    `artifact` stores the path to the file the job works on: the uploaded
+        .tar.gz for an import, and the generated .tar.gz for an export.
+
+    `requester` stores id of user who submitted the job
+    `created` stores date that entry was first created
+    `updated` stores date that entry was last modified
+    """
+    IMPORT = 'import'
+    EXPORT = 'export'
+
+    job_type = models.CharField(max_length=50, db_index=True)
+    course_id = models.CharField(max_length=255, db_index=True)
+    task_id = models.CharField(max_length=255, db_index=True)  # max_length from celery_taskmeta
+    task_state = models.CharField(max_length=50, null=True, db_index=True)  # max_length from celery_taskmeta
+    task_output = models.TextField(null=True)
+    artifact = models.CharField(max_length=1024, null=True)
+    requester = models.ForeignKey(User, db_index=True)
+    created = models.DateTimeField(auto_now_add=True, null=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __repr__(self):
+        return 'CourseImportExportJob<%r>' % ({
+            'job_type': self.job_type,
+            'course_id': self.course_id,
+            'task_id': self.task_id,
+            'task_state': self.task_state,
+            'task_output': self.task_output,
+        },)
+
+    def __unicode__(self):
+        return unicode(repr(self))
+
+    @classmethod
+    def create(cls, course_id, job_type, requester, artifact=None):
+        """
+        Create an instance of CourseImportExportJob, and commit it immediately,
+        so that the background task can find it.
+        """
+        job = cls(
+            course_id=course_id,
+            job_type=job_type,
+            task_id=str(uuid4()),
+            task_state=QUEUING,
+            artifact=artifact,
+            requester=requester,
+        )
+        job.save_now()
+        return job
+
+    @transaction.autocommit
+    def save_now(self):
+        """
+        Writes CourseImportExportJob immediately, ensuring the transaction is committed.
+        """
+        self.save()
+
+    @property
+    def task_progress(self):
+        """
+        The deserialized task_output, or an empty dict if there is none
+        """
+        if self.task_output is None:
+            return {}
+        return json.loads(self.task_output)
+
+    def set_task_progress(self, task_progress):
+        """
+        Serializes task_progress into task_output
+        """
+        self.task_output = json.dumps(task_progress)
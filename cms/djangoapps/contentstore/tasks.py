@@ -0,0 +1,165 @@
+"""
+Celery tasks that import and export courses in the background.
+
+Each task is passed the id of a CourseImportExportJob entry, which identifies
+the course and the file to work on, and in which the task records its
+progress and final state.
+"""
+import os
+from time import time
+from traceback import format_exc
+
+from celery import task
+from celery.utils.log import get_task_logger
+from celery.states import SUCCESS, FAILURE
+from path import path
+
+from django.conf import settings
+
+from xmodule.course_module import CourseDescriptor
+
+from contentstore.import_export import import_course_tarball, export_course_tarball, CourseImportError
+from contentstore.models import CourseImportExportJob, PROGRESS
+
+TASK_LOG = get_task_logger(__name__)
+
+# don't write progress to the job entry more often than this
+PROGRESS_UPDATE_INTERVAL_SECS = 1
+
+
+def export_artifact_path(job):
+    """
+    Returns the path where the .tar.gz file produced by an export job is stored.
+
+    Like imported courses, this is under settings.GITHUB_REPO_ROOT, so that it
+    is visible to both the Studio web servers and the celery workers.
+    """
+    export_root = path(settings.GITHUB_REPO_ROOT) / 'exports'
+    if not export_root.isdir():
+        os.makedirs(export_root)
+    name = CourseDescriptor.id_to_location(job.course_id).name
+    return export_root / '{0}.{1}.tar.gz'.format(name, job.task_id)
+
+
+def _run_job(entry_id, job_fcn):
+    """
+    Runs `job_fcn` for the CourseImportExportJob entry with id `entry_id`.
+
+    `job_fcn` is called with the entry and a progress callback, which takes the
+    number of modules processed so far and the total number to process.
+
+    The entry's task_state is set to PROGRESS while the job runs, and to
+    SUCCESS or FAILURE when it finishes.  Progress is recorded in task_output,
+    as is the exception if the job fails.  Exceptions are re-raised after
+    being recorded, so that celery also records the failure.
+    """
+    job = CourseImportExportJob.objects.get(pk=entry_id)
+    TASK_LOG.info('Starting course {0} of {1}, task {2}'.format(job.job_type, job.course_id, job.task_id))
+
+    start_time = time()
+    last_update = [0]
+
+    def update_progress(num_done, num_total, force=False):
+        """Record progress, at most once every PROGRESS_UPDATE_INTERVAL_SECS unless `force`"""
+        now = time()
+        if not force and now - last_update[0] < PROGRESS_UPDATE_INTERVAL_SECS and num_done < num_total:
+            return
+        last_update[0] = now
+        job.task_state = PROGRESS
+        job.set_task_progress({
+            'attempted': num_done,
+            'total': num_total,
+            'duration_ms': int((now - start_time) * 1000),
+        })
+        job.save_now()
+
+    update_progress(0, 0, force=True)
+    try:
+        job_fcn(job, update_progress)
+    except Exception as exception:
+        progress = job.task_progress
+        progress['exception'] = type(exception).__name__
+        if isinstance(exception, CourseImportError):
+            progress['message'] = unicode(exception)
+        else:
+            progress['message'] = 'An error occurred while processing the course.'
+            TASK_LOG.exception('Course {0} of {1} failed'.format(job.job_type, job.course_id))
+            progress['traceback'] = format_exc()
+        job.task_state = FAILURE
+        job.set_task_progress(progress)
+        job.save_now()
+        raise
+
+    progress = job.task_progress
+    progress['duration_ms'] = int((time() - start_time) * 1000)
+    job.task_state = SUCCESS
+    job.set_task_progress(progress)
+    job.save_now()
+    TASK_LOG.info('Finished course {0} of {1}, task {2}'.format(job.job_type, job.course_id, job.task_id))
+    return progress
+
+
+def _prune_export_artifacts(job):
+    """
+    Deletes the .tar.gz files of the exports of the course of `job` that
+    finished before it, so that only the latest export of a course is kept.
+
+    The `artifact` of each of them is set to None once its file is deleted.
+    """
+    old_jobs = CourseImportExportJob.objects.filter(
+        course_id=job.course_id, job_type=CourseImportExportJob.EXPORT, task_state=SUCCESS, id__lt=job.id
+    ).exclude(artifact=None)
+    for old_job in old_jobs:
+        if os.path.exists(old_job.artifact):
+            os.remove(old_job.artifact)
+        old_job.artifact = None
+        old_job.save_now()
+
+
+def _import_course(job, update_progress):
+    """Imports the .tar.gz file stored as the job's artifact"""
+    location = CourseDescriptor.id_to_location(job.course_id)
+    import_course_tarball(job.artifact, location, job.requester, progress_callback=update_progress)
+    # the uploaded file was deleted along with the rest of the import directory
+    job.artifact = None
+
+
+def _export_course(job, update_progress):
+    """Exports the course, storing the path of the .tar.gz file as the job's artifact"""
+    location = CourseDescriptor.id_to_location(job.course_id)
+    tarball_path = export_artifact_path(job)
+    export_course_tarball(location, tarball_path, progress_callback=update_progress)
+    job.artifact = tarball_path
+
+
+@task
+def import_course(entry_id):
+    """
+    Imports a course from an uploaded .tar.gz file.
+
+    `entry_id` is the id value of the CourseImportExportJob entry that
+    corresponds to this task.  The entry contains the `course_id` of the course
+    to import into, and the path of the uploaded file as its `artifact`.
+    """
+    return _run_job(entry_id, _import_course)
+
+
+@task
+def export_course(entry_id):
+    """
+    Exports a course to a .tar.gz file.
+
+    `entry_id` is the id value of the CourseImportExportJob entry that
+    corresponds to this task.  The entry contains the `course_id` of the course
+    to export.  When the task succeeds, the path of the .tar.gz file is stored
+    as the entry's `artifact`, and the files of earlier exports of the course
+    are deleted.
+    """
+    progress = _run_job(entry_id, _export_course)
+    job = CourseImportExportJob.objects.get(pk=entry_id)
+    try:
+        _prune_export_artifacts(job)
+    except Exception:
+        # the new export is ready anyway, so the old ones are deleted by the next export
+        TASK_LOG.exception('Failed to delete old exports of course {0}'.format(job.course_id))
+    return progress
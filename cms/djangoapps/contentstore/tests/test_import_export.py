@@ -0,0 +1,114 @@
+"""
+Tests for importing and exporting courses in background tasks
+"""
+import copy
+import shutil
+import tarfile
+from uuid import uuid4
+
+import mock
+from path import path
+from tempdir import mkdtemp_clean
+
+from django.conf import settings
+from django.core.urlresolvers import reverse
+from django.test.utils import override_settings
+
+from contentstore.models import CourseImportExportJob
+from .utils import CourseTestCase, parse_json
+
+
+TEST_DATA_CONTENTSTORE = copy.deepcopy(settings.CONTENTSTORE)
+TEST_DATA_CONTENTSTORE['OPTIONS']['db'] = 'test_xcontent_%s' % uuid4().hex
+
+
+@override_settings(CONTENTSTORE=TEST_DATA_CONTENTSTORE)
+@mock.patch.dict('django.conf.settings.MITX_FEATURES', {'ENABLE_IMPORT_EXPORT_TASKS': True})
+class ImportExportTaskTestCase(CourseTestCase):
+    """
+    Tests of the import and export views when ENABLE_IMPORT_EXPORT_TASKS is set.
+    (Celery runs in "ALWAYS_EAGER" mode in tests, so the jobs finish before the views return.)
+    """
+    def setUp(self):
+        super(ImportExportTaskTestCase, self).setUp()
+        self.url_kwargs = {
+            'org': self.course.location.org,
+            'course': self.course.location.course,
+            'name': self.course.location.name,
+        }
+        self.temp_dir = path(mkdtemp_clean())
+
+    def tearDown(self):
+        shutil.rmtree(path(settings.GITHUB_REPO_ROOT) / 'exports', ignore_errors=True)
+        super(ImportExportTaskTestCase, self).tearDown()
+
+    def export_course(self):
+        """Exports the course, and returns the status of the job"""
+        resp = self.client.get(reverse('generate_export_course', kwargs=self.url_kwargs))
+        self.assertEqual(resp.status_code, 200)
+        return parse_json(resp)
+
+    def import_course(self, tarball_path):
+        """Imports the .tar.gz file at tarball_path, and returns the status of the job"""
+        with open(tarball_path) as tarball:
+            resp = self.client.post(reverse('import_course', kwargs=self.url_kwargs), {'course-data': tarball})
+        self.assertEqual(resp.status_code, 200)
+        return parse_json(resp)
+
+    def test_export(self):
+        status = self.export_course()
+        self.assertEqual(status['job_type'], CourseImportExportJob.EXPORT)
+        self.assertEqual(status['task_state'], 'SUCCESS')
+        self.assertFalse(status['in_progress'])
+        self.assertEqual(status['task_progress']['attempted'], status['task_progress']['total'])
+
+        # the status can be polled
+        resp = self.client.get(status['status_url'], {'job_id': status['job_id']})
+        self.assertEqual(parse_json(resp), status)
+
+        resp = self.client.get(status['download_url'])
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Content-Type'], 'application/x-tgz')
+
+    def test_old_exports_deleted(self):
+        old_status = self.export_course()
+        old_artifact = CourseImportExportJob.objects.get(task_id=old_status['job_id']).artifact
+        status = self.export_course()
+
+        self.assertFalse(path(old_artifact).exists())
+        resp = self.client.get(old_status['download_url'])
+        self.assertEqual(resp.status_code, 404)
+        resp = self.client.get(old_status['status_url'], {'job_id': old_status['job_id']})
+        self.assertNotIn('download_url', parse_json(resp))
+
+        resp = self.client.get(status['download_url'])
+        self.assertEqual(resp.status_code, 200)
+
+    def test_export_then_import(self):
+        status = self.export_course()
+        tarball_path = self.temp_dir / 'course.tar.gz'
+        with open(tarball_path, 'wb') as tarball:
+            tarball.write(self.client.get(status['download_url']).content)
+
+        status = self.import_course(tarball_path)
+        self.assertEqual(status['job_type'], CourseImportExportJob.IMPORT)
+        self.assertEqual(status['task_state'], 'SUCCESS')
+        self.assertGreater(status['task_progress']['total'], 0)
+        self.assertEqual(status['task_progress']['attempted'], status['task_progress']['total'])
+        self.assertNotIn('download_url', status)
+
+    def test_import_without_course_xml(self):
+        (self.temp_dir / 'not_a_course.txt').write_text('nothing to see here')
+        tarball_path = self.temp_dir / 'not_a_course.tar.gz'
+        tar_file = tarfile.open(tarball_path, mode='w:gz')
+        tar_file.add(self.temp_dir / 'not_a_course.txt', arcname='not_a_course.txt')
+        tar_file.close()
+
+        status = self.import_course(tarball_path)
+        self.assertEqual(status['task_state'], 'FAILURE')
+        self.assertFalse(status['in_progress'])
+        self.assertEqual(status['task_progress']['message'], 'Could not find the course.xml file in the package.')
+
+    def test_unknown_job(self):
+        resp = self.client.get(reverse('import_export_status', kwargs=self.url_kwargs), {'job_id': 'unknown'})
+        self.assertEqual(resp.status_code, 404)
@@ -1,13 +1,11 @@
 import logging
 import json
 import os
-import tarfile
-import shutil
-from tempfile import mkdtemp
-from path import path
+
+from celery.states import READY_STATES, SUCCESS
 
 from django.conf import settings
-from django.http import HttpResponse, HttpResponseBadRequest
+from django.http import HttpResponse, HttpResponseBadRequest, Http404
 from django.contrib.auth.decorators import login_required
 from django_future.csrf import ensure_csrf_cookie
 from django.core.urlresolvers import reverse
@@ -17,11 +15,8 @@ from django.views.decorators.http import require_POST
 
 from mitxmako.shortcuts import render_to_response
 from cache_toolbox.core import del_cached_content
-from auth.authz import create_all_course_groups
 
-from xmodule.modulestore.xml_importer import import_from_xml
 from xmodule.contentstore.django import contentstore
-from xmodule.modulestore.xml_exporter import export_to_xml
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore import Location
 from xmodule.contentstore.content import StaticContent
@@ -30,11 +25,15 @@ from xmodule.modulestore import InvalidLocationError
 from xmodule.exceptions import NotFoundError
 
 from ..utils import get_url_reverse
+from ..import_export import save_course_upload, import_course_tarball, export_course_tarball, CourseImportError
+from ..models import CourseImportExportJob
+from .. import tasks
 from .access import get_location_and_verify_access
 from util.json_request import JsonResponse
 
 
-__all__ = ['asset_index', 'upload_asset', 'import_course', 'generate_export_course', 'export_course']
+__all__ = ['asset_index', 'upload_asset', 'import_course', 'generate_export_course', 'export_course',
+           'import_export_status', 'download_export']
 
 
 def assets_to_json_dict(assets):
@@ -253,6 +252,9 @@ def remove_asset(request, org, course, name):
 def import_course(request, org, course, name):
     """
     This method will handle a POST request to upload and import a .tar.gz file into a specified course
+
+    If MITX_FEATURES['ENABLE_IMPORT_EXPORT_TASKS'] is set, the import is done in the background, and
+    the response contains the id of the job, whose status can be polled with import_export_status.
     """
     location = get_location_and_verify_access(request, org, course, name)
 
@@ -262,56 +264,17 @@ def import_course(request, org, course, name):
         if not filename.endswith('.tar.gz'):
             return HttpResponse(json.dumps({'ErrMsg': 'We only support uploading a .tar.gz file.'}))
 
-        data_root = path(settings.GITHUB_REPO_ROOT)
-
-        course_subdir = "{0}-{1}-{2}".format(org, course, name)
-        course_dir = data_root / course_subdir
-        if not course_dir.isdir():
-            os.mkdir(course_dir)
-
-        temp_filepath = course_dir / filename
-
-        logging.debug('importing course to {0}'.format(temp_filepath))
-
-        # stream out the uploaded files in chunks to disk
-        temp_file = open(temp_filepath, 'wb+')
-        for chunk in request.FILES['course-data'].chunks():
-            temp_file.write(chunk)
-        temp_file.close()
-
-        tar_file = tarfile.open(temp_filepath)
-        tar_file.extractall(course_dir + '/')
-
-        # find the 'course.xml' file
-
-        for dirpath, _dirnames, filenames in os.walk(course_dir):
-            for filename in filenames:
-                if filename == 'course.xml':
-                    break
-            if filename == 'course.xml':
-                break
-
-        if filename != 'course.xml':
-            return HttpResponse(json.dumps({'ErrMsg': 'Could not find the course.xml file in the package.'}))
-
-        logging.debug('found course.xml at {0}'.format(dirpath))
+        tarball_path = save_course_upload(request.FILES['course-data'], org, course, name)
 
-        if dirpath != course_dir:
-            for fname in os.listdir(dirpath):
-                shutil.move(dirpath / fname, course_dir)
+        if settings.MITX_FEATURES.get('ENABLE_IMPORT_EXPORT_TASKS'):
+            job = _submit_import_export_job(request, org, course, name, CourseImportExportJob.IMPORT,
+                                            tasks.import_course, artifact=tarball_path)
+            return JsonResponse(_import_export_job_status(job, org, course, name))
 
-        _module_store, course_items = import_from_xml(modulestore('direct'), settings.GITHUB_REPO_ROOT,
-                                                      [course_subdir], load_error_modules=False,
-                                                      static_content_store=contentstore(),
-                                                      target_location_namespace=location,
-                                                      draft_store=modulestore())
-
-        # we can blow this away when we're done importing.
-        shutil.rmtree(course_dir)
-
-        logging.debug('new course at {0}'.format(course_items[0].location))
-
-        create_all_course_groups(request.user, course_items[0].location)
+        try:
+            import_course_tarball(tarball_path, location, request.user)
+        except CourseImportError as err:
+            return HttpResponse(json.dumps({'ErrMsg': unicode(err)}))
 
         return HttpResponse(json.dumps({'Status': 'OK'}))
     else:
@@ -319,7 +282,8 @@ def import_course(request, org, course, name):
 
         return render_to_response('import.html', {
             'context_course': course_module,
-            'successful_import_redirect_url': get_url_reverse('CourseOutline', course_module)
+            'successful_import_redirect_url': get_url_reverse('CourseOutline', course_module),
+            'import_export_tasks': settings.MITX_FEATURES.get('ENABLE_IMPORT_EXPORT_TASKS', False),
         })
 
 
@@ -329,31 +293,106 @@ def generate_export_course(request, org, course, name):
     """
     This method will serialize out a course to a .tar.gz file which contains a XML-based representation of
     the course
+
+    If MITX_FEATURES['ENABLE_IMPORT_EXPORT_TASKS'] is set, the export is done in the background, and
+    the response contains the id of the job, whose status can be polled with import_export_status.
+    When the job succeeds, the file can be downloaded with download_export.
     """
     location = get_location_and_verify_access(request, org, course, name)
 
-    loc = Location(location)
+    if settings.MITX_FEATURES.get('ENABLE_IMPORT_EXPORT_TASKS'):
+        job = _submit_import_export_job(request, org, course, name, CourseImportExportJob.EXPORT,
+                                        tasks.export_course)
+        return JsonResponse(_import_export_job_status(job, org, course, name))
+
     export_file = NamedTemporaryFile(prefix=name + '.', suffix=".tar.gz")
+    export_course_tarball(location, export_file.name)
+
+    wrapper = FileWrapper(export_file)
+    response = HttpResponse(wrapper, content_type='application/x-tgz')
+    response['Content-Disposition'] = 'attachment; filename=%s' % os.path.basename(export_file.name)
+    response['Content-Length'] = os.path.getsize(export_file.name)
+    return response
 
-    root_dir = path(mkdtemp())
 
-    # export out to a tempdir
-    logging.debug('root = {0}'.format(root_dir))
+def _submit_import_export_job(request, org, course, name, job_type, task_fcn, artifact=None):
+    """
+    Creates a CourseImportExportJob of `job_type` for the course, and submits
+    `task_fcn` to celery to run it.
+    """
+    course_id = '/'.join([org, course, name])
+    job = CourseImportExportJob.create(course_id, job_type, request.user, artifact=artifact)
+    task_fcn.apply_async([job.id], task_id=job.task_id)
+    # the task may have run already, e.g. if celery is running in "ALWAYS_EAGER" mode
+    return CourseImportExportJob.objects.get(pk=job.id)
 
-    export_to_xml(modulestore('direct'), contentstore(), loc, root_dir, name, modulestore())
 
-    logging.debug('tar file being generated at {0}'.format(export_file.name))
-    tar_file = tarfile.open(name=export_file.name, mode='w:gz')
-    tar_file.add(root_dir / name, arcname=name)
-    tar_file.close()
+def _import_export_job_status(job, org, course, name):
+    """
+    Returns a dict describing the status of `job`, for the UI to poll.
+    """
+    status = {
+        'job_id': job.task_id,
+        'job_type': job.job_type,
+        'task_state': job.task_state,
+        'in_progress': job.task_state not in READY_STATES,
+        'task_progress': job.task_progress,
+        'status_url': reverse('import_export_status', kwargs={'org': org, 'course': course, 'name': name}),
+    }
+    if job.job_type == CourseImportExportJob.EXPORT and job.task_state == SUCCESS and job.artifact:
+        status['download_url'] = reverse(
+            'download_export', kwargs={'org': org, 'course': course, 'name': name}
+        ) + '?job_id=' + job.task_id
+    return status
+
+
+def _get_import_export_job(request, org, course, name):
+    """
+    Returns the CourseImportExportJob for this course identified by the
+    request's job_id parameter, or raises Http404.
+    """
+    course_id = '/'.join([org, course, name])
+    try:
+        return CourseImportExportJob.objects.get(task_id=request.GET.get('job_id'), course_id=course_id)
+    except CourseImportExportJob.DoesNotExist:
+        raise Http404
 
-    # remove temp dir
-    shutil.rmtree(root_dir / name)
 
-    wrapper = FileWrapper(export_file)
-    response = HttpResponse(wrapper, content_type='application/x-tgz')
-    response['Content-Disposition'] = 'attachment; filename=%s' % os.path.basename(export_file.name)
-    response['Content-Length'] = os.path.getsize(export_file.name)
+@login_required
+def import_export_status(request, org, course, name):
+    """
+    Returns the status of the import or export job given by the job_id parameter, as JSON.
+
+    The status contains the keys:
+      'job_id', 'job_type': the id and type ('import' or 'export') of the job
+      'task_state': the state of the job's celery task
+      'in_progress': whether the job is still running
+      'task_progress': a dict containing 'attempted' and 'total' numbers of modules,
+          and 'exception' and 'message' if the job failed
+      'download_url': for an export job that succeeded, where to download the course from
+    """
+    get_location_and_verify_access(request, org, course, name)
+    job = _get_import_export_job(request, org, course, name)
+    return JsonResponse(_import_export_job_status(job, org, course, name))
+
+
+@login_required
+def download_export(request, org, course, name):
+    """
+    Serves the .tar.gz file produced by the export job given by the job_id parameter.
+    Only the file of the latest export of a course is kept.
+    """
+    get_location_and_verify_access(request, org, course, name)
+    job = _get_import_export_job(request, org, course, name)
+    if job.job_type != CourseImportExportJob.EXPORT or job.task_state != SUCCESS:
+        raise Http404
+    if not job.artifact or not os.path.exists(job.artifact):
+        raise Http404
+
+    export_file = open(job.artifact, 'rb')
+    response = HttpResponse(FileWrapper(export_file), content_type='application/x-tgz')
+    response['Content-Disposition'] = 'attachment; filename=%s.tar.gz' % name
+    response['Content-Length'] = os.path.getsize(job.artifact)
     return response
 
 
@@ -369,5 +408,6 @@ def export_course(request, org, course, name):
 
     return render_to_response('export.html', {
         'context_course': course_module,
-        'successful_import_redirect_url': ''
+        'successful_import_redirect_url': '',
+        'import_export_tasks': settings.MITX_FEATURES.get('ENABLE_IMPORT_EXPORT_TASKS', False),
     })
@@ -35,6 +35,12 @@ def save_item(request):
         data = request.POST['data']
         store.update_item(item_location, data)
 
+        # update anything precomputed from the data (e.g. a problem's max score)
+        updated_item = store.get_item(item_location)
+        updated_item.invalidate_caches()
+        if updated_item.precompute_fields():
+            store.update_metadata(item_location, own_metadata(updated_item))
+
     # cdodge: note calling request.POST.get('children') will return None if children is an empty array
     # so it lead to a bug whereby the last component to be deleted in the UI was not actually
     # deleting the children object from the children collection
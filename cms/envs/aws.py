@@ -92,6 +92,9 @@ LOG_DIR = ENV_TOKENS['LOG_DIR']
 CACHES = ENV_TOKENS['CACHES']
 
 SESSION_COOKIE_DOMAIN = ENV_TOKENS.get('SESSION_COOKIE_DOMAIN')
+STATIC_CONTENT_CACHE_CONTROL = ENV_TOKENS.get('STATIC_CONTENT_CACHE_CONTROL', STATIC_CONTENT_CACHE_CONTROL)
+STATIC_CONTENT_DISK_CACHE = ENV_TOKENS.get('STATIC_CONTENT_DISK_CACHE', STATIC_CONTENT_DISK_CACHE)
+MAKO_PRECOMPILED_DIR = ENV_TOKENS.get('MAKO_PRECOMPILED_DIR', MAKO_PRECOMPILED_DIR)
 
 # allow for environments to specify what cookie name our login subsystem should use
 # this is to fix a bug regarding simultaneous logins between edx.org and edge.edx.org which can
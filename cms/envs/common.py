@@ -58,7 +58,10 @@ MITX_FEATURES = {
 
     # If set to True, new Studio users won't be able to author courses unless
     # edX has explicitly added them to the course creator group.
-    'ENABLE_CREATOR_GROUP': False
+    'ENABLE_CREATOR_GROUP': False,
+
+    # Import and export courses in celery tasks, rather than within the request
+    'ENABLE_IMPORT_EXPORT_TASKS': False
 }
 ENABLE_JASMINE = False
 
@@ -85,6 +88,10 @@ sys.path.append(COMMON_ROOT / 'lib')
 # This is where we stick our compiled template files.
 from tempdir import mkdtemp_clean
 MAKO_MODULE_DIR = mkdtemp_clean('mako')
+# If set, the directory that the compile_mako_templates command compiles all
+# the templates into ahead of time, so that they're loaded from there rather
+# than compiled by each process
+MAKO_PRECOMPILED_DIR = None
 MAKO_TEMPLATES = {}
 MAKO_TEMPLATES['main'] = [
     PROJECT_ROOT / 'templates',
@@ -189,6 +196,21 @@ STATIC_URL = '/static/'
 ADMIN_MEDIA_PREFIX = '/static/admin/'
 STATIC_ROOT = ENV_ROOT / "staticfiles"
 
+# Cache-Control header sent with course assets (/c4x/...) served by
+# contentserver.middleware.StaticContentServer, e.g. 'public, max-age=3600'.
+# Assets also get an ETag and Last-Modified header, so clients can revalidate cheaply.
+STATIC_CONTENT_CACHE_CONTROL = None
+
+# Optional node-local disk cache for course assets that are too large for
+# memcache; see contentserver.disk_cache.  For example:
+# {
+#     'ROOT': '/var/cache/edx/static_content',
+#     'MAX_SIZE': 10 * 1024 * 1024 * 1024,
+#     'SENDFILE_HEADER': 'X-Accel-Redirect',
+#     'SENDFILE_URL_PREFIX': '/static_content_cache/',
+# }
+STATIC_CONTENT_DISK_CACHE = None
+
 STATICFILES_DIRS = [
     COMMON_ROOT / "static",
     PROJECT_ROOT / "static",
@@ -210,6 +232,13 @@ LOCALE_PATHS = (REPO_ROOT + '/conf/locale',)  # mitx/conf/locale/
 # Tracking
 TRACK_MAX_EVENT = 10000
 
+# With MITX_FEATURES['ENABLE_ASYNC_TRACKING_LOGS'], the number of tracking events that can be
+# waiting to be written, the number written together, and the seconds a request waits
+# to queue an event when the queue is full before dropping it
+TRACK_QUEUE_SIZE = 10000
+TRACK_QUEUE_BATCH_SIZE = 100
+TRACK_QUEUE_TIMEOUT = 0.1
+
 # Messages
 MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
 
@@ -33,6 +33,10 @@ urlpatterns = ('',  # nopep8
         'contentstore.views.export_course', name='export_course'),
     url(r'^(?P<org>[^/]+)/(?P<course>[^/]+)/generate_export/(?P<name>[^/]+)$',
         'contentstore.views.generate_export_course', name='generate_export_course'),
+    url(r'^(?P<org>[^/]+)/(?P<course>[^/]+)/import_export_status/(?P<name>[^/]+)$',
+        'contentstore.views.import_export_status', name='import_export_status'),
+    url(r'^(?P<org>[^/]+)/(?P<course>[^/]+)/download_export/(?P<name>[^/]+)$',
+        'contentstore.views.download_export', name='download_export'),
 
     url(r'^preview/modx/(?P<preview_id>[^/]*)/(?P<location>.*?)/(?P<dispatch>[^/]*)$',
         'contentstore.views.preview_dispatch', name='preview_dispatch'),
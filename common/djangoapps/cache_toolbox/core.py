@@ -11,6 +11,8 @@ Core methods
 from django.core.cache import cache
 from django.db import DEFAULT_DB_ALIAS
 
+from contentserver import disk_cache
+
 from . import app_settings
 
 
@@ -119,3 +121,5 @@ def get_cached_content(location):
 
 def del_cached_content(location):
     cache.delete(str(location))
+    # large content is stored on this node's disk, rather than in the cache
+    disk_cache.delete_content(location)
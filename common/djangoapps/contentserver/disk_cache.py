@@ -0,0 +1,224 @@
+"""
+A node-local disk cache for static content that is too large for memcache.
+
+It is enabled by settings.STATIC_CONTENT_DISK_CACHE, a dict with the keys:
+
+    'ROOT': the directory to store the content in
+    'MAX_SIZE': the maximum number of bytes to store; the least recently
+        served content is removed when the cache grows beyond this
+    'SENDFILE_HEADER': optional, e.g. 'X-Accel-Redirect' (nginx) or
+        'X-Sendfile' (apache), to have the web server send cached files
+        itself rather than streaming them through Django
+    'SENDFILE_URL_PREFIX': optional, the (internal) url that the web server
+        serves ROOT from, for X-Accel-Redirect.  If not set, the value of
+        SENDFILE_HEADER is the absolute path of the file.
+
+Files are named by the location of the content and its upload date, so a
+re-uploaded asset never matches the file of an earlier upload.  When content
+is changed or deleted, cache_toolbox.core.del_cached_content removes its files
+from this node; other nodes notice the change because the metadata they cache
+in memcache is deleted at the same time, and remove the files of earlier
+uploads when they store the new one.
+"""
+import hashlib
+import logging
+import os
+from tempfile import mkstemp
+
+from django.conf import settings
+
+from xmodule.contentstore.content import StaticContent, StaticContentStream
+
+log = logging.getLogger(__name__)
+
+
+class DiskCachedContent(StaticContentStream):
+    """
+    Static content streamed from a file in the disk cache
+    """
+    def __init__(self, content, disk_path):
+        super(DiskCachedContent, self).__init__(
+            content.location, content.name, content.content_type, open(disk_path, 'rb'),
+            last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+            import_path=content.import_path, length=content.length,
+            content_digest=getattr(content, 'content_digest', None)
+        )
+        self.disk_path = disk_path
+
+
+def _config():
+    """
+    Returns settings.STATIC_CONTENT_DISK_CACHE, or None if the disk cache isn't enabled
+    """
+    config = getattr(settings, 'STATIC_CONTENT_DISK_CACHE', None)
+    if not config or not config.get('ROOT'):
+        return None
+    return config
+
+
+def is_enabled():
+    """
+    Returns True if the disk cache is enabled
+    """
+    return _config() is not None
+
+
+def _location_prefix(location):
+    """
+    All files of the content at `location` have names starting with this
+    """
+    return hashlib.sha1(str(location)).hexdigest() + '-'
+
+
+def _filename(content):
+    """
+    The name of the file that stores `content`
+    """
+    return _location_prefix(content.location) + content.last_modified_at.strftime('%Y%m%d%H%M%S%f')
+
+
+def _remove(file_path):
+    """
+    Removes the file at file_path, if it is still there
+    """
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
+
+
+def metadata(content):
+    """
+    Returns a copy of `content` without its data, for caching in memcache
+    in place of content that is stored on disk.
+    """
+    return StaticContent(
+        content.location, content.name, content.content_type, None,
+        last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+        import_path=content.import_path, length=content.length,
+        content_digest=getattr(content, 'content_digest', None)
+    )
+
+
+def get_content(content):
+    """
+    Returns a DiskCachedContent for `content` (which only needs to have its
+    metadata), or None if it isn't in the disk cache.
+    """
+    config = _config()
+    if config is None or content.last_modified_at is None:
+        return None
+
+    disk_path = os.path.join(config['ROOT'], _filename(content))
+    try:
+        cached = DiskCachedContent(content, disk_path)
+    except IOError:
+        return None
+
+    # record that the file was used, for LRU eviction
+    try:
+        os.utime(disk_path, None)
+    except OSError:
+        pass
+    return cached
+
+
+def set_content(content):
+    """
+    Stores the data of the StaticContentStream `content` in the disk cache,
+    and returns a DiskCachedContent that streams it from there.
+
+    Returns None if the disk cache isn't enabled, or the data couldn't be
+    stored (in which case the stream of `content` may have been read).
+    """
+    config = _config()
+    if config is None or content.last_modified_at is None:
+        return None
+
+    cached = get_content(content)
+    if cached is not None:
+        return cached
+
+    root = config['ROOT']
+    filename = _filename(content)
+    try:
+        if not os.path.isdir(root):
+            os.makedirs(root)
+        # write to a temporary file first, so that other processes never see a partial file
+        temp_fd, temp_path = mkstemp(dir=root, prefix='.')
+        try:
+            with os.fdopen(temp_fd, 'wb') as temp_file:
+                for chunk in content.stream_data():
+                    temp_file.write(chunk)
+            os.rename(temp_path, os.path.join(root, filename))
+        except Exception:
+            _remove(temp_path)
+            raise
+    except (IOError, OSError):
+        log.exception('Unable to store %s in the static content disk cache', content.location)
+        return None
+
+    _evict(root, config['MAX_SIZE'], filename)
+    return get_content(content)
+
+
+def _evict(root, max_size, keep_filename):
+    """
+    Removes the least recently used files in `root` until it holds at most
+    `max_size` bytes, and removes the files of earlier uploads of the content
+    stored as `keep_filename`.
+    """
+    keep_prefix = keep_filename[:keep_filename.index('-') + 1]
+    files = []
+    total_size = 0
+    for filename in os.listdir(root):
+        if filename.startswith('.'):
+            continue
+        file_path = os.path.join(root, filename)
+        if filename.startswith(keep_prefix) and filename != keep_filename:
+            _remove(file_path)
+            continue
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, file_path))
+        total_size += stat.st_size
+
+    files.sort()
+    for _mtime, size, file_path in files:
+        if total_size <= max_size:
+            break
+        _remove(file_path)
+        total_size -= size
+
+
+def delete_content(location):
+    """
+    Removes all files of the content at `location` from the disk cache
+    """
+    config = _config()
+    if config is None or not os.path.isdir(config['ROOT']):
+        return
+
+    prefix = _location_prefix(location)
+    for filename in os.listdir(config['ROOT']):
+        if filename.startswith(prefix):
+            _remove(os.path.join(config['ROOT'], filename))
+
+
+def sendfile_header(content):
+    """
+    Returns the (header, value) that has the web server send the file of the
+    DiskCachedContent `content`, or None if that isn't configured.
+    """
+    config = _config()
+    if config is None or not config.get('SENDFILE_HEADER'):
+        return None
+
+    url_prefix = config.get('SENDFILE_URL_PREFIX')
+    if url_prefix:
+        value = url_prefix.rstrip('/') + '/' + os.path.basename(content.disk_path)
+    else:
+        value = os.path.abspath(content.disk_path)
+    return (config['SENDFILE_HEADER'], value)
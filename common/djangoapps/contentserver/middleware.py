@@ -1,4 +1,9 @@
+import calendar
+import re
+
+from django.conf import settings
 from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe
 
 from xmodule.contentstore.django import contentstore
 from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
@@ -6,6 +11,11 @@ from xmodule.modulestore import InvalidLocationError
 from cache_toolbox.core import get_cached_content, set_cached_content
 from xmodule.exceptions import NotFoundError
 
+from . import disk_cache
+
+# a single byte range, e.g. "bytes=0-499", "bytes=500-" or "bytes=-500"
+RANGE_HEADER_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
 
 class StaticContentServer(object):
     def process_request(self, request):
@@ -21,6 +31,10 @@ class StaticContentServer(object):
 
             # first look in our cache so we don't have to round-trip to the DB
             content = get_cached_content(loc)
+            if content is not None and content.data is None:
+                # only the metadata of large content is kept in memcache, the data may be on our local disk
+                content = disk_cache.get_content(content)
+
             if content is None:
                 # nope, not in cache, let's fetch from DB
                 try:
@@ -37,24 +51,152 @@ class StaticContentServer(object):
                         # since we've queried as a stream, let's read in the stream into memory to set in cache
                         content = content.copy_to_in_mem()
                         set_cached_content(content)
+                    elif disk_cache.is_enabled():
+                        # larger content can go to the local disk cache instead, with its metadata in memcache
+                        disk_content = disk_cache.set_content(content)
+                        if disk_content is not None:
+                            content = disk_content
+                            set_cached_content(disk_cache.metadata(content))
+                        else:
+                            content = contentstore().find(loc, as_stream=True)
             else:
                 # NOP here, but we may wish to add a "cache-hit" counter in the future
                 pass
 
-            # see if the last-modified at hasn't changed, if not return a 302 (Not Modified)
+            # convert over the DB persistent last modified timestamp to a HTTP compatible timestamp
+            last_modified_at = calendar.timegm(content.last_modified_at.utctimetuple())
+            last_modified_at_str = http_date(last_modified_at)
 
-            # convert over the DB persistent last modified timestamp to a HTTP compatible
-            # timestamp, so we can simply compare the strings
-            last_modified_at_str = content.last_modified_at.strftime("%a, %d-%b-%Y %H:%M:%S GMT")
+            # use the md5 of the content as a strong ETag, if we know it (content cached
+            # before we kept track of it won't have it)
+            content_digest = getattr(content, 'content_digest', None)
+            etag = '"{0}"'.format(content_digest) if content_digest else None
 
-            # see if the client has cached this content, if so then compare the
-            # timestamps, if they are the same then just return a 304 (Not Modified)
-            if 'HTTP_IF_MODIFIED_SINCE' in request.META:
-                if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
-                if if_modified_since == last_modified_at_str:
-                    return HttpResponseNotModified()
+            # see if the client has cached this content, if so return a 304 (Not Modified)
+            if not _is_modified(request, etag, last_modified_at):
+                response = HttpResponseNotModified()
+                _set_caching_headers(response, etag, last_modified_at_str)
+                return response
+
+            length = content.length
+            if length is None and content.data is not None:
+                length = len(content.data)
 
-            response = HttpResponse(content.stream_data(), content_type=content.content_type)
-            response['Last-Modified'] = last_modified_at_str
+            byte_range = None
+            if length is not None and 'HTTP_RANGE' in request.META and _if_range_matches(request, etag, last_modified_at):
+                byte_range = _parse_range_header(request.META['HTTP_RANGE'], length)
+                if byte_range == 'unsatisfiable':
+                    response = HttpResponse(status=416)
+                    response['Content-Range'] = 'bytes */{0}'.format(length)
+                    return response
+
+            sendfile = None
+            if isinstance(content, disk_cache.DiskCachedContent):
+                sendfile = disk_cache.sendfile_header(content)
+
+            if byte_range is not None:
+                first_byte, last_byte = byte_range
+                if content.data is not None:
+                    data = content.data[first_byte:last_byte + 1]
+                else:
+                    data = content.stream_data_in_range(first_byte, last_byte)
+                response = HttpResponse(data, content_type=content.content_type, status=206)
+                response['Content-Range'] = 'bytes {0}-{1}/{2}'.format(first_byte, last_byte, length)
+                response['Content-Length'] = str(last_byte - first_byte + 1)
+            elif sendfile is not None:
+                # let the web server send the file from the disk cache itself
+                content.close()
+                response = HttpResponse(content_type=content.content_type)
+                response[sendfile[0]] = sendfile[1]
+            else:
+                data = content.data if content.data is not None else content.stream_data()
+                response = HttpResponse(data, content_type=content.content_type)
+                if length is not None:
+                    response['Content-Length'] = str(length)
+
+            if length is not None:
+                response['Accept-Ranges'] = 'bytes'
+            _set_caching_headers(response, etag, last_modified_at_str)
 
             return response
+
+
+def _set_caching_headers(response, etag, last_modified_at_str):
+    """
+    Set the headers that let clients (and CDNs) cache the content
+    """
+    response['Last-Modified'] = last_modified_at_str
+    if etag is not None:
+        response['ETag'] = etag
+    cache_control = getattr(settings, 'STATIC_CONTENT_CACHE_CONTROL', None)
+    if cache_control:
+        response['Cache-Control'] = cache_control
+
+
+def _is_modified(request, etag, last_modified_at):
+    """
+    Returns False if the request's conditional headers show the client already
+    has this version of the content.
+
+    As in RFC 2616, If-None-Match takes precedence over If-Modified-Since.
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        if etag is None:
+            return True
+        etags = [tag.strip() for tag in if_none_match.split(',')]
+        return not ('*' in etags or etag in etags)
+
+    if_modified_since = request.META.get('HTTP_IF_MODIFIED_SINCE')
+    if if_modified_since is not None:
+        if_modified_since = parse_http_date_safe(if_modified_since)
+        if if_modified_since is not None:
+            return last_modified_at > if_modified_since
+
+    return True
+
+
+def _if_range_matches(request, etag, last_modified_at):
+    """
+    Returns True if the Range header should be honored: if there is no If-Range
+    header, or if it matches the current version of the content.
+    """
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range is None:
+        return True
+    if if_range.startswith('"'):
+        return etag is not None and if_range == etag
+    return parse_http_date_safe(if_range) == last_modified_at
+
+
+def _parse_range_header(header, length):
+    """
+    Parse a Range header for content of `length` bytes.
+
+    Returns (first_byte, last_byte) for a single satisfiable byte range,
+    'unsatisfiable' if the range starts after the end of the content,
+    and None if the header should be ignored (e.g. because it is malformed,
+    or asks for multiple ranges).
+    """
+    match = RANGE_HEADER_RE.match(header.strip())
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if first == '' and last == '':
+        return None
+
+    if first == '':
+        # a suffix range: the last `last` bytes
+        suffix_length = int(last)
+        if suffix_length == 0:
+            return 'unsatisfiable'
+        return (max(length - suffix_length, 0), length - 1)
+
+    first_byte = int(first)
+    last_byte = int(last) if last != '' else length - 1
+    if last_byte < first_byte:
+        return None
+    if first_byte >= length:
+        return 'unsatisfiable'
+    return (first_byte, min(last_byte, length - 1))
@@ -0,0 +1,241 @@
+"""
+Tests for StaticContentServer
+"""
+import os
+import time
+from datetime import datetime
+from StringIO import StringIO
+
+from mock import patch, Mock
+from tempdir import mkdtemp_clean
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+
+from cache_toolbox.core import del_cached_content
+from xmodule.contentstore.content import StaticContent, StaticContentStream
+from xmodule.modulestore import Location
+
+from . import disk_cache
+from .middleware import StaticContentServer, _parse_range_header
+
+ASSET_PATH = '/c4x/edX/toy/asset/handouts.txt'
+ASSET_DATA = '0123456789' * 10
+ASSET_DIGEST = 'd41d8cd98f00b204e9800998ecf8427e'
+LAST_MODIFIED = datetime(2013, 7, 1, 12, 0, 0)
+LAST_MODIFIED_STR = 'Mon, 01 Jul 2013 12:00:00 GMT'
+
+
+class StreamDataInRangeTest(TestCase):
+    """
+    Tests of streaming part of a StaticContentStream
+    """
+    def test_stream_data_in_range(self):
+        location = Location('c4x', 'edX', 'toy', 'asset', 'handouts.txt')
+        content = StaticContentStream(location, 'handouts.txt', 'text/plain', StringIO(ASSET_DATA * 30))
+        self.assertEqual(''.join(content.stream_data_in_range(5, 2504)), (ASSET_DATA * 30)[5:2505])
+        self.assertEqual(''.join(content.stream_data_in_range(2990, 3100)), (ASSET_DATA * 30)[2990:])
+
+
+class ParseRangeHeaderTest(TestCase):
+    """
+    Tests of parsing the Range header
+    """
+    def test_ranges(self):
+        self.assertEqual(_parse_range_header('bytes=0-9', 100), (0, 9))
+        self.assertEqual(_parse_range_header('bytes=90-', 100), (90, 99))
+        self.assertEqual(_parse_range_header('bytes=-10', 100), (90, 99))
+        self.assertEqual(_parse_range_header('bytes=-200', 100), (0, 99))
+        self.assertEqual(_parse_range_header('bytes=50-500', 100), (50, 99))
+
+    def test_unsatisfiable(self):
+        self.assertEqual(_parse_range_header('bytes=100-', 100), 'unsatisfiable')
+        self.assertEqual(_parse_range_header('bytes=-0', 100), 'unsatisfiable')
+
+    def test_ignored(self):
+        self.assertIsNone(_parse_range_header('bytes=0-9,20-29', 100))
+        self.assertIsNone(_parse_range_header('bytes=9-0', 100))
+        self.assertIsNone(_parse_range_header('bytes=-', 100))
+        self.assertIsNone(_parse_range_header('lines=0-9', 100))
+
+
+@patch('contentserver.middleware.set_cached_content', Mock())
+@patch('contentserver.middleware.get_cached_content', Mock(return_value=None))
+class StaticContentServerTest(TestCase):
+    """
+    Tests of the caching and Range headers of served static content
+    """
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.location = Location('c4x', 'edX', 'toy', 'asset', 'handouts.txt')
+        self.contentstore = Mock()
+        patcher = patch('contentserver.middleware.contentstore', Mock(return_value=self.contentstore))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.contentstore.find.return_value = StaticContentStream(
+            self.location, 'handouts.txt', 'text/plain', StringIO(ASSET_DATA),
+            last_modified_at=LAST_MODIFIED, length=len(ASSET_DATA), content_digest=ASSET_DIGEST
+        )
+
+    def get(self, **headers):
+        """Returns the response to a GET of the asset"""
+        request = self.factory.get(ASSET_PATH, **headers)
+        return StaticContentServer().process_request(request)
+
+    def test_caching_headers(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, ASSET_DATA)
+        self.assertEqual(response['ETag'], '"{0}"'.format(ASSET_DIGEST))
+        self.assertEqual(response['Last-Modified'], LAST_MODIFIED_STR)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Length'], str(len(ASSET_DATA)))
+        self.assertFalse(response.has_header('Cache-Control'))
+
+    @override_settings(STATIC_CONTENT_CACHE_CONTROL='public, max-age=3600')
+    def test_cache_control(self):
+        response = self.get()
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+
+    def test_if_none_match(self):
+        response = self.get(HTTP_IF_NONE_MATCH='"{0}"'.format(ASSET_DIGEST))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], '"{0}"'.format(ASSET_DIGEST))
+
+        response = self.get(HTTP_IF_NONE_MATCH='"someotherdigest"')
+        self.assertEqual(response.status_code, 200)
+
+        # If-None-Match takes precedence over If-Modified-Since
+        response = self.get(HTTP_IF_NONE_MATCH='"someotherdigest"', HTTP_IF_MODIFIED_SINCE=LAST_MODIFIED_STR)
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since(self):
+        response = self.get(HTTP_IF_MODIFIED_SINCE=LAST_MODIFIED_STR)
+        self.assertEqual(response.status_code, 304)
+
+        response = self.get(HTTP_IF_MODIFIED_SINCE='Sun, 30 Jun 2013 12:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+
+    def test_range(self):
+        response = self.get(HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, ASSET_DATA[10:20])
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/{0}'.format(len(ASSET_DATA)))
+        self.assertEqual(response['Content-Length'], '10')
+
+    def test_unsatisfiable_range(self):
+        response = self.get(HTTP_RANGE='bytes=1000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */{0}'.format(len(ASSET_DATA)))
+
+    def test_if_range(self):
+        response = self.get(HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"{0}"'.format(ASSET_DIGEST))
+        self.assertEqual(response.status_code, 206)
+
+        response = self.get(HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE=LAST_MODIFIED_STR)
+        self.assertEqual(response.status_code, 206)
+
+        # the client's copy is out of date, so it gets the whole thing
+        response = self.get(HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"someotherdigest"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, ASSET_DATA)
+
+
+class DiskCacheTest(TestCase):
+    """
+    Tests of serving large content from the local disk cache
+    """
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.location = Location('c4x', 'edX', 'toy', 'asset', 'lecture.mp4')
+        self.data = '0123456789' * 110000
+        self.contentstore = Mock()
+        self.contentstore.find.side_effect = self.find
+
+        # a dict in place of memcache
+        self.cache = {}
+        for name, mock_fcn in [
+                ('contentstore', Mock(return_value=self.contentstore)),
+                ('get_cached_content', lambda loc: self.cache.get(str(loc))),
+                ('set_cached_content', lambda content: self.cache.__setitem__(str(content.location), content)),
+        ]:
+            patcher = patch('contentserver.middleware.' + name, mock_fcn)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.cache_root = mkdtemp_clean()
+        self.settings = {'ROOT': self.cache_root, 'MAX_SIZE': 3 * len(self.data)}
+
+    def find(self, location, as_stream=False):
+        """Returns the large content in place of the contentstore"""
+        return StaticContentStream(
+            location, location.name, 'video/mp4', StringIO(self.data),
+            last_modified_at=LAST_MODIFIED, length=len(self.data), content_digest=ASSET_DIGEST
+        )
+
+    def get(self, location=None, **headers):
+        """Returns the response to a GET of the content at `location`"""
+        location = location or self.location
+        with self.settings_context():
+            request = self.factory.get(StaticContent.get_url_path_from_location(location), **headers)
+            return StaticContentServer().process_request(request)
+
+    def settings_context(self):
+        """Enables the disk cache"""
+        return override_settings(STATIC_CONTENT_DISK_CACHE=self.settings)
+
+    def test_disabled(self):
+        self.settings = None
+        self.assertEqual(self.get().content, self.data)
+        self.assertEqual(self.get().content, self.data)
+        self.assertEqual(self.contentstore.find.call_count, 2)
+        self.assertEqual(self.cache, {})
+
+    def test_cached(self):
+        self.assertEqual(self.get().content, self.data)
+        self.assertEqual(len(os.listdir(self.cache_root)), 1)
+        # only the metadata goes to memcache
+        self.assertIsNone(self.cache[str(self.location)].data)
+
+        response = self.get(HTTP_RANGE='bytes=-10')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, self.data[-10:])
+        self.assertEqual(response['ETag'], '"{0}"'.format(ASSET_DIGEST))
+        self.assertEqual(self.contentstore.find.call_count, 1)
+
+    def test_del_cached_content(self):
+        self.get()
+        with self.settings_context():
+            del_cached_content(self.location)
+        self.assertEqual(os.listdir(self.cache_root), [])
+
+    def test_lru_eviction(self):
+        locations = [Location('c4x', 'edX', 'toy', 'asset', 'lecture{0}.mp4'.format(i)) for i in range(4)]
+        for location in locations[:3]:
+            self.get(location)
+        self.assertEqual(len(os.listdir(self.cache_root)), 3)
+
+        # the second is the least recently used
+        now = time.time()
+        for location, last_used in zip(locations, [now, now - 100, now - 50]):
+            file_path = os.path.join(self.cache_root, disk_cache._filename(self.find(location)))
+            os.utime(file_path, (last_used, last_used))
+
+        self.get(locations[3])
+        self.assertEqual(len(os.listdir(self.cache_root)), 3)
+        with self.settings_context():
+            self.assertIsNotNone(disk_cache.get_content(self.find(locations[0])))
+            self.assertIsNone(disk_cache.get_content(self.find(locations[1])))
+            self.assertIsNotNone(disk_cache.get_content(self.find(locations[2])))
+            self.assertIsNotNone(disk_cache.get_content(self.find(locations[3])))
+
+    def test_sendfile(self):
+        self.settings['SENDFILE_HEADER'] = 'X-Accel-Redirect'
+        self.settings['SENDFILE_URL_PREFIX'] = '/static_content_cache/'
+        response = self.get()
+        self.assertEqual(response.content, '')
+        self.assertEqual(
+            response['X-Accel-Redirect'],
+            '/static_content_cache/' + os.listdir(self.cache_root)[0]
+        )
+        self.assertEqual(response['ETag'], '"{0}"'.format(ASSET_DIGEST))
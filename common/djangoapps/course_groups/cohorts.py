@@ -3,16 +3,23 @@ This file contains the logic for cohort groups, as exposed internally to the
 forums, and to the cohort admin views.
 """
 
+from collections import OrderedDict
+from django.core.cache import cache
 from django.http import Http404
 import logging
 import random
 
 from courseware import courses
+from request_cache.middleware import get_request_cache_data, get_or_compute
 from student.models import get_user_by_username_or_email
 from .models import CourseUserGroup
 
 log = logging.getLogger(__name__)
 
+# How long the cohorts of a course are kept in the shared cache, in seconds.
+# The cache is cleared when cohorts are added, deleted or given users.
+COHORT_CACHE_TIMEOUT = 60
+
 
 # tl;dr: global state is bad.  capa reseeds random every time a problem is loaded.  Even
 # if and when that's fixed, it's a good idea to have a local generator to avoid any other
@@ -32,6 +39,44 @@ def local_random():
 
     return _local_random
 
+
+def _cohort_directory_key(course_id):
+    return "course_groups.cohorts.{0}".format(course_id)
+
+
+def _get_cohort_directory(course_id):
+    """
+    Returns an OrderedDict of all the cohorts in the course, by id.  The
+    cohorts are loaded once per request, from the shared cache if they are
+    in it, so that e.g. getting the cohort of each thread in the forums
+    doesn't take a query each.
+    """
+    key = _cohort_directory_key(course_id)
+
+    def load_directory():
+        cohorts = cache.get(key)
+        if cohorts is None:
+            cohorts = list(CourseUserGroup.objects.filter(course_id=course_id,
+                                                          group_type=CourseUserGroup.COHORT))
+            cache.set(key, cohorts, COHORT_CACHE_TIMEOUT)
+        return OrderedDict((cohort.id, cohort) for cohort in cohorts)
+
+    return get_or_compute(key, load_directory)
+
+
+def _invalidate_cohort_directory(course_id):
+    """
+    Clear the cached cohorts of the course, and the cohorts of users in the
+    course that were looked up in this request.
+    """
+    key = _cohort_directory_key(course_id)
+    cache.delete(key)
+    request_cache = get_request_cache_data()
+    request_cache.pop(key, None)
+    for user_key in [k for k in request_cache if k[:2] == ('course_groups.user_cohort', course_id)]:
+        del request_cache[user_key]
+
+
 def is_course_cohorted(course_id):
     """
     Given a course id, return a boolean for whether or not the course is
@@ -125,13 +170,19 @@ def get_cohort(user, course_id):
     if not course.is_cohorted:
         return None
 
-    try:
-        return CourseUserGroup.objects.get(course_id=course_id,
-                                            group_type=CourseUserGroup.COHORT,
-                                            users__id=user.id)
-    except CourseUserGroup.DoesNotExist:
-        # Didn't find the group.  We'll go on to create one if needed.
-        pass
+    # the id of the user's cohort is kept for the rest of the request, with
+    # None if they don't have one
+    user_key = ('course_groups.user_cohort', course_id, user.id)
+    def load_cohort_id():
+        cohort_ids = CourseUserGroup.objects.filter(course_id=course_id,
+                                                    group_type=CourseUserGroup.COHORT,
+                                                    users__id=user.id).values_list('id', flat=True)
+        return cohort_ids[0] if cohort_ids else None
+
+    cohort_id = get_or_compute(user_key, load_cohort_id)
+    if cohort_id is not None:
+        return get_cohort_by_id(course_id, cohort_id)
+    # Didn't find the group.  We'll go on to create one if needed.
 
     if not course.auto_cohort:
         return None
@@ -154,6 +205,8 @@ def get_cohort(user, course_id):
         name=group_name)
 
     user.course_groups.add(group)
+    _invalidate_cohort_directory(course_id)
+    get_request_cache_data()[user_key] = group.id
     return group
 
 
@@ -168,8 +221,7 @@ def get_course_cohorts(course_id):
         A list of CourseUserGroup objects.  Empty if there are no cohorts. Does
         not check whether the course is cohorted.
     """
-    return list(CourseUserGroup.objects.filter(course_id=course_id,
-                                               group_type=CourseUserGroup.COHORT))
+    return _get_cohort_directory(course_id).values()
 
 ### Helpers for cohort management views
 
@@ -189,9 +241,13 @@ def get_cohort_by_id(course_id, cohort_id):
     Return the CourseUserGroup object for the given cohort.  Raises DoesNotExist
     it isn't present.  Uses the course_id for extra validation...
     """
-    return CourseUserGroup.objects.get(course_id=course_id,
-                                       group_type=CourseUserGroup.COHORT,
-                                       id=cohort_id)
+    try:
+        return _get_cohort_directory(course_id)[int(cohort_id)]
+    except (KeyError, ValueError):
+        # it may have been added since the cohorts were cached
+        return CourseUserGroup.objects.get(course_id=course_id,
+                                           group_type=CourseUserGroup.COHORT,
+                                           id=cohort_id)
 
 
 def add_cohort(course_id, name):
@@ -205,9 +261,11 @@ def add_cohort(course_id, name):
                                       name=name).exists():
         raise ValueError("Can't create two cohorts with the same name")
 
-    return CourseUserGroup.objects.create(course_id=course_id,
-                                          group_type=CourseUserGroup.COHORT,
-                                          name=name)
+    cohort = CourseUserGroup.objects.create(course_id=course_id,
+                                            group_type=CourseUserGroup.COHORT,
+                                            name=name)
+    _invalidate_cohort_directory(course_id)
+    return cohort
 
 
 class CohortConflict(Exception):
@@ -253,6 +311,7 @@ def add_user_to_cohort(cohort, username_or_email):
                                          course_cohorts[0].name))
 
     cohort.users.add(user)
+    _invalidate_cohort_directory(cohort.course_id)
     return user
 
 
@@ -274,3 +333,4 @@ def delete_empty_cohort(course_id, name):
                 name, course_id))
 
     cohort.delete()
+    _invalidate_cohort_directory(course_id)
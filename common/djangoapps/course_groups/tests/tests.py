@@ -1,12 +1,15 @@
 import django.test
 from django.contrib.auth.models import User
 from django.conf import settings
+from django.core.cache import cache
 
 from django.test.utils import override_settings
 
 from course_groups.models import CourseUserGroup
 from course_groups.cohorts import (get_cohort, get_course_cohorts,
-                                   is_commentable_cohorted, get_cohort_by_name)
+                                   is_commentable_cohorted, get_cohort_by_name,
+                                   get_cohort_by_id, add_cohort, add_user_to_cohort)
+from request_cache.middleware import RequestCache
 
 from xmodule.modulestore.django import modulestore, _MODULESTORES
 
@@ -86,6 +89,10 @@ class TestCohorts(django.test.TestCase):
         # to course.  We don't have a course.clone() method.
         _MODULESTORES.clear()
 
+        # the cohorts are cached, and the database isn't kept between tests
+        cache.clear()
+        RequestCache().clear_request_cache()
+
     def test_get_cohort(self):
         """
         Make sure get_cohort() does the right thing when the course is cohorted
@@ -255,3 +262,47 @@ class TestCohorts(django.test.TestCase):
         self.assertTrue(
             is_commentable_cohorted(course.id, to_id("Feedback")),
             "Feedback was listed as cohorted.  Should be.")
+
+    def test_cohorts_cached(self):
+        course_id = 'a/b/c'
+        cohort1 = add_cohort(course_id, "TestCohort")
+        cohort2 = add_cohort(course_id, "TestCohort2")
+
+        # all the cohorts of the course are loaded at once
+        with self.assertNumQueries(1):
+            self.assertEqual(get_cohort_by_id(course_id, cohort1.id).name, "TestCohort")
+            self.assertEqual(get_cohort_by_id(course_id, str(cohort2.id)).name, "TestCohort2")
+            self.assertEqual(len(get_course_cohorts(course_id)), 2)
+
+        # and kept in the shared cache between requests
+        RequestCache().clear_request_cache()
+        with self.assertNumQueries(0):
+            self.assertEqual(len(get_course_cohorts(course_id)), 2)
+
+        # adding a cohort clears the cache
+        add_cohort(course_id, "TestCohort3")
+        self.assertEqual(sorted(c.name for c in get_course_cohorts(course_id)),
+                         ["TestCohort", "TestCohort2", "TestCohort3"])
+
+        # a cohort that isn't cached yet is still found
+        cohort4 = CourseUserGroup.objects.create(name="TestCohort4",
+                                                 course_id=course_id,
+                                                 group_type=CourseUserGroup.COHORT)
+        self.assertEqual(get_cohort_by_id(course_id, cohort4.id).name, "TestCohort4")
+        self.assertRaises(CourseUserGroup.DoesNotExist, get_cohort_by_id, course_id, 12345)
+
+    def test_user_cohort_cached(self):
+        course = modulestore().get_course("edX/toy/2012_Fall")
+        self.config_course_cohorts(course, [], cohorted=True)
+        user = User.objects.create(username="test", email="a@b.com")
+        cohort = add_cohort(course.id, "TestCohort")
+
+        self.assertIsNone(get_cohort(user, course.id))
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_cohort(user, course.id))
+
+        # adding the user to a cohort clears the cached cohort of the user
+        add_user_to_cohort(cohort, "test")
+        self.assertEqual(get_cohort(user, course.id).id, cohort.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cohort(user, course.id).id, cohort.id)
@@ -1,4 +1,5 @@
 import logging
+import os
 
 from django.conf import settings
 from django.template.base import TemplateDoesNotExist
@@ -6,12 +7,32 @@ from django.template.loader import make_origin, get_template_from_string
 from django.template.loaders.filesystem import Loader as FilesystemLoader
 from django.template.loaders.app_directories import Loader as AppDirectoriesLoader
 
+from mitxmako.middleware import precompiled_directory
 from mitxmako.template import Template
 
 import tempdir
 
 log = logging.getLogger(__name__)
 
+# the directory of the precompiled templates (see precompiled_directory), or None
+# if they haven't been precompiled.  It is only looked for once per process.
+_precompiled_directory = []
+
+
+def get_precompiled_directory():
+    """
+    Returns the directory that the compile_mako_templates command compiled the
+    templates in settings.MAKO_TEMPLATES into, or None if there isn't one
+    """
+    if not _precompiled_directory:
+        directory = None
+        if getattr(settings, 'MAKO_PRECOMPILED_DIR', None) is not None:
+            directory = precompiled_directory(settings.MAKO_TEMPLATES)
+            if not os.path.isdir(directory):
+                directory = None
+        _precompiled_directory.append(directory)
+    return _precompiled_directory[0]
+
 
 class MakoLoader(object):
     """
@@ -34,7 +55,6 @@ class MakoLoader(object):
 
         self.module_directory = module_directory
 
-
     def __call__(self, template_name, template_dirs=None):
         return self.load_template(template_name, template_dirs)
 
@@ -44,7 +64,7 @@ class MakoLoader(object):
         if source.startswith("## mako\n"):
             # This is a mako template
             template = Template(filename=file_path,
-                                module_directory=self.module_directory,
+                                module_directory=self.get_module_directory(template_name, file_path),
                                 input_encoding='utf-8',
                                 output_encoding='utf-8',
                                 uri=template_name)
@@ -62,6 +82,28 @@ class MakoLoader(object):
                 # not exist.
                 return source, file_path
 
+    def get_module_directory(self, template_name, file_path):
+        """
+        Returns the directory to load the compiled template `template_name`, found
+        at `file_path`, from.  That is where the compile_mako_templates command
+        compiled it, if the template is the one that MakoMiddleware finds under
+        that name in one of the namespaces of settings.MAKO_TEMPLATES, and
+        MAKO_MODULE_DIR otherwise.
+        """
+        directory = get_precompiled_directory()
+        if directory is None:
+            return self.module_directory
+
+        # as mako.template.Template names the module of a template
+        module_name = os.path.normpath(template_name).lstrip('/') + '.py'
+        for namespace, template_dirs in settings.MAKO_TEMPLATES.items():
+            paths = [os.path.join(template_dir, template_name) for template_dir in template_dirs]
+            path = next((path for path in paths if os.path.exists(path)), None)
+            if (path is not None and os.path.samefile(path, file_path) and
+                    os.path.exists(os.path.join(directory, namespace, module_name))):
+                return os.path.join(directory, namespace)
+        return self.module_directory
+
     def load_template_source(self, template_name, template_dirs=None):
         # Just having this makes the template load as an instance, instead of a class.
         return self.base_loader.load_template_source(template_name, template_dirs)
@@ -0,0 +1,65 @@
+"""
+Compile all of the Mako templates in settings.MAKO_TEMPLATES ahead of time.
+
+The templates are compiled into a directory of settings.MAKO_PRECOMPILED_DIR
+that is named for a hash of the templates, where MakoMiddleware loads them
+from without compiling them again, so that no process has to compile them
+while serving requests.  Run this when building a release, after the
+templates (including those of the theme) are in place.
+"""
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import NoArgsCommand, CommandError
+
+from mako.exceptions import MakoException
+
+from mitxmako.middleware import make_lookup, precompiled_directory, template_files
+
+
+class Command(NoArgsCommand):
+    """
+    Management command to precompile all Mako templates.
+    """
+
+    help = "Precompile all Mako templates into MAKO_PRECOMPILED_DIR."
+
+    def handle_noargs(self, **options):
+        if getattr(settings, 'MAKO_PRECOMPILED_DIR', None) is None:
+            raise CommandError("Set MAKO_PRECOMPILED_DIR to the directory to compile the templates into")
+
+        template_locations = settings.MAKO_TEMPLATES
+        directory = precompiled_directory(template_locations)
+        if os.path.isdir(directory):
+            self.stdout.write("The templates are already compiled in {0}\n".format(directory))
+            return
+
+        if not os.path.isdir(settings.MAKO_PRECOMPILED_DIR):
+            os.makedirs(settings.MAKO_PRECOMPILED_DIR)
+
+        # Compile next to the final directory, and move it into place when
+        # done, so that no process ever uses a partly compiled directory
+        working_directory = tempfile.mkdtemp(dir=settings.MAKO_PRECOMPILED_DIR)
+        try:
+            compiled = 0
+            for namespace, directories in template_locations.items():
+                lookup = make_lookup(directories, os.path.join(working_directory, namespace))
+                for uri, path in template_files(directories):
+                    try:
+                        lookup.get_template(uri)
+                        compiled += 1
+                    except (MakoException, UnicodeError) as error:
+                        # The template directories also hold Django templates
+                        # and other files that aren't Mako templates
+                        self.stderr.write("Skipping {0}: {1}\n".format(path, error))
+            os.chmod(working_directory, 0755)
+            os.rename(working_directory, directory)
+        except:
+            shutil.rmtree(working_directory, ignore_errors=True)
+            # another build may have compiled the same templates meanwhile
+            if not os.path.isdir(directory):
+                raise
+
+        self.stdout.write("Compiled {0} templates into {1}\n".format(compiled, directory))
@@ -12,33 +12,109 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import hashlib
+import logging
+import os
+
 from mako.lookup import TemplateLookup
 import tempdir
 from django.template import RequestContext
 from django.conf import settings
 
+log = logging.getLogger(__name__)
+
 requestcontext = None
 lookup = {}
 
 
+def template_files(directories):
+    """
+    Yields (uri, path) for each file in the template directories, in the
+    order that a TemplateLookup over them searches.  A uri found in an
+    earlier directory hides the same uri in later ones.
+    """
+    seen = set()
+    for directory in directories:
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for filename in sorted(files):
+                path = os.path.join(root, filename)
+                uri = os.path.relpath(path, directory).replace(os.sep, '/')
+                if uri not in seen:
+                    seen.add(uri)
+                    yield uri, path
+
+
+def templates_version(template_locations):
+    """
+    Returns a hash of the names and contents of all the templates in
+    template_locations (a dict of namespace to directories, like
+    settings.MAKO_TEMPLATES), which names the directory of the templates
+    precompiled from them
+    """
+    sha = hashlib.sha1()
+    for namespace in sorted(template_locations):
+        sha.update(namespace + '\0')
+        for uri, path in template_files(template_locations[namespace]):
+            if isinstance(uri, unicode):
+                uri = uri.encode('utf-8')
+            with open(path, 'rb') as template_file:
+                sha.update(uri + '\0' + template_file.read() + '\0')
+    return sha.hexdigest()
+
+
+def precompiled_directory(template_locations):
+    """
+    Returns the directory in settings.MAKO_PRECOMPILED_DIR that the
+    compile_mako_templates command compiles the current templates into
+    """
+    return os.path.join(settings.MAKO_PRECOMPILED_DIR, templates_version(template_locations))
+
+
+def make_lookup(directories, module_directory, filesystem_checks=True):
+    """
+    Returns the TemplateLookup for the templates in directories, which
+    compiles them into module_directory
+    """
+    return TemplateLookup(directories=directories,
+                          module_directory=module_directory,
+                          filesystem_checks=filesystem_checks,
+                          output_encoding='utf-8',
+                          input_encoding='utf-8',
+                          default_filters=['decode.utf8'],
+                          encoding_errors='replace',
+                          )
+
+
 class MakoMiddleware(object):
     def __init__(self):
         """Setup mako variables and lookup object"""
         # Set all mako variables based on django settings
         template_locations = settings.MAKO_TEMPLATES
         module_directory = getattr(settings, 'MAKO_MODULE_DIR', None)
+        filesystem_checks = True
 
         if module_directory is None:
             module_directory = tempdir.mkdtemp_clean()
 
+        # Use the templates that were compiled for this version of them, if
+        # there are any.  They don't change while we run.
+        if getattr(settings, 'MAKO_PRECOMPILED_DIR', None) is not None:
+            directory = precompiled_directory(template_locations)
+            if os.path.isdir(directory):
+                module_directory = directory
+                filesystem_checks = False
+            else:
+                log.warning("Mako templates haven't been precompiled into %s, compiling them on demand", directory)
+
         for location in template_locations:
-            lookup[location] = TemplateLookup(directories=template_locations[location],
-                                module_directory=module_directory,
-                                output_encoding='utf-8',
-                                input_encoding='utf-8',
-                                default_filters=['decode.utf8'],
-                                encoding_errors='replace',
-                                )
+            # Each namespace has its own modules, as the same uri can name
+            # different templates in different namespaces
+            lookup[location] = make_lookup(
+                template_locations[location],
+                os.path.join(module_directory, location),
+                filesystem_checks,
+            )
 
         import mitxmako
         mitxmako.lookup = lookup
@@ -1,7 +1,13 @@
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
 from django.test import TestCase
 from django.test.utils import override_settings
 from django.core.urlresolvers import reverse
 from mitxmako.shortcuts import marketing_link
+from mitxmako import middleware
 from mock import patch
 from util.testing import UrlResetMixin
 
@@ -24,3 +30,54 @@ class ShortcutsTests(UrlResetMixin, TestCase):
             expected_link = reverse('login')
             link = marketing_link('ABOUT')
             self.assertEquals(link, expected_link)
+
+
+class PrecompiledTemplatesTests(TestCase):
+    """
+    Test compiling the Mako templates ahead of time
+    """
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.templates = os.path.join(self.root, 'templates')
+        self.overrides = os.path.join(self.root, 'overrides')
+        self.write(self.templates, 'hello.html', 'Hello ${name}')
+        self.write(self.templates, 'nested/page.html', '<%include file="/hello.html"/>!')
+        self.write(self.overrides, 'hello.html', 'Hi ${name}')
+        self.template_locations = {'main': [self.overrides, self.templates]}
+        self.precompiled = os.path.join(self.root, 'precompiled')
+
+    def write(self, directory, uri, text):
+        path = os.path.join(directory, uri)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as template_file:
+            template_file.write(text)
+
+    def test_template_files(self):
+        self.assertEquals(
+            [(uri, path) for uri, path in middleware.template_files([self.overrides, self.templates])],
+            [
+                ('hello.html', os.path.join(self.overrides, 'hello.html')),
+                ('nested/page.html', os.path.join(self.templates, 'nested', 'page.html')),
+            ]
+        )
+
+    def test_version_changes_with_templates(self):
+        version = middleware.templates_version(self.template_locations)
+        self.assertEquals(version, middleware.templates_version(self.template_locations))
+        self.write(self.templates, 'nested/page.html', 'changed')
+        self.assertNotEquals(version, middleware.templates_version(self.template_locations))
+
+    def test_compile_and_load(self):
+        with override_settings(MAKO_TEMPLATES=self.template_locations, MAKO_PRECOMPILED_DIR=self.precompiled):
+            call_command('compile_mako_templates')
+            directory = middleware.precompiled_directory(self.template_locations)
+            self.assertTrue(os.path.isfile(os.path.join(directory, 'main', 'nested', 'page.html.py')))
+
+            with patch.dict(middleware.lookup, clear=True):
+                middleware.MakoMiddleware()
+                lookup = middleware.lookup['main']
+                self.assertEquals(lookup.module_directory, os.path.join(directory, 'main'))
+                self.assertFalse(lookup.filesystem_checks)
+                self.assertEquals(lookup.get_template('nested/page.html').render(name='there'), 'Hi there!')
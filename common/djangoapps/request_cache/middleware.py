@@ -17,4 +17,27 @@ class RequestCache(object):
 
     def process_response(self, request, response):
         self.clear_request_cache()
-        return response
\ No newline at end of file
+        return response
+
+
+def get_request_cache_data():
+    """
+    Returns the dict of the request cache, which is cleared at the start and
+    end of each request.
+    """
+    request_cache = RequestCache.get_request_cache()
+    if not hasattr(request_cache, 'data'):
+        # the request cache is thread local, and only set up in the thread that imports it
+        request_cache.data = {}
+    return request_cache.data
+
+
+def get_or_compute(key, compute):
+    """
+    Returns the value of key in the request cache, calling compute() to get it
+    and keep it for the rest of the request if it isn't there yet.
+    """
+    data = get_request_cache_data()
+    if key not in data:
+        data[key] = compute()
+    return data[key]
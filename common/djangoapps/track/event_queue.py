@@ -0,0 +1,115 @@
+"""
+A bounded in-process queue of tracking events, written in batches by a background thread.
+
+Requests serialize their events and put them on the queue, so that writing them to the
+tracking log and the TrackingLog table is not part of the request.  When the
+queue is full, a request waits up to settings.TRACK_QUEUE_TIMEOUT seconds for the writer to
+catch up, and then drops the event.  Dropped events are counted in `dropped` and in the
+track.events.dropped metric.
+"""
+import atexit
+import logging
+import os
+import threading
+import Queue
+
+from django.conf import settings
+from django.db import connection
+from dogapi import dog_stats_api
+
+log = logging.getLogger(__name__)
+
+
+class EventQueue(object):
+    """
+    Queue of tracking events that are written by calling `write` in a background thread,
+    with lists of up to settings.TRACK_QUEUE_BATCH_SIZE events.
+    """
+    def __init__(self, write):
+        self.write = write
+        self.queue = None
+        self.dropped = 0
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def put(self, event):
+        """
+        Queues `event` to be written, and returns True, or returns False if the event was
+        dropped because the queue was full.
+        """
+        self._start()
+        try:
+            self.queue.put(event, timeout=settings.TRACK_QUEUE_TIMEOUT)
+        except Queue.Full:
+            with self._lock:
+                self.dropped += 1
+                dropped = self.dropped
+            dog_stats_api.increment('track.events.dropped')
+            if dropped % 1000 == 1:
+                log.warning("Tracking event queue is full, %d events dropped so far", dropped)
+            return False
+        return True
+
+    def write_pending(self):
+        """
+        Writes the events that are still queued, in the calling thread.  This is done when
+        the process exits.
+        """
+        if self.queue is None:
+            return
+        while True:
+            events = self._get_batch(block=False)
+            if not events:
+                return
+            self._write_batch(events)
+
+    def _start(self):
+        """
+        Creates the queue and starts the writer thread, if this process hasn't yet.  A process
+        forked from one that had already started gets a queue and thread of its own.
+        """
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is None:
+                atexit.register(self.write_pending)
+            self.queue = Queue.Queue(settings.TRACK_QUEUE_SIZE)
+            thread = threading.Thread(target=self._run, name='track-event-writer')
+            thread.daemon = True
+            thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        """
+        Writes the queued events as they come, until the process exits.
+        """
+        while True:
+            self._write_batch(self._get_batch(block=True))
+            if self.queue.empty():
+                # don't hold on to a database connection while there is nothing to write
+                connection.close()
+
+    def _get_batch(self, block):
+        """
+        Returns the next settings.TRACK_QUEUE_BATCH_SIZE events or less from the queue.  If
+        `block` is set, waits until there is at least one.
+        """
+        events = []
+        try:
+            events.append(self.queue.get(block))
+            while len(events) < settings.TRACK_QUEUE_BATCH_SIZE:
+                events.append(self.queue.get_nowait())
+        except Queue.Empty:
+            pass
+        return events
+
+    def _write_batch(self, events):
+        """
+        Writes `events`, logging rather than raising any error.
+        """
+        try:
+            self.write(events)
+        except Exception:
+            log.exception("Failed to write %d tracking events", len(events))
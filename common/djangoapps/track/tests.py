@@ -3,8 +3,10 @@ import mock
 
 from django.test import TestCase
 from django.core.urlresolvers import reverse, NoReverseMatch
+from django.test.utils import override_settings
+from track.event_queue import EventQueue
 from track.models import TrackingLog
-from track.views import user_track
+from track.views import log_event, user_track, write_events
 from nose.plugins.skip import SkipTest
 
 
@@ -58,3 +60,67 @@ class TrackingTest(TestCase):
                 self.assertEqual(log.event, request_params["event"])
                 self.assertEqual(log.event_type, request_params["event_type"])
                 self.assertEqual(log.page, request_params["page"])
+
+    def test_async_tracking_logs(self):
+        """
+        Checks that with ENABLE_ASYNC_TRACKING_LOGS, events are only queued by the request,
+        and are saved in the TrackingLog db table when the queue is written
+        """
+        request_params = {"event": "my_event", "event_type": "my_event_type", "page": "my_page"}
+        features = {'ENABLE_SQL_TRACKING_LOGS': True, 'ENABLE_ASYNC_TRACKING_LOGS': True}
+        with mock.patch.dict('django.conf.settings.MITX_FEATURES', features):
+            with mock.patch('track.views.event_queue') as mock_event_queue:
+                try:  # because /event maps to two different views in lms and cms, we're only going to test lms here
+                    response = self.client.post(reverse(user_track), request_params)
+                except NoReverseMatch:
+                    raise SkipTest()
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(TrackingLog.objects.exists())
+
+            events = [call[0][0] for call in mock_event_queue.put.call_args_list]
+            write_events(events * 2)
+            tracking_logs = TrackingLog.objects.all()
+            self.assertEqual(len(tracking_logs), 2)
+            for log in tracking_logs:
+                self.assertEqual(log.event, request_params["event"])
+                self.assertEqual(log.event_type, request_params["event_type"])
+
+    def test_async_unserializable_event(self):
+        """
+        Checks that with ENABLE_ASYNC_TRACKING_LOGS, an event that can't be serialized
+        raises in the caller, and isn't queued
+        """
+        event = {"event": object(), "time": "2013-08-01T00:00:00+00:00"}
+        with mock.patch.dict('django.conf.settings.MITX_FEATURES', {'ENABLE_ASYNC_TRACKING_LOGS': True}):
+            with mock.patch('track.views.event_queue') as mock_event_queue:
+                with self.assertRaises(TypeError):
+                    log_event(event)
+        self.assertFalse(mock_event_queue.put.called)
+
+
+@override_settings(TRACK_QUEUE_SIZE=3, TRACK_QUEUE_BATCH_SIZE=2, TRACK_QUEUE_TIMEOUT=0)
+@mock.patch('track.event_queue.threading.Thread')
+class EventQueueTest(TestCase):
+    """
+    Tests of the queue of tracking events, with no writer thread
+    """
+
+    def test_batches(self, _mock_thread):
+        write = mock.Mock()
+        event_queue = EventQueue(write)
+        for event in ['a', 'b', 'c']:
+            self.assertTrue(event_queue.put(event))
+        event_queue.write_pending()
+        self.assertEqual(write.call_args_list, [mock.call(['a', 'b']), mock.call(['c'])])
+
+    def test_drops_when_full(self, _mock_thread):
+        write = mock.Mock()
+        event_queue = EventQueue(write)
+        self.assertEqual([event_queue.put(event) for event in ['a', 'b', 'c', 'd', 'e']],
+                         [True, True, True, False, False])
+        self.assertEqual(event_queue.dropped, 2)
+
+        # a failed write doesn't stop the events after it from being written
+        write.side_effect = [Exception('write failed'), None]
+        event_queue.write_pending()
+        self.assertEqual(write.call_args_list, [mock.call(['a', 'b']), mock.call(['c'])])
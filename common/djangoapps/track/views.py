@@ -11,6 +11,7 @@ from django.conf import settings
 from mitxmako.shortcuts import render_to_response
 
 from django_future.csrf import ensure_csrf_cookie
+from track.event_queue import EventQueue
 from track.models import TrackingLog
 from pytz import UTC
 
@@ -19,17 +20,58 @@ log = logging.getLogger("tracking")
 LOGFIELDS = ['username', 'ip', 'event_source', 'event_type', 'event', 'agent', 'page', 'time', 'host']
 
 
-def log_event(event):
-    """Write tracking event to log file, and optionally to TrackingLog model."""
-    event_str = json.dumps(event)
-    log.info(event_str[:settings.TRACK_MAX_EVENT])
+def serialize_event(event):
+    """
+    Returns the log file line for a tracking event, and its unsaved TrackingLog entry, or
+    None if MITX_FEATURES['ENABLE_SQL_TRACKING_LOGS'] isn't set.  These are what write_events
+    writes.  An event that can't be serialized raises here, in the caller of log_event.
+    """
+    event_str = json.dumps(event)[:settings.TRACK_MAX_EVENT]
+    tldat = None
     if settings.MITX_FEATURES.get('ENABLE_SQL_TRACKING_LOGS'):
-        event['time'] = dateutil.parser.parse(event['time'])
         tldat = TrackingLog(**dict((x, event[x]) for x in LOGFIELDS))
+        tldat.time = dateutil.parser.parse(event['time'])
+        # convert the event as saving it would, so that later changes to it aren't logged
+        tldat.event = TrackingLog._meta.get_field('event').get_prep_value(tldat.event)
+    return event_str, tldat
+
+
+def write_events(events):
+    """
+    Write a list of tracking events, as returned by serialize_event, to log file, and
+    optionally to TrackingLog model, with one INSERT for all of them.
+    """
+    for event_str, _tldat in events:
+        log.info(event_str)
+    records = [tldat for _event_str, tldat in events if tldat is not None]
+    if records:
         try:
-            tldat.save()
+            TrackingLog.objects.bulk_create(records)
         except Exception as err:
             log.exception(err)
+            # save the events that can be saved one at a time
+            for tldat in records:
+                try:
+                    tldat.save()
+                except Exception as err:
+                    log.exception(err)
+
+
+event_queue = EventQueue(write_events)
+
+
+def log_event(event):
+    """
+    Write tracking event to log file, and optionally to TrackingLog model.
+
+    If MITX_FEATURES['ENABLE_ASYNC_TRACKING_LOGS'] is set, the event is written later
+    with other events, by a background thread (see track.event_queue).
+    """
+    serialized_event = serialize_event(event)
+    if settings.MITX_FEATURES.get('ENABLE_ASYNC_TRACKING_LOGS'):
+        event_queue.put(serialized_event)
+    else:
+        write_events([serialized_event])
 
 
 def user_track(request):
@@ -67,6 +67,23 @@ def replace_static_urls(get_html, data_dir, course_namespace=None):
     return _get_html
 
 
+def cache_html(get_html, cache, key, timeout):
+    """
+    Updates the supplied module with a new get_html function that returns
+    the html cached under key in cache, if there is any, and otherwise
+    caches the html returned by the old get_html function for timeout seconds
+    """
+
+    @wraps(get_html)
+    def _get_html():
+        html = cache.get(key)
+        if html is None:
+            html = get_html()
+            cache.set(key, html, timeout)
+        return html
+    return _get_html
+
+
 def grade_histogram(module_id):
     ''' Print out a histogram of grades on a given problem.
         Part of staff member debug info.
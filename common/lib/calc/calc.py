@@ -168,7 +168,7 @@ def parallel(parse_result):
     Return NaN if there is a zero among the inputs
     """
     # convert from pyparsing.ParseResults, which doesn't support '0 in parse_result'
-    parse_result = parse_result.asList()
+    parse_result = list(parse_result)
     if len(parse_result) == 1:
         return parse_result[0]
     if 0 in parse_result:
@@ -215,33 +215,88 @@ def prod_parse_action(parse_result):
     return prod
 
 
-def evaluator(variables, functions, string, cs=False):
+# Parsing an expression is much slower than evaluating it, and the same
+# expressions are evaluated many times (e.g. for each sample of a
+# FormulaResponse), so both the grammars and the parsed expressions are cached.
+# The caches are emptied when they reach these sizes.
+MAX_CACHED_GRAMMARS = 100
+MAX_CACHED_EXPRESSIONS = 1000
+
+_grammar_cache = {}
+_expression_cache = {}
+
+
+def _cache_set(cache, max_size, key, value):
     """
-    Evaluate an expression. Variables are passed as a dictionary
-    from string to value. Unary functions are passed as a dictionary
-    from string to function. Variables must be floats.
-    cs: Case sensitive
+    Store `value` in `cache`, emptying it first if it is full
+    """
+    if len(cache) >= max_size:
+        cache.clear()
+    cache[key] = value
+
 
+def _evaluate_tokens(tokens, variables, functions):
     """
+    Evaluate the parsed tokens that are expressions, leaving operators
+    and numbers as they are.
+    """
+    return [token(variables, functions) if callable(token) else token for token in tokens]
 
-    all_variables = copy.copy(DEFAULT_VARIABLES)
-    all_functions = copy.copy(DEFAULT_FUNCTIONS)
-    all_variables.update(variables)
-    all_functions.update(functions)
 
-    if not cs:
-        string_cs = string.lower()
-        all_functions = lower_dict(all_functions)
-        all_variables = lower_dict(all_variables)
-        CasedLiteral = CaselessLiteral
-    else:
-        string_cs = string
-        CasedLiteral = Literal
+def deferred_action(action):
+    """
+    Wrap a parse action, so that rather than computing the value of the parse
+    results, it returns a function that computes it from the variables and
+    functions it is given.  This lets an expression be parsed once, and
+    evaluated many times.
+    """
+    def parse_action(parse_result):
+        tokens = list(parse_result)
 
-    check_variables(string_cs, set(all_variables.keys() + all_functions.keys()))
+        def evaluate(variables, functions):
+            return action(_evaluate_tokens(tokens, variables, functions))
+        return evaluate
+    return parse_action
+
+
+def variable_parse_action(parse_result):
+    """
+    Returns functions that look up the values of the variables
+    """
+    def lookup(name):
+        return lambda variables, functions: variables[name]
+    return [lookup(name) for name in parse_result]
+
+
+def function_parse_action(parse_result):
+    """
+    Returns a function that calls the function on its (evaluated) argument
+    """
+    name, argument = parse_result
+
+    def evaluate(variables, functions):
+        return functions[name](_evaluate_tokens([argument], variables, functions)[0])
+    return evaluate
+
+
+def _grammar_key(variable_names, function_names, cs):
+    """
+    The key of the grammar for these names in the caches
+    """
+    return (tuple(sorted(variable_names)), tuple(sorted(function_names)), cs)
 
-    if string.strip() == "":
-        return float('nan')
+
+def get_grammar(variable_names, function_names, cs):
+    """
+    Returns the pyparsing grammar for expressions that may use the given
+    variable and function names.  Its parse results are functions that
+    evaluate the expression, see deferred_action.
+    """
+    key = _grammar_key(variable_names, function_names, cs)
+    if key in _grammar_cache:
+        return _grammar_cache[key]
+
+    CasedLiteral = Literal if cs else CaselessLiteral
 
     # SI suffixes and percent
     number_suffix = MatchFirst([Literal(k) for k in SUFFIXES.keys()])
@@ -268,34 +323,80 @@ def evaluator(variables, functions, string, cs=False):
     #  E.g. if we have {'R':0.5}, we make the substitution.
     # We sort the list so that var names (like "e2") match before
     # mathematical constants (like "e"). This is kind of a hack.
-    all_variables_keys = sorted(all_variables.keys(), key=len, reverse=True)
+    all_variables_keys = sorted(variable_names, key=len, reverse=True)
     varnames = MatchFirst([CasedLiteral(k) for k in all_variables_keys])
-    varnames.setParseAction(
-        lambda x: [all_variables[k] for k in x]
-    )
+    varnames.setParseAction(variable_parse_action)
 
     # if all_variables were empty, then pyparsing wants
     # varnames = NoMatch()
     # this is not the case, as all_variables contains the defaults
 
     # Same thing for functions.
-    all_functions_keys = sorted(all_functions.keys(), key=len, reverse=True)
+    all_functions_keys = sorted(function_names, key=len, reverse=True)
     funcnames = MatchFirst([CasedLiteral(k) for k in all_functions_keys])
     function = funcnames + Suppress("(") + expr + Suppress(")")
-    function.setParseAction(
-        lambda x: [all_functions[x[0]](x[1])]
-    )
+    function.setParseAction(function_parse_action)
 
     atom = number | function | varnames | Suppress("(") + expr + Suppress(")")
 
     # Do the following in the correct order to preserve order of operation
     pow_term = atom + ZeroOrMore(Suppress("^") + atom)
-    pow_term.setParseAction(exp_parse_action)  # 7^6
+    pow_term.setParseAction(deferred_action(exp_parse_action))  # 7^6
     par_term = pow_term + ZeroOrMore(Suppress('||') + pow_term)  # 5k || 4k
-    par_term.setParseAction(parallel)
+    par_term.setParseAction(deferred_action(parallel))
     prod_term = par_term + ZeroOrMore(times_div + par_term)  # 7 * 5 / 4 - 3
-    prod_term.setParseAction(prod_parse_action)
+    prod_term.setParseAction(deferred_action(prod_parse_action))
     sum_term = Optional(plus_minus) + prod_term + ZeroOrMore(plus_minus + prod_term)  # -5 + 4 - 3
-    sum_term.setParseAction(sum_parse_action)
+    sum_term.setParseAction(deferred_action(sum_parse_action))
     expr << sum_term  # finish the recursion
-    return (expr + stringEnd).parseString(string)[0]
+
+    grammar = expr + stringEnd
+    _cache_set(_grammar_cache, MAX_CACHED_GRAMMARS, key, grammar)
+    return grammar
+
+
+def parse_expression(string, variable_names, function_names, cs=False):
+    """
+    Parse an expression that may use the given variable and function names.
+    (If not `cs`, the names must be lowercase.)
+
+    Returns a function that evaluates the expression; it is called with a
+    dictionary of the values of the variables, and a dictionary of the
+    functions.  Evaluating it with the dictionaries passed to evaluator()
+    gives the same result as evaluator().
+    """
+    key = (string, _grammar_key(variable_names, function_names, cs))
+    if key not in _expression_cache:
+        grammar = get_grammar(variable_names, function_names, cs)
+        _cache_set(_expression_cache, MAX_CACHED_EXPRESSIONS, key, grammar.parseString(string)[0])
+    return _expression_cache[key]
+
+
+def evaluator(variables, functions, string, cs=False):
+    """
+    Evaluate an expression. Variables are passed as a dictionary
+    from string to value. Unary functions are passed as a dictionary
+    from string to function. Variables must be floats.
+    cs: Case sensitive
+
+    """
+
+    all_variables = copy.copy(DEFAULT_VARIABLES)
+    all_functions = copy.copy(DEFAULT_FUNCTIONS)
+    all_variables.update(variables)
+    all_functions.update(functions)
+
+    if not cs:
+        string_cs = string.lower()
+        all_functions = lower_dict(all_functions)
+        all_variables = lower_dict(all_variables)
+    else:
+        string_cs = string
+
+    check_variables(string_cs, set(all_variables.keys() + all_functions.keys()))
+
+    if string.strip() == "":
+        return float('nan')
+
+    expression = parse_expression(string, all_variables.keys(), all_functions.keys(), cs)
+    return expression(all_variables, all_functions)
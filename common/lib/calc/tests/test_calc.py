@@ -5,6 +5,7 @@ Unit tests for calc.py
 import unittest
 import numpy
 import calc
+from mock import patch
 from pyparsing import ParseException
 
 
@@ -474,3 +475,33 @@ class EvaluatorTest(unittest.TestCase):
                           {'r1': 5}, {}, "r1+r2")
         self.assertRaises(calc.UndefinedVariable, calc.evaluator,
                           variables, {}, "r1*r3", cs=True)
+
+    def test_cached_expressions(self):
+        """
+        The same expression with different variable values
+        """
+        variables = {'x': 1.0, 'y': 2.0}
+        self.assertEqual(calc.evaluator(variables, {}, 'x+y'), 3.0)
+        variables['x'] = 5.0
+        self.assertEqual(calc.evaluator(variables, {}, 'x+y'), 7.0)
+
+        # the expression is only parsed once
+        with patch('calc.get_grammar', side_effect=AssertionError):
+            self.assertEqual(calc.evaluator({'x': 2.0, 'y': 3.0}, {}, 'x+y'), 5.0)
+
+        # different variable and function names mean a different grammar
+        self.assertEqual(calc.evaluator({'x': 1.0, 'xy': 2.0}, {}, 'xy'), 2.0)
+        self.assertEqual(calc.evaluator({'x': 1.0}, {'y': lambda x: -x}, 'y(x)'), -1.0)
+        self.assertRaises(calc.UndefinedVariable, calc.evaluator, {'x': 1.0, 'y': 2.0}, {}, 'X+y', cs=True)
+
+    def test_parse_expression(self):
+        """
+        Parse an expression once, and evaluate it many times
+        """
+        functions = dict(calc.DEFAULT_FUNCTIONS)
+        variables = dict(calc.DEFAULT_VARIABLES)
+        expression = calc.parse_expression('2*x^2 || 1k', variables.keys() + ['x'], functions.keys(), cs=True)
+        for value in [0.5, 1.0, 30.0]:
+            variables['x'] = value
+            self.assertAlmostEqual(expression(variables, functions),
+                                   calc.evaluator({'x': value}, {}, '2*x^2 || 1k', cs=True))
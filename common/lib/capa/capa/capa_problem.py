@@ -31,6 +31,7 @@ import capa.xqueue_interface as xqueue_interface
 # to be replaced with auto-registering
 import capa.responsetypes as responsetypes
 from capa.safe_exec import safe_exec
+from capa.safe_exec.context_cache import ScriptContextCache
 
 # dict of tagname, Response Class -- this should come from auto-registering
 response_tag_dict = dict([(x.response_tag, x) for x in responsetypes.__all__])
@@ -52,6 +53,40 @@ html_problem_semantics = ["codeparam", "responseparam", "answer", "script", "hin
 
 log = logging.getLogger(__name__)
 
+
+def get_max_score_from_xml(problem_text):
+    '''
+    Return the maximum score of the problem defined by problem_text, as
+    LoncapaProblem.get_max_score() would compute it, but without building the
+    LoncapaProblem. In particular, the problem's scripts are not executed.
+
+    Returns None if the max score can't be determined this way: if the problem
+    doesn't parse, if it would fail to build, or if it <include>s other files
+    (which can change without the problem text changing).
+    '''
+    problem_text = re.sub(r"startouttext\s*/", "text", problem_text)
+    problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
+    try:
+        tree = etree.XML(problem_text)
+    except (etree.XMLSyntaxError, ValueError):
+        return None
+
+    if tree.find('.//include') is not None:
+        return None
+
+    # find the input fields of each response, as LoncapaProblem._preprocess_problem does
+    input_tags = inputtypes.registry.registered_tags()
+    max_score = 0
+    for response in tree.xpath('//' + "|//".join(response_tag_dict)):
+        inputfields = response.xpath("|".join(['.//' + x for x in (input_tags + solution_tags)]))
+        response_max_score = response_tag_dict[response.tag].get_static_max_score(response, inputfields)
+        if response_max_score is None:
+            return None
+        max_score += response_max_score
+
+    return max_score
+
+
 #-----------------------------------------------------------------------------
 # main class for this module
 
@@ -85,6 +120,7 @@ class LoncapaProblem(object):
         self.do_reset()
         self.problem_id = id
         self.system = system
+        self.initial_context = None
         if self.system is None:
             raise Exception()
 
@@ -166,6 +202,33 @@ class LoncapaProblem(object):
                 'input_state': self.input_state,
                 'done': self.done}
 
+    def load_state(self, state):
+        '''
+        Replace the student's state of this problem with `state` (as returned by get_state),
+        so that one LoncapaProblem can grade the answers of many students, without parsing the
+        problem and running its scripts for each of them.
+
+        The state must be for the same seed.  This must be called before the problem grades
+        any answers, since grading can change the script context, which is restored here.
+        '''
+        if state.get('seed', self.seed) != self.seed:
+            raise ValueError("Cannot load the state of seed {0} into a problem with seed {1}".format(
+                state.get('seed'), self.seed))
+
+        if self.initial_context is None:
+            self.initial_context = deepcopy(self.context)
+        else:
+            # the responders share the context, so it's updated in place
+            self.context.clear()
+            self.context.update(deepcopy(self.initial_context))
+
+        self.do_reset()
+        self.student_answers = state.get('student_answers', {})
+        if 'correct_map' in state:
+            self.correct_map.set_dict(state['correct_map'])
+        self.done = state.get('done', False)
+        self.input_state = state.get('input_state', {})
+
     def get_max_score(self):
         '''
         Return the maximum score for this problem.
@@ -507,7 +570,7 @@ class LoncapaProblem(object):
                     context,
                     random_seed=self.seed,
                     python_path=python_path,
-                    cache=self.system.cache,
+                    cache=ScriptContextCache(self.problem_id, self.system.cache),
                     slug=self.problem_id,
                     unsafely=self.system.can_execute_unsafe_code(),
                 )
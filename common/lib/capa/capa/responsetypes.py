@@ -194,6 +194,27 @@ class LoncapaResponse(object):
         '''
         return sum(self.maxpoints.values())
 
+    @classmethod
+    def get_static_max_score(cls, xml, inputfields):
+        '''
+        Return what get_max_score() would return for a Response built from `xml` and
+        `inputfields`, without building it (and so without executing any of the
+        problem's code).
+
+        Returns None if the Response would fail to be built from these arguments.
+        '''
+        if any(abox.tag not in cls.allowed_inputfields for abox in inputfields):
+            return None
+        if cls.max_inputfields and len(inputfields) > cls.max_inputfields:
+            return None
+        if not all(xml.get(prop) for prop in cls.required_attributes):
+            return None
+
+        try:
+            return sum(int(inputfield.get('points', '1')) for inputfield in inputfields)
+        except ValueError:
+            return None
+
     def render_html(self, renderer, response_msg=''):
         '''
         Return XHTML Element tree representation of this Response.
@@ -2055,6 +2076,13 @@ class AnnotationResponse(LoncapaResponse):
         correct_points = scoring.get('correct')
         return dict([(inputfield.get('id'), correct_points) for inputfield in self.inputfields])
 
+    @classmethod
+    def get_static_max_score(cls, xml, inputfields):
+        ''' Each input is worth the points of a correct answer, whatever its points attribute says. '''
+        if super(AnnotationResponse, cls).get_static_max_score(xml, inputfields) is None:
+            return None
+        return cls.default_scoring.get('correct') * len(inputfields)
+
     def _find_options(self, inputfield):
         ''' Returns an array of dicts where each dict represents an option. '''
         elements = inputfield.findall('./options/option')
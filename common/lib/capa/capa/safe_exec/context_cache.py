@@ -0,0 +1,99 @@
+"""
+A two-tier cache of the results of running problem scripts.
+
+LoncapaProblem runs the <script> code of a problem every time it is created,
+which means starting a sandboxed process.  The result only depends on the
+code and the random seed, so it is cached: first in a bounded, in-process
+LRU cache, and then in the cache of the ModuleSystem (which is shared between
+processes, if it is memcached).  With `rerandomize` set to "never", or to
+"per_student" (which uses a limited number of seeds), most problems are then
+created without running any code.
+
+The keys computed by safe_exec include a hash of the code, so a changed
+problem never gets the results of its earlier code.  Studio also calls
+invalidate() when a problem is saved, to drop the problem's entries from the
+in-process cache.
+"""
+from collections import OrderedDict
+import copy
+import threading
+
+from statsd import statsd
+
+# the number of script results kept in each process
+MAX_LOCAL_ENTRIES = 1000
+
+_local_cache = OrderedDict()
+_local_cache_lock = threading.Lock()
+
+
+def _local_get(key):
+    """
+    Get the value for `key` from the in-process cache, marking it as the most recently used
+    """
+    with _local_cache_lock:
+        value = _local_cache.pop(key, None)
+        if value is not None:
+            _local_cache[key] = value
+    # like values from the shared cache, each problem gets its own copy
+    return copy.deepcopy(value)
+
+
+def _local_set(key, value):
+    """
+    Set the value for `key` in the in-process cache, removing the least recently used entries if it is full
+    """
+    value = copy.deepcopy(value)
+    with _local_cache_lock:
+        _local_cache.pop(key, None)
+        _local_cache[key] = value
+        while len(_local_cache) > MAX_LOCAL_ENTRIES:
+            _local_cache.popitem(last=False)
+
+
+def invalidate(problem_id):
+    """
+    Remove the cached results of the scripts of the problem `problem_id` from this process
+    """
+    with _local_cache_lock:
+        for key in [key for key in _local_cache if key[0] == problem_id]:
+            del _local_cache[key]
+
+
+class ScriptContextCache(object):
+    """
+    The cache that LoncapaProblem passes to safe_exec, for one problem.
+
+    `problem_id` is the id of the LoncapaProblem, and `shared_cache` is the
+    cache of the ModuleSystem, or None.
+    """
+    def __init__(self, problem_id, shared_cache):
+        self.problem_id = problem_id
+        self.shared_cache = shared_cache
+
+    def get(self, key):
+        """
+        Returns the cached value for the safe_exec key `key`, or None
+        """
+        value = _local_get((self.problem_id, key))
+        if value is not None:
+            statsd.increment('capa.script_context_cache.hit', tags=['tier:local'])
+            return value
+
+        if self.shared_cache:
+            value = self.shared_cache.get(key)
+            if value is not None:
+                statsd.increment('capa.script_context_cache.hit', tags=['tier:shared'])
+                _local_set((self.problem_id, key), value)
+                return value
+
+        statsd.increment('capa.script_context_cache.miss')
+        return None
+
+    def set(self, key, value):
+        """
+        Caches `value` for the safe_exec key `key` in both tiers
+        """
+        _local_set((self.problem_id, key), value)
+        if self.shared_cache:
+            self.shared_cache.set(key, value)
@@ -0,0 +1,99 @@
+"""Test the two-tier cache of problem script results."""
+
+import unittest
+
+from mock import patch
+
+from capa.safe_exec import context_cache
+from capa.safe_exec.context_cache import ScriptContextCache
+
+
+class DictCache(object):
+    """A cache implementation over a simple dict, for testing."""
+
+    def __init__(self, d):
+        self.cache = d
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value):
+        self.cache[key] = value
+
+
+class TestScriptContextCache(unittest.TestCase):
+    """Test the in-process and shared tiers of ScriptContextCache."""
+
+    def setUp(self):
+        context_cache._local_cache.clear()
+        self.shared = {}
+
+    def test_miss_then_hit(self):
+        cache = ScriptContextCache('problem_1', DictCache(self.shared))
+        self.assertIsNone(cache.get('key'))
+
+        cache.set('key', (None, {'a': [1]}))
+        self.assertEqual(self.shared, {'key': (None, {'a': [1]})})
+
+        # even if the shared cache loses it, this process still has it
+        self.shared.clear()
+        self.assertEqual(cache.get('key'), (None, {'a': [1]}))
+
+    def test_shared_hit(self):
+        self.shared['key'] = (None, {'a': 3})
+        cache = ScriptContextCache('problem_1', DictCache(self.shared))
+        self.assertEqual(cache.get('key'), (None, {'a': 3}))
+
+        # it's in this process now
+        self.shared.clear()
+        self.assertEqual(cache.get('key'), (None, {'a': 3}))
+
+    def test_no_shared_cache(self):
+        cache = ScriptContextCache('problem_1', None)
+        cache.set('key', (None, {'a': 3}))
+        self.assertEqual(cache.get('key'), (None, {'a': 3}))
+
+    def test_values_are_copied(self):
+        cache = ScriptContextCache('problem_1', None)
+        cache.set('key', (None, {'a': [1]}))
+        cache.get('key')[1]['a'].append(2)
+        self.assertEqual(cache.get('key'), (None, {'a': [1]}))
+
+    def test_invalidate(self):
+        ScriptContextCache('problem_1', DictCache(self.shared)).set('key1', (None, {'a': 1}))
+        ScriptContextCache('problem_2', DictCache(self.shared)).set('key2', (None, {'a': 2}))
+        self.shared.clear()
+
+        context_cache.invalidate('problem_1')
+        self.assertIsNone(ScriptContextCache('problem_1', None).get('key1'))
+        self.assertIsNotNone(ScriptContextCache('problem_2', None).get('key2'))
+
+    @patch.object(context_cache, 'MAX_LOCAL_ENTRIES', 2)
+    def test_least_recently_used_is_removed(self):
+        cache = ScriptContextCache('problem_1', None)
+        cache.set('key1', (None, {'a': 1}))
+        cache.set('key2', (None, {'a': 2}))
+        cache.get('key1')
+        cache.set('key3', (None, {'a': 3}))
+
+        self.assertIsNotNone(cache.get('key1'))
+        self.assertIsNone(cache.get('key2'))
+        self.assertIsNotNone(cache.get('key3'))
+
+    @patch('capa.safe_exec.context_cache.statsd')
+    def test_metrics(self, mock_statsd):
+        self.shared['key2'] = (None, {'a': 2})
+        cache = ScriptContextCache('problem_1', DictCache(self.shared))
+        cache.get('key1')
+        cache.set('key1', (None, {'a': 1}))
+        cache.get('key1')
+        cache.get('key2')
+
+        self.assertEqual(
+            [call[0] + (call[1].get('tags'),) for call in mock_statsd.increment.call_args_list],
+            [
+                ('capa.script_context_cache.miss', None),
+                ('capa.script_context_cache.hit', ['tier:local']),
+                ('capa.script_context_cache.hit', ['tier:shared']),
+            ]
+        )
@@ -984,6 +984,24 @@ class CustomResponseTest(ResponseTest):
         self.assert_grade(problem, '42', 'correct')
         self.assert_grade(problem, '0', 'incorrect')
 
+    def test_load_state(self):
+        # One problem can rescore the answers of several students with the same seed
+        inline_script = """correct[0] = 'correct' if (answers['1_2_1'] == expect) else 'incorrect'"""
+        problem = self.build_problem(answer=inline_script, expect="42")
+
+        problem.load_state({'seed': 723, 'student_answers': {'1_2_1': '42'}, 'done': True})
+        self.assertEqual(problem.rescore_existing_answers().get_correctness('1_2_1'), 'correct')
+        self.assertEqual(problem.get_score()['score'], 1)
+
+        problem.load_state({'student_answers': {'1_2_1': '0'}, 'done': True})
+        # nothing is left in the context from grading the first student
+        self.assertNotIn('answers', problem.context)
+        self.assertEqual(problem.rescore_existing_answers().get_correctness('1_2_1'), 'incorrect')
+        self.assertEqual(problem.get_score()['score'], 0)
+
+        with self.assertRaises(ValueError):
+            problem.load_state({'seed': 1, 'student_answers': {'1_2_1': '42'}})
+
     def test_inline_message(self):
         # Inline code can update the global messages list
         # to pass messages to the CorrectMap for a particular input
@@ -1429,3 +1447,48 @@ class AnnotationResponseTest(ResponseTest):
                              msg="%s should be marked %s" % (answer_id, expected_correctness))
             self.assertEqual(expected_points, actual_points,
                              msg="%s should have %d points" % (answer_id, expected_points))
+
+
+class StaticMaxScoreTest(unittest.TestCase):
+    """
+    get_max_score_from_xml should agree with LoncapaProblem.get_max_score,
+    without building the problem.
+    """
+    from capa.tests import response_xml_factory as factories
+
+    def assert_static_max_score(self, xml):
+        from capa.capa_problem import get_max_score_from_xml
+        problem = new_loncapa_problem(xml)
+        self.assertEqual(get_max_score_from_xml(xml), problem.get_max_score())
+
+    def test_matches_loncapa_problem(self):
+        self.assert_static_max_score(
+            self.factories.MultipleChoiceResponseXMLFactory().build_xml(choices=[False, True]))
+        self.assert_static_max_score(
+            self.factories.ChoiceResponseXMLFactory().build_xml(choices=[True, False], num_responses=3))
+        self.assert_static_max_score(
+            self.factories.StringResponseXMLFactory().build_xml(answer='Michigan', num_inputs=2))
+        self.assert_static_max_score(
+            self.factories.CustomResponseXMLFactory().build_xml(
+                cfn='check_func', script='def check_func(expect, ans): return True', num_inputs=3))
+        self.assert_static_max_score(
+            self.factories.AnnotationResponseXMLFactory().build_xml(options=(('x', 'correct'),)))
+
+    def test_points_attribute(self):
+        from capa.capa_problem import get_max_score_from_xml
+        xml = textwrap.dedent("""
+            <problem>
+              <stringresponse answer="a"><textline points="3"/></stringresponse>
+              <stringresponse answer="b"><textline/></stringresponse>
+            </problem>
+        """)
+        self.assertEqual(get_max_score_from_xml(xml), 4)
+        self.assert_static_max_score(xml)
+
+    def test_unknown(self):
+        from capa.capa_problem import get_max_score_from_xml
+        self.assertIsNone(get_max_score_from_xml('<problem><stringresponse'))
+        self.assertIsNone(get_max_score_from_xml('<problem><include file="foo.xml"/></problem>'))
+        # <numericalresponse> only allows a single input
+        self.assertIsNone(get_max_score_from_xml(
+            '<problem><numericalresponse answer="1"><textline/><textline/></numericalresponse></problem>'))
@@ -10,10 +10,11 @@ import sys
 
 from pkg_resources import resource_string
 
-from capa.capa_problem import LoncapaProblem
+from capa.capa_problem import LoncapaProblem, get_max_score_from_xml
 from capa.responsetypes import StudentInputError, \
     ResponseError, LoncapaProblemError
 from capa.util import convert_files_to_filenames
+from capa.safe_exec import context_cache as script_context_cache
 from .progress import Progress
 from xmodule.x_module import XModule
 from xmodule.raw_module import RawDescriptor
@@ -1085,6 +1086,14 @@ class CapaDescriptor(CapaFields, RawDescriptor):
     metadata_translations = dict(RawDescriptor.metadata_translations)
     metadata_translations['attempts'] = 'max_attempts'
 
+    # The max score is recomputed from the problem data on import, so isn't exported
+    metadata_to_strip = RawDescriptor.metadata_to_strip + ('max_score_cache',)
+
+    max_score_cache = Dict(
+        help="Max score of this problem, along with the hash of the data it was computed from",
+        scope=Scope.settings
+    )
+
     def get_context(self):
         _context = RawDescriptor.get_context(self)
         _context.update({'markdown': self.markdown,
@@ -1105,5 +1114,39 @@ class CapaDescriptor(CapaFields, RawDescriptor):
     def non_editable_metadata_fields(self):
         non_editable_fields = super(CapaDescriptor, self).non_editable_metadata_fields
         non_editable_fields.extend([CapaDescriptor.due, CapaDescriptor.graceperiod,
-                                    CapaDescriptor.force_save_button, CapaDescriptor.markdown])
+                                    CapaDescriptor.force_save_button, CapaDescriptor.markdown,
+                                    CapaDescriptor.max_score_cache])
         return non_editable_fields
+
+    @classmethod
+    def from_xml(cls, xml_data, system, org=None, course=None):
+        descriptor = super(CapaDescriptor, cls).from_xml(xml_data, system, org, course)
+        descriptor.precompute_fields()
+        return descriptor
+
+    def _data_hash(self):
+        """
+        Returns a hash of the problem's data, used to tell whether max_score_cache is stale.
+        """
+        return hashlib.md5((self.data or '').encode('utf-8')).hexdigest()
+
+    def precomputed_max_score(self):
+        if self.max_score_cache is None or self.max_score_cache.get('data_hash') != self._data_hash():
+            return None
+        return self.max_score_cache.get('max_score')
+
+    def precompute_fields(self):
+        data_hash = self._data_hash()
+        if self.max_score_cache is not None and self.max_score_cache.get('data_hash') == data_hash:
+            return False
+
+        self.max_score_cache = {
+            'data_hash': data_hash,
+            'max_score': get_max_score_from_xml(self.data or ''),
+        }
+        return True
+
+    def invalidate_caches(self):
+        # drop the results of the problem's scripts cached in this process; other
+        # processes won't find them anyway, as they are keyed by the code
+        script_context_cache.invalidate(self.location.html_id())
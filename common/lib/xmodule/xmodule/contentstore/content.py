@@ -15,7 +15,7 @@ from PIL import Image
 
 class StaticContent(object):
     def __init__(self, loc, name, content_type, data, last_modified_at=None, thumbnail_location=None, import_path=None,
-                 length=None):
+                 length=None, content_digest=None):
         self.location = loc
         self.name = name   # a display string which can be edited, and thus not part of the location which needs to be fixed
         self.content_type = content_type
@@ -26,6 +26,8 @@ class StaticContent(object):
         # optional information about where this file was imported from. This is needed to support import/export
         # cycles
         self.import_path = import_path
+        # md5 hex digest of the data, if known (e.g. as computed by GridFS)
+        self.content_digest = content_digest
 
     @property
     def is_thumbnail(self):
@@ -92,10 +94,10 @@ class StaticContent(object):
 
 class StaticContentStream(StaticContent):
     def __init__(self, loc, name, content_type, stream, last_modified_at=None, thumbnail_location=None, import_path=None,
-                 length=None):
+                 length=None, content_digest=None):
         super(StaticContentStream, self).__init__(loc, name, content_type, None, last_modified_at=last_modified_at,
                                                   thumbnail_location=thumbnail_location, import_path=import_path,
-                                                  length=length)
+                                                  length=length, content_digest=content_digest)
         self._stream = stream
 
     def stream_data(self):
@@ -105,6 +107,20 @@ class StaticContentStream(StaticContent):
                 break
             yield chunk
 
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (inclusive).
+        Seeking in a GridFS file only reads the chunks that are needed.
+        """
+        self._stream.seek(first_byte)
+        remaining = last_byte - first_byte + 1
+        while remaining > 0:
+            chunk = self._stream.read(min(remaining, 1024))
+            if len(chunk) == 0:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
     def close(self):
         self._stream.close()
 
@@ -112,7 +128,8 @@ class StaticContentStream(StaticContent):
         self._stream.seek(0)
         content = StaticContent(self.location, self.name, self.content_type, self._stream.read(),
                                 last_modified_at=self.last_modified_at, thumbnail_location=self.thumbnail_location,
-                                import_path=self.import_path, length=self.length)
+                                import_path=self.import_path, length=self.length,
+                                content_digest=self.content_digest)
         return content
 
 
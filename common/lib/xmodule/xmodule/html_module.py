@@ -36,6 +36,10 @@ class HtmlModule(HtmlFields, XModule):
             return self.data.replace("%%USER_ID%%", self.system.anonymous_student_id)
         return self.data
 
+    def has_static_html(self):
+        # unless the html refers to the user's id
+        return "%%USER_ID%%" not in self.data
+
 
 class HtmlDescriptor(HtmlFields, XmlDescriptor, EditingDescriptor):
     """
@@ -7,6 +7,7 @@ import logging
 import re
 
 from collections import namedtuple
+from contextlib import contextmanager
 
 from .exceptions import InvalidLocationError, InsufficientSpecificationError
 from xmodule.errortracker import make_error_tracker
@@ -35,6 +36,16 @@ INVALID_HTML_CHARS = re.compile(r"[^\w-]")
 
 _LocationBase = namedtuple('LocationBase', 'tag org course category name revision')
 
+# The number of Locations (and of their urls) that are remembered, so that
+# building a Location from the same string, list or dict again doesn't parse
+# and check it again.  When either is full, it is emptied.
+MAX_INTERNED_LOCATIONS = 50000
+
+# url string or tuple of components -> Location
+_interned_locations = {}
+# Location -> url string
+_location_urls = {}
+
 
 class Location(_LocationBase):
     '''
@@ -105,9 +116,8 @@ class Location(_LocationBase):
         returns a Location object corresponding to location.
         '''
         loc = Location(location)
-        for key, val in loc.dict().iteritems():
-            if key != 'revision' and val is None:
-                raise InsufficientSpecificationError(location)
+        if None in loc[:5]:
+            raise InsufficientSpecificationError(location)
         return loc
 
     def __new__(_cls, loc_or_tag=None, org=None, course=None, category=None,
@@ -140,6 +150,9 @@ class Location(_LocationBase):
 
         Components may be set to None, which may be interpreted in some contexts
         to mean wildcard selection.
+
+        Locations are immutable, so the same Location is returned for a string,
+        list or dict that was seen recently, and a Location is returned as is.
         """
 
         if (org is None and course is None and category is None and name is None and revision is None):
@@ -150,62 +163,75 @@ class Location(_LocationBase):
         if location is None:
             return _LocationBase.__new__(_cls, *([None] * 6))
 
-        def check_dict(dict_):
-            # Order matters, so flatten out into a list
-            keys = ['tag', 'org', 'course', 'category', 'name', 'revision']
-            list_ = [dict_[k] for k in keys]
-            check_list(list_)
-
-        def check_list(list_):
-            def check(val, regexp):
-                if val is not None and regexp.search(val) is not None:
-                    log.debug('invalid characters val="%s", list_="%s"' % (val, list_))
-                    raise InvalidLocationError("Invalid characters in '%s'." % (val))
-
-            list_ = list(list_)
-            for val in list_[:4] + [list_[5]]:
-                check(val, INVALID_CHARS)
-            # names allow colons
-            check(list_[4], INVALID_CHARS_NAME)
+        # a Location was checked when it was built
+        if isinstance(location, Location):
+            if type(location) is _cls:
+                return location
+            return _LocationBase.__new__(_cls, *location)
 
         if isinstance(location, basestring):
-            match = URL_RE.match(location)
-            if match is None:
-                log.debug('location is instance of %s but no URL match' % basestring)
-                raise InvalidLocationError(location)
-            groups = match.groupdict()
-            check_dict(groups)
-            return _LocationBase.__new__(_cls, **groups)
+            key = location
         elif isinstance(location, (list, tuple)):
             if len(location) not in (5, 6):
                 log.debug('location has wrong length')
                 raise InvalidLocationError(location)
 
             if len(location) == 5:
-                args = tuple(location) + (None,)
+                key = tuple(location) + (None,)
             else:
-                args = tuple(location)
-
-            check_list(args)
-            return _LocationBase.__new__(_cls, *args)
+                key = tuple(location)
         elif isinstance(location, dict):
-            kwargs = dict(location)
-            kwargs.setdefault('revision', None)
-
-            check_dict(kwargs)
-            return _LocationBase.__new__(_cls, **kwargs)
-        elif isinstance(location, Location):
-            return _LocationBase.__new__(_cls, location)
+            # Order matters, so flatten out into a tuple
+            key = (
+                location['tag'], location['org'], location['course'],
+                location['category'], location['name'], location.get('revision'),
+            )
         else:
             raise InvalidLocationError(location)
 
+        if _cls is Location:
+            interned = _interned_locations.get(key)
+            if interned is not None:
+                return interned
+
+        def check(val, regexp):
+            if val is not None and regexp.search(val) is not None:
+                log.debug('invalid characters val="%s", location="%s"' % (val, location))
+                raise InvalidLocationError("Invalid characters in '%s'." % (val))
+
+        if isinstance(key, basestring):
+            match = URL_RE.match(key)
+            if match is None:
+                log.debug('location is instance of %s but no URL match' % basestring)
+                raise InvalidLocationError(location)
+            args = match.group('tag', 'org', 'course', 'category', 'name', 'revision')
+        else:
+            args = key
+
+        for val in args[:4] + args[5:]:
+            check(val, INVALID_CHARS)
+        # names allow colons
+        check(args[4], INVALID_CHARS_NAME)
+
+        loc = _LocationBase.__new__(_cls, *args)
+        if _cls is Location:
+            if len(_interned_locations) >= MAX_INTERNED_LOCATIONS:
+                _interned_locations.clear()
+            _interned_locations[key] = loc
+        return loc
+
     def url(self):
         """
         Return a string containing the URL for this location
         """
-        url = "{tag}://{org}/{course}/{category}/{name}".format(**self.dict())
-        if self.revision:
-            url += "@" + self.revision
+        url = _location_urls.get(self)
+        if url is None:
+            url = "{0}://{1}/{2}/{3}/{4}".format(*self)
+            if self.revision:
+                url += "@" + self.revision
+            if len(_location_urls) >= MAX_INTERNED_LOCATIONS:
+                _location_urls.clear()
+            _location_urls[self] = url
         return url
 
     def html_id(self):
@@ -438,6 +464,24 @@ class ModuleStoreBase(ModuleStore):
                 return c
         return None
 
+    @contextmanager
+    def structure_only(self):
+        """
+        Context manager for loading items without the data that is only
+        needed to render them, in the modulestores that support it (see
+        MongoModuleStore.structure_only).  Here, it does nothing.
+        """
+        yield
+
+    def get_course_edited_on(self, location):
+        """
+        Returns the time (in seconds since the epoch) that the course
+        containing location last changed in this modulestore, for versioning
+        things that are computed from the course and cached, or None if it
+        isn't known.
+        """
+        return None
+
 
 def namedtuple_to_son(namedtuple, prefix=''):
     """
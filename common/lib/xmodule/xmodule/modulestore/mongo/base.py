@@ -16,9 +16,13 @@ import pymongo
 import sys
 import logging
 import copy
+import threading
+import time
 
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
+from contextlib import contextmanager
 from fs.osfs import OSFS
+from functools import partial
 from itertools import repeat
 from path import path
 from operator import attrgetter
@@ -61,13 +65,30 @@ class MongoKeyValueStore(KeyValueStore):
     """
     A KeyValueStore that maps keyed data access to one of the 3 data areas
     known to the MongoModuleStore (data, children, and metadata)
+
+    If the data wasn't loaded with the item (see
+    MongoModuleStore.structure_only), `load_data` is a function that returns
+    it, which is called the first time the data is used.
     """
-    def __init__(self, data, children, metadata, location):
-        self._data = data
+    def __init__(self, data, children, metadata, location, load_data=None):
+        self._loaded_data = data
+        self._load_data = load_data
         self._children = children
         self._metadata = metadata
         self._location = location
 
+    @property
+    def _data(self):
+        if self._load_data is not None:
+            self._loaded_data = self._load_data()
+            self._load_data = None
+        return self._loaded_data
+
+    @_data.setter
+    def _data(self, value):
+        self._loaded_data = value
+        self._load_data = None
+
     def get(self, key):
         if key.scope == Scope.children:
             return self._children
@@ -135,6 +156,38 @@ class MongoKeyValueStore(KeyValueStore):
 MongoUsage = namedtuple('MongoUsage', 'id, def_id')
 
 
+class DefinitionDataFetcher(object):
+    """
+    Fetches the definition data of modules that were loaded without it (see
+    MongoModuleStore.structure_only).  The data of all the modules that are
+    waiting for theirs is fetched in one query, when the first of them is used.
+    """
+    def __init__(self, modulestore):
+        self.modulestore = modulestore
+        # locations of the loaded modules whose data hasn't been fetched yet
+        self._pending = set()
+        # data that was fetched, but not used yet, by location
+        self._fetched = {}
+
+    def add(self, location):
+        """
+        Note that the module at location was loaded without its data, and
+        return a function that returns the data
+        """
+        self._pending.add(location)
+        return partial(self.get, location)
+
+    def get(self, location):
+        """
+        Returns the data of the module at location
+        """
+        if location not in self._fetched:
+            self._pending.add(location)
+            self._fetched.update(self.modulestore.get_definition_data(self._pending))
+            self._pending.clear()
+        return self._fetched.pop(location, {})
+
+
 class CachingDescriptorSystem(MakoDescriptorSystem):
     """
     A system that has a cache of module json that it will use to load modules
@@ -143,13 +196,16 @@ class CachingDescriptorSystem(MakoDescriptorSystem):
     references to metadata_inheritance_tree
     """
     def __init__(self, modulestore, module_data, default_class, resources_fs,
-                 error_tracker, render_template, cached_metadata=None):
+                 error_tracker, render_template, cached_metadata=None, definition_data_fetcher=None):
         """
         modulestore: the module store that can be used to retrieve additional modules
 
         module_data: a dict mapping Location -> json that was cached from the
             underlying modulestore
 
+        definition_data_fetcher: a DefinitionDataFetcher, if the json in
+            module_data may have been loaded without its definition data
+
         default_class: The default_class to use when loading an
             XModuleDescriptor from the module_data
 
@@ -169,6 +225,7 @@ class CachingDescriptorSystem(MakoDescriptorSystem):
         # define an attribute here as well, even though it's None
         self.course_id = None
         self.cached_metadata = cached_metadata
+        self.definition_data_fetcher = definition_data_fetcher
 
     def load_item(self, location):
         """
@@ -196,12 +253,21 @@ class CachingDescriptorSystem(MakoDescriptorSystem):
                         metadata[new_name] = metadata[old_name]
                         del metadata[old_name]
 
-                kvs = MongoKeyValueStore(
-                    definition.get('data', {}),
-                    definition.get('children', []),
-                    metadata,
-                    location,
-                )
+                if self.definition_data_fetcher is not None and 'data' not in definition:
+                    kvs = MongoKeyValueStore(
+                        None,
+                        definition.get('children', []),
+                        metadata,
+                        location,
+                        load_data=self.definition_data_fetcher.add(location),
+                    )
+                else:
+                    kvs = MongoKeyValueStore(
+                        definition.get('data', {}),
+                        definition.get('children', []),
+                        metadata,
+                        location,
+                    )
 
                 model_data = DbModel(kvs, class_, None, MongoUsage(self.course_id, location))
                 module = class_(self, model_data)
@@ -243,6 +309,16 @@ def location_to_query(location, wildcard=True):
 
 metadata_cache_key = attrgetter('org', 'course')
 
+# How long the time a course was last edited is kept in the metadata inheritance cache
+EDITED_ON_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def edited_on_cache_key(location):
+    """
+    The key of the time that the course containing location was last edited
+    """
+    return ('edited_on', location.org, location.course)
+
 
 class MongoModuleStore(ModuleStoreBase):
     """
@@ -276,6 +352,10 @@ class MongoModuleStore(ModuleStoreBase):
         self.collection.ensure_index(
             zip(('_id.' + field for field in Location._fields), repeat(1)))
 
+        # and one over the children of each item, to find the parents of an
+        # item (see get_parent_locations)
+        self.collection.ensure_index('definition.children')
+
         if default_class is not None:
             module_path, _, class_name = default_class.rpartition('.')
             class_ = getattr(import_module(module_path), class_name)
@@ -286,13 +366,122 @@ class MongoModuleStore(ModuleStoreBase):
         self.error_tracker = error_tracker
         self.render_template = render_template
         self.ignore_write_events_on_courses = []
+        # the state of bulk_write_operations in each thread (see _bulk_write_state)
+        self._bulk_write_local = threading.local()
+        # see structure_only
+        self._structure_only_depth = 0
         self.request_cache = request_cache
         self.metadata_inheritance_cache_subsystem = metadata_inheritance_cache_subsystem
 
+    @contextmanager
+    def bulk_write_operations(self, location):
+        """
+        Context manager for making many writes to the course containing location.
+
+        Within the context, the writes made by update_item, update_children and
+        update_metadata are buffered, and all the writes to one item are combined
+        into a single upsert. The buffer is flushed when the context exits, and
+        before anything is read back from this store. The metadata inheritance
+        tree of the course is computed once, when the context exits, rather than
+        after every write.
+
+        Only the writes made by the calling thread to the course containing
+        location are buffered.
+
+        NOTE: other modulestores using the same collection (e.g. the draft store),
+        and other threads, won't see the buffered writes until the context exits.
+        """
+        location = Location(location)
+        pseudo_course_id = '/'.join([location.org, location.course])
+        ignoring_course = pseudo_course_id not in self.ignore_write_events_on_courses
+        if ignoring_course:
+            self.ignore_write_events_on_courses.append(pseudo_course_id)
+        bulk_courses = self._bulk_write_state().courses
+        bulk_courses[pseudo_course_id] = bulk_courses.get(pseudo_course_id, 0) + 1
+        try:
+            yield
+        finally:
+            bulk_courses[pseudo_course_id] -= 1
+            if bulk_courses[pseudo_course_id] == 0:
+                del bulk_courses[pseudo_course_id]
+                self.flush_bulk_writes()
+            if ignoring_course:
+                self.ignore_write_events_on_courses.remove(pseudo_course_id)
+                self.refresh_cached_metadata_inheritance_tree(location)
+
+    @contextmanager
+    def structure_only(self):
+        """
+        Context manager for loading items without their definition data (e.g.
+        the HTML of html modules and the XML of problems), for callers that
+        only need the structure of a course and the items' settings.
+
+        Within the context, get_items and the descendents cached with any item
+        are loaded without their data.  Each module's data is fetched the first
+        time it is used, together with that of all the other modules loaded at
+        the same time that haven't fetched theirs (see DefinitionDataFetcher).
+        """
+        self._structure_only_depth += 1
+        try:
+            yield
+        finally:
+            self._structure_only_depth -= 1
+
+    def _item_fields(self):
+        """
+        The fields of the items to query: all of them, or all but the
+        definition data if in structure_only
+        """
+        if self._structure_only_depth > 0:
+            return {'definition.data': False}
+        return None
+
+    def get_definition_data(self, locations):
+        """
+        Returns a dict of the definition data of the items at locations, by
+        Location, in one query
+        """
+        self.flush_bulk_writes()
+        query = {
+            '_id': {'$in': [namedtuple_to_son(Location(location)) for location in locations]}
+        }
+        return dict(
+            (Location(item['_id']), item.get('definition', {}).get('data', {}))
+            for item in self.collection.find(query, {'definition.data': True})
+        )
+
+    def _bulk_write_state(self):
+        """
+        The state of bulk_write_operations in the calling thread: `courses`, the
+        number of open contexts by org/course, and `writes`, the buffered writes
+        as Location -> fields to $set
+        """
+        state = self._bulk_write_local
+        if not hasattr(state, 'writes'):
+            state.courses = {}
+            state.writes = OrderedDict()
+        return state
+
+    def flush_bulk_writes(self):
+        """
+        Write out any writes buffered by bulk_write_operations in the calling thread
+        """
+        writes = self._bulk_write_state().writes
+        while writes:
+            location, update = writes.popitem(last=False)
+            self.collection.update(
+                {'_id': location.dict()},
+                {'$set': update},
+                multi=False,
+                upsert=True,
+                safe=self.collection.safe
+            )
+
     def compute_metadata_inheritance_tree(self, location):
         '''
         TODO (cdodge) This method can be deleted when the 'split module store' work has been completed
         '''
+        self.flush_bulk_writes()
 
         # get all collections in the course, this query should not return any leaf nodes
         # note this is a bit ugly as when we add new categories of containers, we have to add it here
@@ -411,6 +600,41 @@ class MongoModuleStore(ModuleStoreBase):
         pseudo_course_id = '/'.join([location.org, location.course])
         if pseudo_course_id not in self.ignore_write_events_on_courses:
             self.get_cached_metadata_inheritance_tree(location, force_refresh=True)
+            self._set_course_edited_on(location)
+
+    def _set_course_edited_on(self, location):
+        """
+        Record that the course containing location has just been edited (see
+        get_course_edited_on).  This is done after the write, so that anything
+        rebuilt for the new time sees it.
+        """
+        if self.metadata_inheritance_cache_subsystem is not None:
+            self.metadata_inheritance_cache_subsystem.set(
+                edited_on_cache_key(location), time.time(), EDITED_ON_CACHE_TIMEOUT
+            )
+
+    def get_course_edited_on(self, location):
+        """
+        Returns the time (in seconds since the epoch) that the course
+        containing location was last edited in this modulestore, for
+        versioning things that are computed from the course and cached.
+
+        The time is kept in the metadata inheritance cache, which Studio and
+        the LMS share.  If it isn't known, e.g. because it was evicted, it is
+        set to now, so that things cached for an earlier time aren't reused.
+        Returns None if there is no metadata inheritance cache, as then the
+        edits of other processes can't be seen.
+        """
+        cache = self.metadata_inheritance_cache_subsystem
+        if cache is None:
+            return None
+        key = edited_on_cache_key(location)
+        edited_on = cache.get(key)
+        if edited_on is None:
+            # another process may be doing the same
+            cache.add(key, time.time(), EDITED_ON_CACHE_TIMEOUT)
+            edited_on = cache.get(key) or time.time()
+        return edited_on
 
     def _clean_item_data(self, item):
         """
@@ -424,7 +648,7 @@ class MongoModuleStore(ModuleStoreBase):
         query = {
             '_id': {'$in': [namedtuple_to_son(Location(item)) for item in items]}
         }
-        return list(self.collection.find(query))
+        return list(self.collection.find(query, self._item_fields()))
 
     def _cache_children(self, items, depth=0):
         """
@@ -460,7 +684,7 @@ class MongoModuleStore(ModuleStoreBase):
 
         return data
 
-    def _load_item(self, item, data_cache, apply_cached_metadata=True):
+    def _load_item(self, item, data_cache, apply_cached_metadata=True, definition_data_fetcher=None):
         """
         Load an XModuleDescriptor from item, using the children stored in data_cache
         """
@@ -486,6 +710,7 @@ class MongoModuleStore(ModuleStoreBase):
             self.error_tracker,
             self.render_template,
             cached_metadata,
+            definition_data_fetcher,
         )
         return system.load_item(item['location'])
 
@@ -495,11 +720,15 @@ class MongoModuleStore(ModuleStoreBase):
         to specified depth
         """
         data_cache = self._cache_children(items, depth)
+        definition_data_fetcher = None
+        if self._structure_only_depth > 0:
+            definition_data_fetcher = DefinitionDataFetcher(self)
 
         # if we are loading a course object, if we're not prefetching children (depth != 0) then don't
         # bother with the metadata inheritance
         return [self._load_item(item, data_cache,
-                apply_cached_metadata=(item['location']['category'] != 'course' or depth != 0)) for item in items]
+                apply_cached_metadata=(item['location']['category'] != 'course' or depth != 0),
+                definition_data_fetcher=definition_data_fetcher) for item in items]
 
     def get_courses(self):
         '''
@@ -522,6 +751,7 @@ class MongoModuleStore(ModuleStoreBase):
         specified, returns the latest.  If the item is not present, raise
         ItemNotFoundError.
         '''
+        self.flush_bulk_writes()
         item = self.collection.find_one(
             location_to_query(location, wildcard=False),
             sort=[('revision', pymongo.ASCENDING)],
@@ -574,8 +804,10 @@ class MongoModuleStore(ModuleStoreBase):
         return self.get_item(location, depth=depth)
 
     def get_items(self, location, course_id=None, depth=0):
+        self.flush_bulk_writes()
         items = self.collection.find(
             location_to_query(location),
+            fields=self._item_fields(),
             sort=[('revision', pymongo.ASCENDING)],
         )
 
@@ -588,6 +820,7 @@ class MongoModuleStore(ModuleStoreBase):
         and writes it to `location`
         """
         item = None
+        self.flush_bulk_writes()
         try:
             source_item = self.collection.find_one(location_to_query(source))
 
@@ -668,6 +901,12 @@ class MongoModuleStore(ModuleStoreBase):
         Set update on the specified item, and raises ItemNotFoundError
         if the location doesn't exist
         """
+        location = Location(location)
+        state = self._bulk_write_state()
+        if get_course_id_no_run(location) in state.courses:
+            # combine this with any other buffered writes to the same item
+            state.writes.setdefault(location, {}).update(update)
+            return
 
         # See http://www.mongodb.org/display/DOCS/Updating for
         # atomic update syntax
@@ -693,6 +932,9 @@ class MongoModuleStore(ModuleStoreBase):
         """
 
         self._update_single_item(location, {'definition.data': data})
+        location = Location(location)
+        if get_course_id_no_run(location) not in self.ignore_write_events_on_courses:
+            self._set_course_edited_on(location)
 
     def update_children(self, location, children):
         """
@@ -753,6 +995,7 @@ class MongoModuleStore(ModuleStoreBase):
             course.tabs = [tab for tab in existing_tabs if tab.get('url_slug') != location.name]
             self.update_metadata(course.location, own_metadata(course))
 
+        self.flush_bulk_writes()
         # Must include this to avoid the django debug toolbar (which defines the deprecated "safe=False")
         # from overriding our default value set in the init method.
         self.collection.remove({'_id': Location(location).dict()}, safe=self.collection.safe)
@@ -765,6 +1008,7 @@ class MongoModuleStore(ModuleStoreBase):
         course.  Needed for path_to_location().
         '''
         location = Location.ensure_fully_specified(location)
+        self.flush_bulk_writes()
         items = self.collection.find({'definition.children': location.url()},
                                      {'_id': True})
         return [i['_id'] for i in items]
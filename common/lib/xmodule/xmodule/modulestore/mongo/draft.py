@@ -235,7 +235,7 @@ class DraftModuleStore(MongoModuleStore):
         query = {
             '_id': {'$in': [namedtuple_to_son(as_draft(Location(item))) for item in items]}
         }
-        to_process_drafts = list(self.collection.find(query))
+        to_process_drafts = list(self.collection.find(query, self._item_fields()))
 
         # now we have to go through all drafts and replace the non-draft
         # with the draft. This is because the semantics of the DraftStore is to
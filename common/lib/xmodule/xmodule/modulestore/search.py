@@ -1,10 +1,49 @@
+from collections import OrderedDict
 from itertools import repeat
+import threading
+import weakref
 
 from xmodule.course_module import CourseDescriptor
 
 from .exceptions import (ItemNotFoundError, NoPathToItem)
 from . import Location
 
+# the number of paths remembered for each modulestore
+MAX_CACHED_PATHS = 10000
+
+# modulestore -> OrderedDict of (course_id, location url) -> (course edited on, path),
+# least recently used first
+_path_caches = weakref.WeakKeyDictionary()
+_path_caches_lock = threading.Lock()
+
+
+def _get_cached_path(modulestore, key, edited_on):
+    """
+    Returns the path cached for key, if it was found when the course was last
+    edited at edited_on, or None
+    """
+    with _path_caches_lock:
+        paths = _path_caches.get(modulestore)
+        if paths is None or key not in paths:
+            return None
+        cached_edited_on, path = paths.pop(key)
+        if cached_edited_on != edited_on:
+            return None
+        paths[key] = (cached_edited_on, path)
+        return path
+
+
+def _set_cached_path(modulestore, key, edited_on, path):
+    """
+    Caches the path found for key when the course was last edited at edited_on
+    """
+    with _path_caches_lock:
+        paths = _path_caches.setdefault(modulestore, OrderedDict())
+        paths.pop(key, None)
+        paths[key] = (edited_on, path)
+        while len(paths) > MAX_CACHED_PATHS:
+            paths.popitem(last=False)
+
 
 def path_to_location(modulestore, course_id, location):
     '''
@@ -29,6 +68,27 @@ def path_to_location(modulestore, course_id, location):
     If the section is a sequential or vertical, position will be the position
     of this location in that sequence.  Otherwise, position will
     be None. TODO (vshnayder): Not true yet.
+
+    Paths are remembered by this process for as long as the course isn't
+    edited (see ModuleStore.get_course_edited_on).
+    '''
+    location = Location(location)
+    key = (course_id, location.url())
+    edited_on = modulestore.get_course_edited_on(location)
+    if edited_on is not None:
+        path = _get_cached_path(modulestore, key, edited_on)
+        if path is not None:
+            return path
+
+    path = _path_to_location(modulestore, course_id, location)
+    if edited_on is not None:
+        _set_cached_path(modulestore, key, edited_on, path)
+    return path
+
+
+def _path_to_location(modulestore, course_id, location):
+    '''
+    Finds the path to location in the course (see path_to_location)
     '''
 
     def flatten(xs):
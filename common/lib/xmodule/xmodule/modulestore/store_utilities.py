@@ -38,37 +38,39 @@ def clone_course(modulestore, contentstore, source_location, dest_location, dele
 
     modules = modulestore.get_items([source_location.tag, source_location.org, source_location.course, None, None, None])
 
-    for module in modules:
-        original_loc = Location(module.location)
-
-        if original_loc.category != 'course':
-            module.location = module.location._replace(tag=dest_location.tag, org=dest_location.org,
-                                                       course=dest_location.course)
-        else:
-            # on the course module we also have to update the module name
-            module.location = module.location._replace(tag=dest_location.tag, org=dest_location.org,
-                                                       course=dest_location.course, name=dest_location.name)
-
-        print "Cloning module {0} to {1}....".format(original_loc, module.location)
-
-        modulestore.update_item(module.location, module._model_data._kvs._data)
-
-        # repoint children
-        if module.has_children:
-            new_children = []
-            for child_loc_url in module.children:
-                child_loc = Location(child_loc_url)
-                child_loc = child_loc._replace(
-                    tag=dest_location.tag,
-                    org=dest_location.org,
-                    course=dest_location.course
-                )
-                new_children.append(child_loc.url())
-
-            modulestore.update_children(module.location, new_children)
-
-        # save metadata
-        modulestore.update_metadata(module.location, module._model_data._kvs._metadata)
+    # buffer the writes, and compute the metadata inheritance tree once at the end
+    with modulestore.bulk_write_operations(dest_location):
+        for module in modules:
+            original_loc = Location(module.location)
+
+            if original_loc.category != 'course':
+                module.location = module.location._replace(tag=dest_location.tag, org=dest_location.org,
+                                                           course=dest_location.course)
+            else:
+                # on the course module we also have to update the module name
+                module.location = module.location._replace(tag=dest_location.tag, org=dest_location.org,
+                                                           course=dest_location.course, name=dest_location.name)
+
+            print "Cloning module {0} to {1}....".format(original_loc, module.location)
+
+            modulestore.update_item(module.location, module._model_data._kvs._data)
+
+            # repoint children
+            if module.has_children:
+                new_children = []
+                for child_loc_url in module.children:
+                    child_loc = Location(child_loc_url)
+                    child_loc = child_loc._replace(
+                        tag=dest_location.tag,
+                        org=dest_location.org,
+                        course=dest_location.course
+                    )
+                    new_children.append(child_loc.url())
+
+                modulestore.update_children(module.location, new_children)
+
+            # save metadata
+            modulestore.update_metadata(module.location, module._model_data._kvs._metadata)
 
     # now iterate through all of the assets and clone them
     # first the thumbnails
@@ -149,17 +151,19 @@ def delete_course(modulestore, contentstore, source_location, commit=False):
     assets = contentstore.get_all_content_for_course(source_location)
     _delete_assets(contentstore, assets, commit)
 
-    # then delete all course modules
-    modules = modulestore.get_items([source_location.tag, source_location.org, source_location.course, None, None, None])
-    _delete_modules_except_course(modulestore, modules, source_location, commit)
+    # compute the metadata inheritance tree once at the end, rather than after every deletion
+    with modulestore.bulk_write_operations(source_location):
+        # then delete all course modules
+        modules = modulestore.get_items([source_location.tag, source_location.org, source_location.course, None, None, None])
+        _delete_modules_except_course(modulestore, modules, source_location, commit)
 
-    # then delete all draft course modules
-    modules = modulestore.get_items([source_location.tag, source_location.org, source_location.course, None, None, 'draft'])
-    _delete_modules_except_course(modulestore, modules, source_location, commit)
+        # then delete all draft course modules
+        modules = modulestore.get_items([source_location.tag, source_location.org, source_location.course, None, None, 'draft'])
+        _delete_modules_except_course(modulestore, modules, source_location, commit)
 
-    # finally delete the top-level course module itself
-    print "Deleting {0}...".format(source_location)
-    if commit:
-        modulestore.delete_item(source_location)
+        # finally delete the top-level course module itself
+        print "Deleting {0}...".format(source_location)
+        if commit:
+            modulestore.delete_item(source_location)
 
     return True
@@ -0,0 +1,47 @@
+"""
+Times building Locations, when they have to be parsed and checked and when
+they were seen before.  This is not part of the test suite, because timings
+depend on the machine; run it with
+
+    python -m xmodule.modulestore.tests.benchmark_location
+"""
+import timeit
+
+from xmodule import modulestore
+from xmodule.modulestore import Location
+
+
+def benchmark_construction(number=2000):
+    """
+    Returns the time, in microseconds, to build a Location from a url, a dict
+    (like the _id of a module in mongo) and another Location, first when they
+    have to be parsed and checked, and then when they were seen before.
+    """
+    sources = {
+        'url': "i4x://edX/toy/problem/benchmark_problem",
+        'dict': {'tag': 'i4x', 'org': 'edX', 'course': 'toy', 'category': 'problem',
+                 'name': 'benchmark_problem', 'revision': None},
+        'location': Location("i4x://edX/toy/problem/benchmark_problem"),
+    }
+    timings = {}
+    for kind, source in sources.items():
+        def build_new():
+            modulestore._interned_locations.clear()
+            Location(source)
+
+        def build_seen():
+            Location(source)
+
+        def clear():
+            modulestore._interned_locations.clear()
+
+        # subtract the cost of clearing the cache from the uncached timing
+        new = timeit.timeit(build_new, number=number) - timeit.timeit(clear, number=number)
+        seen = timeit.timeit(build_seen, number=number)
+        timings[kind] = (1e6 * new / number, 1e6 * seen / number)
+    return timings
+
+
+if __name__ == '__main__':
+    for kind, (new, seen) in sorted(benchmark_construction().items()):
+        print "Location from a {0}: {1:.2f}us new, {2:.2f}us seen".format(kind, new, seen)
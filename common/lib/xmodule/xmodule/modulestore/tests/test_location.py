@@ -1,4 +1,7 @@
+from mock import patch
 from nose.tools import assert_equals, assert_raises, assert_not_equals
+
+from xmodule import modulestore
 from xmodule.modulestore import Location
 from xmodule.modulestore.exceptions import InvalidLocationError
 
@@ -159,3 +162,27 @@ def test_clean_for_html():
 def test_html_id():
     loc = Location("tag://org/course/cat/name:more_name@rev")
     assert_equals(loc.html_id(), "tag-org-course-cat-name_more_name-rev")
+
+
+def test_interned():
+    url = "tag://org/course/category/interned@revision"
+    loc = Location(url)
+    assert_equals(Location(url) is loc, True)
+    assert_equals(Location(loc) is loc, True)
+    assert_equals(Location(loc.list()) is Location(tuple(loc)), True)
+    assert_equals(Location(loc.dict()) is Location(loc.list()), True)
+    assert_equals(Location(loc.dict()), loc)
+
+    # and invalid locations are still rejected when seen again
+    for _ in range(2):
+        assert_raises(InvalidLocationError, Location, "tag://org/course/category/name with spaces")
+
+
+def test_interned_bounded():
+    with patch.object(modulestore, 'MAX_INTERNED_LOCATIONS', 2):
+        locations = [Location("tag://org/course/category/bounded_%d" % i) for i in range(5)]
+        assert_equals(len(modulestore._interned_locations) <= 2, True)
+        assert_equals([loc.name for loc in locations], ['bounded_%d' % i for i in range(5)])
+        assert_equals(locations[4].url(), "tag://org/course/category/bounded_4")
+        assert_equals(len(modulestore._location_urls) <= 2, True)
+
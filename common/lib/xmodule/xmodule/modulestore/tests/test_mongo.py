@@ -1,13 +1,17 @@
 import pymongo
+import threading
 
 from nose.tools import assert_equals, assert_raises, assert_not_equals, assert_false
 from pprint import pprint
+from mock import patch
 
 from xblock.core import Scope
 from xblock.runtime import KeyValueStore, InvalidScopeError
 
 from xmodule.modulestore import Location
 from xmodule.modulestore.mongo import MongoModuleStore, MongoKeyValueStore
+from xmodule.modulestore.mongo.base import edited_on_cache_key
+from xmodule.modulestore.search import path_to_location
 from xmodule.modulestore.xml_importer import import_from_xml
 from xmodule.templates import update_templates
 
@@ -25,6 +29,21 @@ DEFAULT_CLASS = 'xmodule.raw_module.RawDescriptor'
 RENDER_TEMPLATE = lambda t_n, d, ctx = None, nsp = 'main': ''
 
 
+class DictCache(object):
+    """A minimal cache over a dict, for the metadata inheritance cache"""
+    def __init__(self):
+        self.cache = {}
+
+    def get(self, key, default=None):
+        return self.cache.get(key, default)
+
+    def set(self, key, value, timeout=None):
+        self.cache[key] = value
+
+    def add(self, key, value, timeout=None):
+        self.cache.setdefault(key, value)
+
+
 class TestMongoModuleStore(object):
     '''Tests!'''
     @classmethod
@@ -107,10 +126,43 @@ class TestMongoModuleStore(object):
             self.store._find_one(Location("i4x://edX/toy/video/Welcome")),
             None)
 
+    def test_structure_only(self):
+        '''Items loaded structure-only fetch their data, in one query, when it is first used'''
+        location = Location('i4x', 'edX', 'toy', 'html', None)
+        full_data = dict((item.location, item.data) for item in self.store.get_items(location))
+        assert_not_equals(len(full_data), 0)
+
+        with self.store.structure_only():
+            items = self.store.get_items(location)
+        for item in items:
+            assert_not_equals(item._model_data._kvs._load_data, None)
+
+        with patch.object(self.store, 'get_definition_data', wraps=self.store.get_definition_data) as get_data:
+            for item in items:
+                assert_equals(item.data, full_data[item.location])
+            assert_equals(get_data.call_count, 1)
+
     def test_path_to_location(self):
         '''Make sure that path_to_location works'''
         check_path_to_location(self.store)
 
+    def test_path_to_location_cached(self):
+        '''Paths are found again only once the course has been edited'''
+        location = Location('i4x://edX/toy/video/Welcome')
+        expected = ("edX/toy/2012_Fall", "Overview", "Welcome", None)
+        with patch.object(self.store, 'metadata_inheritance_cache_subsystem', DictCache()) as cache:
+            with patch.object(self.store, 'get_parent_locations', wraps=self.store.get_parent_locations) as get_parents:
+                assert_equals(path_to_location(self.store, "edX/toy/2012_Fall", location), expected)
+                searched = get_parents.call_count
+                assert_not_equals(searched, 0)
+
+                assert_equals(path_to_location(self.store, "edX/toy/2012_Fall", location), expected)
+                assert_equals(get_parents.call_count, searched)
+
+                cache.set(edited_on_cache_key(location), cache.get(edited_on_cache_key(location)) + 1)
+                assert_equals(path_to_location(self.store, "edX/toy/2012_Fall", location), expected)
+                assert_equals(get_parents.call_count, 2 * searched)
+
     def test_get_courses_has_no_templates(self):
         courses = self.store.get_courses()
         for course in courses:
@@ -119,6 +171,70 @@ class TestMongoModuleStore(object):
                 '{0} is a template course'.format(course)
             )
 
+    def test_bulk_write_operations(self):
+        '''Writes are buffered, combined per item, and the inheritance tree is computed once'''
+        # use a separate collection, so as not to modify the shared one
+        store = MongoModuleStore(HOST, DB, 'bulk_' + COLLECTION, FS_ROOT, RENDER_TEMPLATE,
+            default_class=DEFAULT_CLASS)
+        location = Location('i4x://edX/bulk/sequential/seq')
+        child = 'i4x://edX/bulk/html/child'
+
+        with patch.object(store, 'compute_metadata_inheritance_tree', wraps=store.compute_metadata_inheritance_tree) as compute:
+            with patch.object(store.collection, 'update', wraps=store.collection.update) as update:
+                with store.bulk_write_operations(location):
+                    store.update_item(location, {})
+                    store.update_children(location, [child])
+                    store.update_metadata(location, {'display_name': 'Bulk'})
+                    assert_equals(store.collection.find_one({'_id': location.dict()}), None)
+
+                assert_equals(update.call_count, 1)
+            assert_equals(compute.call_count, 1)
+
+        item = store.get_item(location)
+        assert_equals(item.children, [child])
+        assert_equals(item.display_name, 'Bulk')
+
+    def test_bulk_write_operations_other_writes(self):
+        '''Writes to other courses, and from other threads, aren't buffered'''
+        store = MongoModuleStore(HOST, DB, 'bulk_other_' + COLLECTION, FS_ROOT, RENDER_TEMPLATE,
+            default_class=DEFAULT_CLASS)
+        location = Location('i4x://edX/bulk/sequential/seq')
+        other_location = Location('i4x://edX/other/sequential/seq')
+
+        with store.bulk_write_operations(location):
+            store.update_metadata(other_location, {'display_name': 'Other course'})
+            assert_not_equals(store.collection.find_one({'_id': other_location.dict()}), None)
+
+            thread = threading.Thread(target=store.update_metadata, args=(location, {'display_name': 'Other thread'}))
+            thread.start()
+            thread.join()
+            assert_not_equals(store.collection.find_one({'_id': location.dict()}), None)
+
+    def test_course_edited_on(self):
+        '''The time each course was last edited is kept in the metadata inheritance cache'''
+        store = MongoModuleStore(HOST, DB, 'edited_' + COLLECTION, FS_ROOT, RENDER_TEMPLATE,
+            default_class=DEFAULT_CLASS)
+        location = Location('i4x://edX/edited/sequential/seq')
+        other_location = Location('i4x://edX/other/sequential/seq')
+        assert_equals(store.get_course_edited_on(location), None)
+
+        store.metadata_inheritance_cache_subsystem = DictCache()
+        edited_on = store.get_course_edited_on(location)
+        assert_not_equals(edited_on, None)
+        assert_equals(store.get_course_edited_on(location), edited_on)
+
+        with patch('xmodule.modulestore.mongo.base.time.time', return_value=edited_on + 10):
+            with store.bulk_write_operations(location):
+                store.update_item(location, {})
+                store.update_metadata(location, {'display_name': 'Edited'})
+                assert_equals(store.get_course_edited_on(location), edited_on)
+            assert_equals(store.get_course_edited_on(location), edited_on + 10)
+
+            store.update_item(other_location, {})
+            assert_equals(store.get_course_edited_on(other_location), edited_on + 10)
+        assert_equals(store.get_course_edited_on(location), edited_on + 10)
+
+
 class TestMongoKeyValueStore(object):
 
     def setUp(self):
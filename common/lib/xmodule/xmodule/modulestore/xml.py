@@ -5,6 +5,7 @@ import os
 import re
 import sys
 import glob
+import time
 
 from collections import defaultdict
 from cStringIO import StringIO
@@ -271,6 +272,7 @@ class XMLModuleStore(ModuleStoreBase):
         self.modules = defaultdict(dict)  # course_id -> dict(location -> XModuleDescriptor)
         self.courses = {}  # course_dir -> XModuleDescriptor for the course
         self.errored_courses = {}  # course_dir -> errorlog, for dirs that failed to load
+        self.loaded_on = {}  # (org, course) -> time the course was loaded
 
         self.load_error_modules = load_error_modules
 
@@ -313,6 +315,7 @@ class XMLModuleStore(ModuleStoreBase):
 
         if course_descriptor is not None and not isinstance(course_descriptor, ErrorDescriptor):
             self.courses[course_dir] = course_descriptor
+            self.loaded_on[(course_descriptor.location.org, course_descriptor.location.course)] = time.time()
             self._location_errors[course_descriptor.location] = errorlog
             self.parent_trackers[course_descriptor.id].make_known(course_descriptor.location)
         else:
@@ -545,6 +548,14 @@ class XMLModuleStore(ModuleStoreBase):
         """
         return self.courses.values()
 
+    def get_course_edited_on(self, location):
+        """
+        XML courses only change when they are loaded, so this is when the
+        course containing location was loaded by this process.
+        """
+        location = Location(location)
+        return self.loaded_on.get((location.org, location.course))
+
     def get_errored_courses(self):
         """
         Return a dictionary of course_dir -> [(msg, exception_str)], for each
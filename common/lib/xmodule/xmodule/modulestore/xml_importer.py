@@ -175,7 +175,7 @@ def import_course_from_xml(modulestore, static_content_store, course_data_path,
 def import_from_xml(store, data_dir, course_dirs=None,
                     default_class='xmodule.raw_module.RawDescriptor',
                     load_error_modules=True, static_content_store=None, target_location_namespace=None,
-                    verbose=False, draft_store=None):
+                    verbose=False, draft_store=None, progress_callback=None):
     """
     Import the specified xml data_dir into the "store" modulestore,
     using org and course as the location org and course.
@@ -188,6 +188,9 @@ def import_from_xml(store, data_dir, course_dirs=None,
     expects a 'url_name' as an identifier to where things are on disk e.g. ../policies/<url_name>/policy.json as well as metadata keys in
     the policy.json. so we need to keep the original url_name during import
 
+    progress_callback: If specified, called as progress_callback(num_imported, num_total) after each module
+    is imported, where num_total is the number of modules in all the courses being imported
+
     """
 
     xml_module_store = XMLModuleStore(
@@ -201,19 +204,23 @@ def import_from_xml(store, data_dir, course_dirs=None,
     # to enumerate the entire collection of course modules. It will be left as a TBD to implement that
     # method on XmlModuleStore.
     course_items = []
+    num_imported = 0
+    num_total = sum(len(modules) for modules in xml_module_store.modules.itervalues())
+
+    def _report_progress():
+        if progress_callback is not None:
+            progress_callback(num_imported, num_total)
+
     for course_id in xml_module_store.modules.keys():
 
         if target_location_namespace is not None:
-            pseudo_course_id = '/'.join([target_location_namespace.org, target_location_namespace.course])
+            bulk_location = target_location_namespace
         else:
             course_id_components = course_id.split('/')
-            pseudo_course_id = '/'.join([course_id_components[0], course_id_components[1]])
-
-        try:
-            # turn off all write signalling while importing as this is a high volume operation
-            if pseudo_course_id not in store.ignore_write_events_on_courses:
-                store.ignore_write_events_on_courses.append(pseudo_course_id)
+            bulk_location = Location('i4x', course_id_components[0], course_id_components[1], None, None)
 
+        # buffer the writes and turn off all write signalling while importing as this is a high volume operation
+        with store.bulk_write_operations(bulk_location):
             course_data_path = None
             course_location = None
 
@@ -240,6 +247,8 @@ def import_from_xml(store, data_dir, course_dirs=None,
                                        {"type": "wiki", "name": "Wiki"}]  # note, add 'progress' when we can support it on Edge
 
                     import_module(module, store, course_data_path, static_content_store)
+                    num_imported += 1
+                    _report_progress()
 
                     # a bit of a hack, but typically the "course image" which is shown on marketing pages is hard coded to /images/course_image.jpg
                     # so let's make sure we import in case there are no other references to it in the modules
@@ -271,19 +280,17 @@ def import_from_xml(store, data_dir, course_dirs=None,
                     log.debug('importing module location {0}'.format(module.location))
 
                 import_module(module, store, course_data_path, static_content_store)
+                num_imported += 1
+                _report_progress()
 
             # now import any 'draft' items
             if draft_store is not None:
-                import_course_draft(xml_module_store, store, draft_store, course_data_path,
-                                    static_content_store, target_location_namespace if target_location_namespace is not None
-                                    else course_location)
-
-        finally:
-            # turn back on all write signalling
-            if pseudo_course_id in store.ignore_write_events_on_courses:
-                store.ignore_write_events_on_courses.remove(pseudo_course_id)
-                store.refresh_cached_metadata_inheritance_tree(target_location_namespace if
-                                                               target_location_namespace is not None else course_location)
+                # the draft store reads back the published items, so they need to be written out first
+                store.flush_bulk_writes()
+                with draft_store.bulk_write_operations(bulk_location):
+                    import_course_draft(xml_module_store, store, draft_store, course_data_path,
+                                        static_content_store, target_location_namespace if target_location_namespace is not None
+                                        else course_location)
 
     return xml_module_store, course_items
 
@@ -18,6 +18,18 @@ log = logging.getLogger(__name__)
 class_priority = ['video', 'problem']
 
 
+def icon_class_from_children(child_classes):
+    """
+    The icon class of a module whose children have the icon classes in the set
+    `child_classes`: the last of class_priority among them, or 'other'.
+    """
+    new_class = 'other'
+    for c in class_priority:
+        if c in child_classes:
+            new_class = c
+    return new_class
+
+
 class SequenceFields(object):
     has_children = True
 
@@ -67,8 +79,29 @@ class SequenceModule(SequenceFields, XModule):
         if dispatch == 'goto_position':
             self.position = int(data['position'])
             return json.dumps({'success': True})
+        if dispatch == 'render_position':
+            # the content of a tab that wasn't rendered with the sequence (see lazy_tabs)
+            children = self.get_display_items()
+            position = int(data['position'])
+            if not 1 <= position <= len(children):
+                raise NotFoundError('Position out of range')
+            child = children[position - 1]
+            return json.dumps({
+                'success': True,
+                'html': child.get_html(),
+                'progress_status': Progress.to_js_status_str(child.get_progress()),
+            })
         raise NotFoundError('Unexpected dispatch type')
 
+    @property
+    def lazy_tabs(self):
+        '''
+        If True, only the active tab's content is rendered with the sequence,
+        and the other tabs are rendered when the student goes to them.  The
+        modules inside those tabs aren't even created until then.
+        '''
+        return bool(self.system.get('lazy_sequence_tabs'))
+
     def render(self):
         # If we're rendering this sequence, but no position is set yet,
         # default the position to the first element
@@ -79,20 +112,23 @@ class SequenceModule(SequenceFields, XModule):
             return
         ## Returns a set of all types of all sub-children
         contents = []
-        for child in self.get_display_items():
-            progress = child.get_progress()
-            childinfo = {
-                'content': child.get_html(),
-                'title': "\n".join(
-                    grand_child.display_name
-                    for grand_child in child.get_children()
-                    if grand_child.display_name is not None
-                ),
-                'progress_status': Progress.to_js_status_str(progress),
-                'progress_detail': Progress.to_js_detail_str(progress),
-                'type': child.get_icon_class(),
-                'id': child.id,
-            }
+        for index, child in enumerate(self.get_display_items()):
+            if self.lazy_tabs and index + 1 != self.position:
+                childinfo = self._lazy_childinfo(child)
+            else:
+                progress = child.get_progress()
+                childinfo = {
+                    'content': child.get_html(),
+                    'title': "\n".join(
+                        grand_child.display_name
+                        for grand_child in child.get_children()
+                        if grand_child.display_name is not None
+                    ),
+                    'progress_status': Progress.to_js_status_str(progress),
+                    'progress_detail': Progress.to_js_detail_str(progress),
+                    'type': child.get_icon_class(),
+                    'id': child.id,
+                }
             if childinfo['title'] == '':
                 childinfo['title'] = child.display_name_with_default
             contents.append(childinfo)
@@ -110,11 +146,42 @@ class SequenceModule(SequenceFields, XModule):
     def get_icon_class(self):
         child_classes = set(child.get_icon_class()
                             for child in self.get_children())
-        new_class = 'other'
-        for c in class_priority:
-            if c in child_classes:
-                new_class = c
-        return new_class
+        return icon_class_from_children(child_classes)
+
+    def _lazy_childinfo(self, child):
+        '''
+        The information about a tab that isn't rendered yet.  This only uses
+        the descriptors of the modules inside the tab, because creating them
+        can be expensive (e.g. capa problems run their scripts).  As their
+        progress isn't known until they are created, the tab's progress is
+        filled in when it is rendered.
+        '''
+        grand_children = child.descriptor.get_children()
+        return {
+            'content': None,
+            'title': "\n".join(
+                grand_child.display_name
+                for grand_child in grand_children
+                if grand_child.display_name is not None
+            ),
+            'progress_status': Progress.to_js_status_str(None),
+            'progress_detail': Progress.to_js_detail_str(None),
+            'type': _descriptor_icon_class(child.descriptor),
+            'id': child.id,
+        }
+
+
+def _descriptor_icon_class(descriptor):
+    '''
+    The icon class of the module for `descriptor`, worked out from the
+    descriptors alone, as SequenceModule and VerticalModule do from their
+    children.
+    '''
+    if not descriptor.has_children:
+        return descriptor.module_class.icon_class
+
+    child_classes = set(_descriptor_icon_class(child) for child in descriptor.get_children())
+    return icon_class_from_children(child_classes)
 
 
 class SequenceDescriptor(SequenceFields, MakoModuleDescriptor, XmlDescriptor):
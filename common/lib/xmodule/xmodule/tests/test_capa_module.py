@@ -16,7 +16,7 @@ import json
 import xmodule
 from capa.responsetypes import (StudentInputError, LoncapaProblemError,
                                 ResponseError)
-from xmodule.capa_module import CapaModule, ComplexEncoder
+from xmodule.capa_module import CapaModule, CapaDescriptor, ComplexEncoder
 from xmodule.modulestore import Location
 
 from django.http import QueryDict
@@ -1234,6 +1234,26 @@ class CapaModuleTest(unittest.TestCase):
             mock_log.reset_mock()
 
 
+class CapaDescriptorTest(unittest.TestCase):
+    def test_precomputed_max_score(self):
+        """
+        Check that the max score is precomputed from the problem data, and
+        isn't used once the data changes.
+        """
+        location = Location(["i4x", "edX", "capa_test", "problem", "PrecomputedMaxScore"])
+        descriptor = CapaDescriptor(Mock(), {'data': CapaFactory.sample_problem_xml, 'location': location})
+        self.assertIsNone(descriptor.precomputed_max_score())
+
+        self.assertTrue(descriptor.precompute_fields())
+        self.assertFalse(descriptor.precompute_fields())
+        self.assertEqual(descriptor.precomputed_max_score(), CapaFactory.create().max_score())
+
+        descriptor.data = CapaFactory.sample_problem_xml.replace('<textline', '<textline points="3"')
+        self.assertIsNone(descriptor.precomputed_max_score())
+        self.assertTrue(descriptor.precompute_fields())
+        self.assertEqual(descriptor.precomputed_max_score(), 3)
+
+
 class ComplexEncoderTest(unittest.TestCase):
     def test_default(self):
         """
@@ -0,0 +1,104 @@
+"""
+Tests of rendering SequenceModules
+"""
+import json
+import unittest
+
+from fs.memoryfs import MemoryFS
+from mock import Mock, patch
+
+from xmodule.modulestore.xml import ImportSystem, XMLModuleStore
+
+from . import get_test_system
+
+ORG = 'test_org'
+COURSE = 'sequence'
+
+SEQUENCE_XML = '''
+<sequential url_name="seq">
+    <vertical url_name="vert_one">
+        <html url_name="html_one" display_name="First">One</html>
+    </vertical>
+    <vertical url_name="vert_two">
+        <html url_name="html_two" display_name="Second">Two</html>
+        <html url_name="html_three" display_name="Third">Three</html>
+    </vertical>
+</sequential>
+'''
+
+
+class DummySystem(ImportSystem):
+
+    @patch('xmodule.modulestore.xml.OSFS', lambda directory: MemoryFS())
+    def __init__(self, load_error_modules):
+
+        xmlstore = XMLModuleStore("data_dir", course_dirs=[], load_error_modules=load_error_modules)
+        course_id = "/".join([ORG, COURSE, 'test_run'])
+        course_dir = "test_dir"
+        policy = {}
+        error_tracker = Mock()
+        parent_tracker = Mock()
+
+        super(DummySystem, self).__init__(
+            xmlstore,
+            course_id,
+            course_dir,
+            policy,
+            error_tracker,
+            parent_tracker,
+            load_error_modules=load_error_modules,
+        )
+
+
+class SequenceModuleTest(unittest.TestCase):
+    """
+    Tests of rendering the tabs of a sequence
+    """
+    def setUp(self):
+        self.descriptor = DummySystem(load_error_modules=True).process_xml(SEQUENCE_XML)
+        self.test_system = get_test_system()
+        # the templates just return their context
+        self.test_system.render_template = lambda template, context: context
+
+        # record which modules are created
+        self.created = []
+
+        def get_module(descriptor):
+            self.created.append(descriptor.location.name)
+            return descriptor.xmodule(self.test_system)
+        self.test_system.get_module = get_module
+
+    def get_items(self, module):
+        """Returns the information about each tab that the sequence is rendered with"""
+        return module.get_html()['items']
+
+    def test_render_all_tabs(self):
+        module = self.descriptor.xmodule(self.test_system)
+        items = self.get_items(module)
+        self.assertEqual(len(items), 2)
+        self.assertTrue(all(item['content'] is not None for item in items))
+        self.assertEqual(items[1]['title'], 'Second\nThird')
+        self.assertIn('html_one', self.created)
+
+    def test_lazy_tabs(self):
+        self.test_system.set('lazy_sequence_tabs', True)
+        module = self.descriptor.xmodule(self.test_system)
+        module.position = 2
+        items = self.get_items(module)
+
+        self.assertIsNone(items[0]['content'])
+        self.assertEqual(items[0]['title'], 'First')
+        self.assertEqual(items[0]['type'], 'other')
+        self.assertEqual(items[0]['progress_status'], 'NA')
+        self.assertIsNotNone(items[1]['content'])
+        self.assertEqual(items[1]['title'], 'Second\nThird')
+
+        # the modules inside the tab that isn't shown aren't created
+        self.assertNotIn('html_one', self.created)
+        self.assertIn('html_two', self.created)
+
+        # until the tab is rendered
+        response = json.loads(module.handle_ajax('render_position', {'position': '1'}))
+        self.assertTrue(response['success'])
+        self.assertEqual(response['html']['items'][0]['content'], 'One')
+        self.assertIn('html_one', self.created)
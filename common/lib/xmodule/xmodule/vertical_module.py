@@ -1,12 +1,8 @@
 from xmodule.x_module import XModule
-from xmodule.seq_module import SequenceDescriptor
+from xmodule.seq_module import SequenceDescriptor, icon_class_from_children
 from xmodule.progress import Progress
 from pkg_resources import resource_string
 
-# HACK: This shouldn't be hard-coded to two types
-# OBSOLETE: This obsoletes 'type'
-class_priority = ['video', 'problem']
-
 
 class VerticalFields(object):
     has_children = True
@@ -39,11 +35,7 @@ class VerticalModule(VerticalFields, XModule):
 
     def get_icon_class(self):
         child_classes = set(child.get_icon_class() for child in self.get_children())
-        new_class = 'other'
-        for c in class_priority:
-            if c in child_classes:
-                new_class = c
-        return new_class
+        return icon_class_from_children(child_classes)
 
 
 class VerticalDescriptor(VerticalFields, SequenceDescriptor):
@@ -231,6 +231,15 @@ class XModule(XModuleFields, HTMLSnippet, XBlock):
         '''
         return self.icon_class
 
+    def has_static_html(self):
+        """
+        Returns True if get_html returns the same html for every user, given
+        the content and settings of this module, so that the LMS can cache it.
+        Modules that render their children, or anything about the user, must
+        return False.
+        """
+        return False
+
     # Functions used in the LMS
 
     def get_score(self):
@@ -459,6 +468,31 @@ class XModuleDescriptor(XModuleFields, HTMLSnippet, ResourceTemplates, XBlock):
         """
         return False
 
+    def precomputed_max_score(self):
+        """
+        Returns the maximum score of this problem, if it is known without
+        instantiating the XModule, and None otherwise.
+        """
+        return None
+
+    def precompute_fields(self):
+        """
+        Updates any fields whose values are computed from the content of this
+        descriptor (such as the value returned by precomputed_max_score).
+
+        Returns True if any fields changed, in which case the caller should
+        save this descriptor's metadata.
+        """
+        return False
+
+    def invalidate_caches(self):
+        """
+        Called when the content of this descriptor has been changed (e.g. by
+        editing it in Studio), to discard anything cached about its
+        earlier content.
+        """
+        pass
+
     # ================================= JSON PARSING ===========================
     @staticmethod
     def load_from_json(json_data, system, default_class=None):
@@ -2,7 +2,8 @@
 django admin pages for courseware model
 '''
 
-from courseware.models import StudentModule, OfflineComputedGrade, OfflineComputedGradeLog
+from courseware.models import (StudentModule, OfflineComputedGrade, OfflineComputedGradeLog, OfflineComputedSectionGrade,
+                                OfflineComputedAnswerDistribution)
 from django.contrib import admin
 from django.contrib.auth.models import User
 
@@ -11,3 +12,7 @@ admin.site.register(StudentModule)
 admin.site.register(OfflineComputedGrade)
 
 admin.site.register(OfflineComputedGradeLog)
+
+admin.site.register(OfflineComputedSectionGrade)
+
+admin.site.register(OfflineComputedAnswerDistribution)
@@ -1,23 +1,36 @@
 # Compute grades using real division, with no integer truncation
 from __future__ import division
 
+import hashlib
+import json
 import random
 import logging
 
+from bisect import bisect_right
 from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+from pytz import UTC
 from django.conf import settings
 from django.contrib.auth.models import User
 
+from .access import has_access
 from .model_data import ModelDataCache, LmsKeyValueStore
 from xblock.core import Scope
 from .module_render import get_module, get_module_for_descriptor
 from xmodule import graders
-from xmodule.capa_module import CapaModule
+from xmodule.capa_module import CapaModule, CapaDescriptor
 from xmodule.graders import Score
-from .models import StudentModule
+from .models import StudentModule, OfflineComputedSectionGrade, OfflineComputedAnswerDistribution
 
 log = logging.getLogger("mitx.courseware")
 
+# Number of students whose data is loaded together by grade_students
+STUDENT_CHUNK_SIZE = 100
+
+# Number of problem StudentModules whose answers are counted together by count_answers
+ANSWER_DISTRIBUTION_SHARD_SIZE = 1000
+
 
 def yield_module_descendents(module):
     stack = module.get_display_items()
@@ -50,6 +63,27 @@ def yield_dynamic_descriptor_descendents(descriptor, module_creator):
         yield next_descriptor
 
 
+def static_descriptor_descendents(descriptor):
+    """
+    Returns a list of all of the descendants of a descriptor, in the same order
+    as yield_dynamic_descriptor_descendents, if none of them has dynamic children.
+    In that case, the list is the same for every student.
+
+    Returns None if any of the descendants has dynamic children.
+    """
+    descendents = []
+    stack = [descriptor]
+
+    while len(stack) > 0:
+        next_descriptor = stack.pop()
+        if next_descriptor.has_dynamic_children():
+            return None
+        stack.extend(next_descriptor.get_children())
+        descendents.append(next_descriptor)
+
+    return descendents
+
+
 def yield_problems(request, course, student):
     """
     Return an iterator over capa_modules that this student has
@@ -92,6 +126,117 @@ def yield_problems(request, course, student):
                 yield problem
 
 
+def _problem_student_modules(course_id):
+    """
+    Returns the StudentModules of the problems of the course `course_id`.
+    """
+    return StudentModule.objects.filter(course_id=course_id, module_type='problem')
+
+
+def count_answers(course_id, first_module_id, last_module_id=None):
+    """
+    Counts the answers in the problem StudentModules of the course `course_id` with ids
+    from `first_module_id` to `last_module_id`, or in the next ANSWER_DISTRIBUTION_SHARD_SIZE
+    of them if `last_module_id` is None, in which case the range starts at the id of the first
+    of them.  The counts are saved in the OfflineComputedAnswerDistribution of the range, which
+    is returned.  Returns None if `last_module_id` is None and there are no more StudentModules.
+
+    The answers are read from the state of the StudentModules, as a CapaModule would load them
+    into its LoncapaProblem, without creating any modules.  Each range can be counted
+    separately from the others, by any process.
+    """
+    computed = datetime.now(UTC)
+    rows = (_problem_student_modules(course_id).filter(id__gte=first_module_id).order_by('id')
+            .values_list('id', 'module_state_key', 'state'))
+    if last_module_id is None:
+        rows = rows[:ANSWER_DISTRIBUTION_SHARD_SIZE]
+    else:
+        rows = rows.filter(id__lte=last_module_id)
+
+    counts = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
+    num_modules = 0
+    new_range = last_module_id is None
+    for module_id, module_state_key, state in rows:
+        if new_range:
+            if num_modules == 0:
+                first_module_id = module_id
+            last_module_id = module_id
+        num_modules += 1
+        student_answers = json.loads(state).get('student_answers') if state else None
+        for answer_id, answer in (student_answers or {}).iteritems():
+            # Answer can be a list or some other unhashable element.  Convert to string.
+            counts[module_state_key][answer_id][unicode(answer)] += 1
+
+    if last_module_id is None:
+        return None
+
+    distribution, _ = OfflineComputedAnswerDistribution.objects.get_or_create(
+        course_id=course_id,
+        first_module_id=first_module_id,
+        defaults={'last_module_id': last_module_id, 'computed': computed},
+    )
+    distribution.last_module_id = last_module_id
+    distribution.num_modules = num_modules
+    distribution.computed = computed
+    distribution.counts = json.dumps(counts)
+    distribution.save()
+    return distribution
+
+
+def refresh_answer_distributions(course_id):
+    """
+    Brings the OfflineComputedAnswerDistributions of the course `course_id` up to date, and
+    returns them in order of their StudentModule ids.
+
+    Only the ranges with a StudentModule modified since they were counted are counted again,
+    and the StudentModules created since are counted in new ranges.  If StudentModules have
+    been deleted, every range is counted again.
+    """
+    distributions = list(OfflineComputedAnswerDistribution.objects.filter(course_id=course_id)
+                         .order_by('first_module_id'))
+    modules = _problem_student_modules(course_id)
+    next_module_id = 0
+
+    if distributions:
+        last_module_id = distributions[-1].last_module_id
+        stale = set()
+        if modules.filter(id__lte=last_module_id).count() != sum(d.num_modules for d in distributions):
+            stale.update(range(len(distributions)))
+        else:
+            first_module_ids = [distribution.first_module_id for distribution in distributions]
+            modified = modules.filter(id__lte=last_module_id,
+                                      modified__gte=min(d.computed for d in distributions))
+            for module_id, module_modified in modified.values_list('id', 'modified'):
+                index = bisect_right(first_module_ids, module_id) - 1
+                if module_modified >= distributions[index].computed:
+                    stale.add(index)
+
+        next_module_id = last_module_id + 1
+        # The last range is counted again with the new StudentModules until it is full
+        if (distributions[-1].num_modules < ANSWER_DISTRIBUTION_SHARD_SIZE and
+                modules.filter(id__gt=last_module_id).exists()):
+            last_distribution = distributions.pop()
+            stale.discard(len(distributions))
+            next_module_id = last_distribution.first_module_id
+            last_distribution.delete()
+
+        for index in stale:
+            distribution = distributions[index]
+            distributions[index] = count_answers(course_id, distribution.first_module_id,
+                                                 distribution.last_module_id)
+
+    while True:
+        distribution = count_answers(course_id, next_module_id)
+        if distribution is None:
+            break
+        distributions.append(distribution)
+        if distribution.num_modules < ANSWER_DISTRIBUTION_SHARD_SIZE:
+            break
+        next_module_id = distribution.last_module_id + 1
+
+    return distributions
+
+
 def answer_distributions(request, course):
     """
     Given a course_descriptor, compute frequencies of answers for each problem:
@@ -100,21 +245,25 @@ def answer_distributions(request, course):
 
     dict: (problem url_name, problem display_name, problem_id) -> (dict : answer ->  count)
 
-    TODO (vshnayder): this is currently doing a full linear pass through all
-    students and all problems.  This will be just a little slow.
+    Only the problems in graded sections are included.  The answers are counted from the
+    problem StudentModules of the course (see count_answers), and only the StudentModules
+    modified since the last call are counted again.  `request` isn't used.
     """
+    problems = dict((descriptor.location.url(), descriptor)
+                    for descriptor in course.grading_context['all_descriptors']
+                    if isinstance(descriptor, CapaDescriptor))
 
     counts = defaultdict(lambda: defaultdict(int))
 
-    enrolled_students = User.objects.filter(courseenrollment__course_id=course.id)
-
-    for student in enrolled_students:
-        for capa_module in yield_problems(request, course, student):
-            for problem_id in capa_module.lcp.student_answers:
-                # Answer can be a list or some other unhashable element.  Convert to string.
-                answer = str(capa_module.lcp.student_answers[problem_id])
-                key = (capa_module.url_name, capa_module.display_name_with_default, problem_id)
-                counts[key][answer] += 1
+    for distribution in refresh_answer_distributions(course.id):
+        for module_state_key, answer_counts in json.loads(distribution.counts).iteritems():
+            descriptor = problems.get(module_state_key)
+            if descriptor is None:
+                continue
+            for problem_id, answers in answer_counts.iteritems():
+                key = (descriptor.url_name, descriptor.display_name_with_default, problem_id)
+                for answer, count in answers.iteritems():
+                    counts[key][answer] += count
 
     return counts
 
@@ -136,72 +285,117 @@ def grade(student, request, course, model_data_cache=None, keep_raw_scores=False
     - keep_raw_scores : if True, then value for key 'raw_scores' contains scores for every graded module
 
     More information on the format is in the docstring for CourseGrader.
+
+    If MITX_FEATURES['ENABLE_SECTION_GRADE_CACHE'] is set, the scores of each graded
+    section are cached in OfflineComputedSectionGrade, and only the sections whose
+    StudentModules have changed since they were cached are recomputed.
     """
 
     grading_context = course.grading_context
-    raw_scores = []
 
-    if model_data_cache is None:
-        model_data_cache = ModelDataCache(grading_context['all_descriptors'], course.id, student)
+    # The cache is read before we load the StudentModules, so that any write made
+    # after they are loaded marks the cached sections dirty.
+    section_grade_cache = _get_section_grade_cache(student, course)
 
-    totaled_scores = {}
-    # This next complicated loop is just to collect the totaled_scores, which is
-    # passed to the grader
-    for section_format, sections in grading_context['graded_sections'].iteritems():
-        format_scores = []
-        for section in sections:
-            section_descriptor = section['section_descriptor']
-            section_name = section_descriptor.display_name_with_default
+    model_data_caches = [model_data_cache]
 
-            should_grade_section = False
-            # If we haven't seen a single problem in the section, we don't have to grade it at all! We can assume 0%
-            for moduledescriptor in section['xmoduledescriptors']:
-                # some problems have state that is updated independently of interaction
-                # with the LMS, so they need to always be scored. (E.g. foldit.)
-                if moduledescriptor.always_recalculate_grades:
-                    should_grade_section = True
-                    break
+    def get_model_data_cache():
+        """
+        Returns the ModelDataCache to grade with. If we weren't given one, it is only
+        loaded once a section actually has to be graded.
+        """
+        if model_data_caches[0] is None:
+            model_data_caches[0] = ModelDataCache(grading_context['all_descriptors'], course.id, student)
+        return model_data_caches[0]
 
-                # Create a fake key to pull out a StudentModule object from the ModelDataCache
+    return _grade(student, request, course, get_model_data_cache, keep_raw_scores, {}, section_grade_cache)
 
-                key = LmsKeyValueStore.Key(
-                    Scope.user_state,
-                    student.id,
-                    moduledescriptor.location,
-                    None
-                )
-                if model_data_cache.find(key):
-                    should_grade_section = True
-                    break
 
-            if should_grade_section:
-                scores = []
+def _get_section_grade_cache(student, course):
+    """
+    Returns the SectionGradeCache of the student in the course, or None if the
+    section scores aren't cached (see grade())
+    """
+    if (settings.MITX_FEATURES.get('ENABLE_SECTION_GRADE_CACHE') and student.is_authenticated()
+            and not settings.GENERATE_PROFILE_SCORES):
+        return SectionGradeCache(student, course)
+    return None
+
 
-                def create_module(descriptor):
-                    '''creates an XModule instance given a descriptor'''
-                    # TODO: We need the request to pass into here. If we could forego that, our arguments
-                    # would be simpler
-                    return get_module_for_descriptor(student, request, descriptor, model_data_cache, course.id)
+def grade_students(students, request, course, keep_raw_scores=False, chunk_size=STUDENT_CHUNK_SIZE):
+    """
+    Grades many students in a course. This yields (student, gradeset) pairs, where
+    each gradeset is exactly what grade(student, request, course, keep_raw_scores=keep_raw_scores)
+    would have returned.
+
+    Rather than loading the courseware data for each student separately, the data for
+    `chunk_size` students at a time is loaded with a single set of queries, and the
+    descendants of each graded section are only walked once for all students (unless
+    the section contains modules with dynamic children, which can differ per student).
+
+    students: An iterable of User objects (e.g. a QuerySet of enrolled students)
+    """
+    grading_context = course.grading_context
 
-                for module_descriptor in yield_dynamic_descriptor_descendents(section_descriptor, create_module):
+    section_descendents = {}
+    for sections in grading_context['graded_sections'].itervalues():
+        for section in sections:
+            section_descriptor = section['section_descriptor']
+            section_descendents[section_descriptor.location.url()] = static_descriptor_descendents(section_descriptor)
 
-                    (correct, total) = get_score(course.id, student, module_descriptor, create_module, model_data_cache)
-                    if correct is None and total is None:
-                        continue
+    students = iter(students)
+    while True:
+        student_chunk = list(islice(students, chunk_size))
+        if not student_chunk:
+            break
 
-                    if settings.GENERATE_PROFILE_SCORES:  	# for debugging!
-                        if total > 1:
-                            correct = random.randrange(max(total - 2, 1), total + 1)
-                        else:
-                            correct = total
+        model_data_caches = ModelDataCache.cache_for_students(
+            grading_context['all_descriptors'], course.id, student_chunk
+        )
+        for student in student_chunk:
+            model_data_cache = model_data_caches.get(student.id)
+            if model_data_cache is None:
+                # Anonymous users don't have any data to load
+                model_data_cache = ModelDataCache(grading_context['all_descriptors'], course.id, student)
+            yield student, _grade(student, request, course, lambda: model_data_cache, keep_raw_scores,
+                                  section_descendents)
 
-                    graded = module_descriptor.lms.graded
-                    if not total > 0:
-                        #We simply cannot grade a problem that is 12/0, because we might need it as a percentage
-                        graded = False
 
-                    scores.append(Score(correct, total, graded, module_descriptor.display_name_with_default))
+def _grade(student, request, course, get_model_data_cache, keep_raw_scores, section_descendents,
+           section_grade_cache=None):
+    """
+    Implements grade().
+
+    get_model_data_cache: A function that returns the ModelDataCache to grade with
+    section_descendents: A dict mapping the url of a graded section to the list of
+        its descendants, as returned by static_descriptor_descendents. Sections that
+        are missing from the dict (or mapped to None) are walked for this student.
+    section_grade_cache: A SectionGradeCache to read section scores from, and to
+        store recomputed section scores in, or None to compute every section.
+    """
+    grading_context = course.grading_context
+    raw_scores = []
 
+    totaled_scores = {}
+    # This next complicated loop is just to collect the totaled_scores, which is
+    # passed to the grader
+    for section_format, sections in grading_context['graded_sections'].iteritems():
+        format_scores = []
+        for section in sections:
+            section_descriptor = section['section_descriptor']
+            section_name = section_descriptor.display_name_with_default
+
+            found, scores = False, None
+            if section_grade_cache is not None:
+                found, scores = section_grade_cache.get(section)
+
+            if not found:
+                scores = _section_scores(student, request, course, section, get_model_data_cache(),
+                                         section_descendents.get(section_descriptor.location.url()))
+                if section_grade_cache is not None:
+                    section_grade_cache.set(section, scores)
+
+            if scores is not None:
                 _, graded_total = graders.aggregate_scores(scores, section_name)
                 if keep_raw_scores:
                     raw_scores += scores
@@ -232,6 +426,186 @@ def grade(student, request, course, model_data_cache=None, keep_raw_scores=False
     return grade_summary
 
 
+def _section_scores(student, request, course, section, model_data_cache, descendents=None):
+    """
+    Returns the list of Scores for the modules in a graded section, or None if the
+    student hasn't seen a single problem in the section (in which case the section
+    doesn't have to be graded at all, and we can assume 0%).
+
+    section: An entry of course.grading_context['graded_sections']
+    descendents: The descendants of the section, if they are known not to depend on
+        the student. Otherwise they are walked for this student.
+    """
+    section_descriptor = section['section_descriptor']
+
+    should_grade_section = False
+    for moduledescriptor in section['xmoduledescriptors']:
+        # some problems have state that is updated independently of interaction
+        # with the LMS, so they need to always be scored. (E.g. foldit.)
+        if moduledescriptor.always_recalculate_grades:
+            should_grade_section = True
+            break
+
+        # Create a fake key to pull out a StudentModule object from the ModelDataCache
+
+        key = LmsKeyValueStore.Key(
+            Scope.user_state,
+            student.id,
+            moduledescriptor.location,
+            None
+        )
+        if model_data_cache.find(key):
+            should_grade_section = True
+            break
+
+    if not should_grade_section:
+        return None
+
+    scores = []
+
+    def create_module(descriptor):
+        '''creates an XModule instance given a descriptor'''
+        # TODO: We need the request to pass into here. If we could forego that, our arguments
+        # would be simpler
+        return get_module_for_descriptor(student, request, descriptor, model_data_cache, course.id)
+
+    if descendents is None:
+        descendents = yield_dynamic_descriptor_descendents(section_descriptor, create_module)
+
+    for module_descriptor in descendents:
+
+        (correct, total) = get_score(course.id, student, module_descriptor, create_module, model_data_cache)
+        if correct is None and total is None:
+            continue
+
+        if settings.GENERATE_PROFILE_SCORES:  	# for debugging!
+            if total > 1:
+                correct = random.randrange(max(total - 2, 1), total + 1)
+            else:
+                correct = total
+
+        graded = module_descriptor.lms.graded
+        if not total > 0:
+            #We simply cannot grade a problem that is 12/0, because we might need it as a percentage
+            graded = False
+
+        scores.append(Score(correct, total, graded, module_descriptor.display_name_with_default))
+
+    return scores
+
+
+class SectionGradeCache(object):
+    """
+    Reads and writes the OfflineComputedSectionGrade rows that cache the section
+    scores of a student in a course.
+    """
+    def __init__(self, student, course):
+        self.student = student
+        self.course = course
+        self._signatures = {}
+        self._staff_access = None
+
+        self.rows = dict(
+            (row.section, row)
+            for row in OfflineComputedSectionGrade.objects.filter(user=student, course_id=course.id)
+        )
+
+        # Create (dirty) rows for the sections that don't have one yet, so that
+        # StudentModule writes can mark them dirty while they are being computed
+        for sections in course.grading_context['graded_sections'].itervalues():
+            for section in sections:
+                section_url = section['section_descriptor'].location.url()
+                if section_url not in self.rows:
+                    self.rows[section_url], _ = OfflineComputedSectionGrade.objects.get_or_create(
+                        user=student,
+                        course_id=course.id,
+                        section=section_url,
+                        defaults={'module_state_keys': self._module_state_keys(section)},
+                    )
+
+    @staticmethod
+    def _module_state_keys(section):
+        """
+        Returns the module_state_keys of the StudentModules that can affect the
+        scores of the section, as JSON
+        """
+        return json.dumps([descriptor.location.url() for descriptor in section['xmoduledescriptors']])
+
+    def _access(self, descriptors):
+        """
+        Returns whether the student is course staff (which they aren't while
+        masquerading as a student), and whether they can load each of the
+        descriptors, which changes e.g. when a start date passes. Scores depend
+        on these through the access checks of get_score and get_module.
+        """
+        if self._staff_access is None:
+            self._staff_access = has_access(self.student, self.course, 'staff')
+        if self._staff_access:
+            # staff can load everything
+            return True, None
+        return False, [has_access(self.student, descriptor, 'load', self.course.id) for descriptor in descriptors]
+
+    def signature(self, section):
+        """
+        Returns a fingerprint of the course content and the student's access that
+        the scores of the section depend on, or None if the scores of the section
+        can't be cached.
+        """
+        section_descriptor = section['section_descriptor']
+        section_url = section_descriptor.location.url()
+        if section_url not in self._signatures:
+            signature = None
+            # Modules that always need their grades recalculated can't be cached
+            if not any(descriptor.always_recalculate_grades for descriptor in section['xmoduledescriptors']):
+                content = [(section_url, section_descriptor.display_name_with_default)]
+                content.extend(
+                    (descriptor.location.url(), descriptor.display_name_with_default, descriptor.weight,
+                     descriptor.lms.graded, getattr(descriptor, 'data', None))
+                    for descriptor in section['xmoduledescriptors']
+                )
+                content.append(self._access([section_descriptor] + section['xmoduledescriptors']))
+                signature = hashlib.md5(repr(content)).hexdigest()
+            self._signatures[section_url] = signature
+        return self._signatures[section_url]
+
+    def get(self, section):
+        """
+        Returns (True, scores) if clean scores for the section are cached, where
+        scores is as returned by _section_scores. Otherwise, returns (False, None).
+        """
+        row = self.rows.get(section['section_descriptor'].location.url())
+        signature = self.signature(section)
+        if row is None or row.dirty or signature is None or row.signature != signature:
+            return False, None
+
+        scores = json.loads(row.scores) if row.scores is not None else None
+        if scores is not None:
+            scores = [Score(*score) for score in scores]
+        return True, scores
+
+    def set(self, section, scores):
+        """
+        Cache the scores computed for the section. They are stored as clean only if
+        the row hasn't been marked dirty since it was read.
+        """
+        row = self.rows.get(section['section_descriptor'].location.url())
+        signature = self.signature(section)
+        if row is None or signature is None:
+            return
+
+        row.signature = signature
+        row.module_state_keys = self._module_state_keys(section)
+        row.scores = json.dumps(scores) if scores is not None else None
+        updated = OfflineComputedSectionGrade.objects.filter(pk=row.pk, generation=row.generation).update(
+            signature=row.signature,
+            module_state_keys=row.module_state_keys,
+            scores=row.scores,
+            dirty=False,
+            updated=datetime.now(UTC),
+        )
+        row.dirty = not updated
+
+
 def grade_for_percentage(grade_cutoffs, percentage):
     """
     Returns a letter grade as defined in grading_policy (e.g. 'A' 'B' 'C' for 6.002x) or None.
@@ -257,7 +631,7 @@ def grade_for_percentage(grade_cutoffs, percentage):
 # TODO: This method is not very good. It was written in the old course style and
 # then converted over and performance is not good. Once the progress page is redesigned
 # to not have the progress summary this method should be deleted (so it won't be copied).
-def progress_summary(student, request, course, model_data_cache):
+def progress_summary(student, request, course, model_data_cache=None):
     """
     This pulls a summary of all problems in the course.
 
@@ -272,71 +646,133 @@ def progress_summary(student, request, course, model_data_cache):
         student: A User object for the student to grade
         course: A Descriptor containing the course to grade
         model_data_cache: A ModelDataCache initialized with all
-             instance_modules for the student
+             instance_modules for the student, or None to load it only
+             once a section actually has to be scored
 
     If the student does not have access to load the course module, this function
     will return None.
 
+    If MITX_FEATURES['ENABLE_SECTION_GRADE_CACHE'] is set, the scores of the graded
+    sections are read from and stored in the same cache as grade() uses, so that
+    only the sections that changed since they were cached are scored.
     """
-
-    # TODO: We need the request to pass into here. If we could forego that, our arguments
-    # would be simpler
-    course_module = get_module(student, request, course.location, model_data_cache, course.id, depth=None)
-    if not course_module:
+    if not has_access(student, course, 'load', course.id):
         # This student must not have access to the course.
         return None
 
+    section_grade_cache = _get_section_grade_cache(student, course)
+    graded_sections = {}
+    if section_grade_cache is not None:
+        for sections in course.grading_context['graded_sections'].itervalues():
+            for section in sections:
+                graded_sections[section['section_descriptor'].location.url()] = section
+
+    model_data_caches = [model_data_cache]
+
+    def get_model_data_cache():
+        """
+        Returns the ModelDataCache to score sections with, loading it the first time
+        """
+        if model_data_caches[0] is None:
+            model_data_caches[0] = ModelDataCache.cache_for_descriptor_descendents(
+                course.id, student, course, depth=None)
+        return model_data_caches[0]
+
     chapters = []
-    # Don't include chapters that aren't displayable (e.g. due to error)
-    for chapter_module in course_module.get_display_items():
+    # Don't include chapters that the student can't load
+    for chapter_descriptor in _loadable_children(student, course, course.id):
         # Skip if the chapter is hidden
-        if chapter_module.lms.hide_from_toc:
+        if chapter_descriptor.lms.hide_from_toc:
             continue
 
         sections = []
-        for section_module in chapter_module.get_display_items():
+        for section_descriptor in _loadable_children(student, chapter_descriptor, course.id):
             # Skip if the section is hidden
-            if section_module.lms.hide_from_toc:
+            if section_descriptor.lms.hide_from_toc:
                 continue
 
             # Same for sections
-            graded = section_module.lms.graded
-            scores = []
-
-            module_creator = section_module.system.get_module
-
-            for module_descriptor in yield_dynamic_descriptor_descendents(section_module.descriptor, module_creator):
-
-                course_id = course.id
-                (correct, total) = get_score(course_id, student, module_descriptor, module_creator, model_data_cache)
-                if correct is None and total is None:
-                    continue
-
-                scores.append(Score(correct, total, graded, module_descriptor.display_name_with_default))
+            graded = section_descriptor.lms.graded
+            section = graded_sections.get(section_descriptor.location.url())
+            if section is None:
+                scores = _progress_scores(student, request, course, section_descriptor, get_model_data_cache())
+            else:
+                found, section_scores = section_grade_cache.get(section)
+                if not found:
+                    section_scores = _section_scores(student, request, course, section, get_model_data_cache())
+                    section_grade_cache.set(section, section_scores)
+
+                if section_scores is not None:
+                    scores = [Score(score.earned, score.possible, graded, score.section) for score in section_scores]
+                else:
+                    # The student hasn't seen a problem in the section, so unless its
+                    # children depend on the student, there is no data to load to score it
+                    descendents = static_descriptor_descendents(section_descriptor)
+                    if descendents is not None:
+                        scores = _progress_scores(student, request, course, section_descriptor,
+                                                  ModelDataCache([], course.id, student), descendents)
+                    else:
+                        scores = _progress_scores(student, request, course, section_descriptor,
+                                                  get_model_data_cache())
 
             scores.reverse()
             section_total, _ = graders.aggregate_scores(
-                scores, section_module.display_name_with_default)
+                scores, section_descriptor.display_name_with_default)
 
-            module_format = section_module.lms.format if section_module.lms.format is not None else ''
+            module_format = section_descriptor.lms.format if section_descriptor.lms.format is not None else ''
             sections.append({
-                'display_name': section_module.display_name_with_default,
-                'url_name': section_module.url_name,
+                'display_name': section_descriptor.display_name_with_default,
+                'url_name': section_descriptor.url_name,
                 'scores': scores,
                 'section_total': section_total,
                 'format': module_format,
-                'due': section_module.lms.due,
+                'due': section_descriptor.lms.due,
                 'graded': graded,
             })
 
         chapters.append({'course': course.display_name_with_default,
-                         'display_name': chapter_module.display_name_with_default,
-                         'url_name': chapter_module.url_name,
+                         'display_name': chapter_descriptor.display_name_with_default,
+                         'url_name': chapter_descriptor.url_name,
                          'sections': sections})
 
     return chapters
 
 
+def _loadable_children(student, descriptor, course_id):
+    """
+    Returns the children of descriptor that the student has access to load
+    """
+    return [child for child in descriptor.get_children() if has_access(student, child, 'load', course_id)]
+
+
+def _progress_scores(student, request, course, section_descriptor, model_data_cache, descendents=None):
+    """
+    Returns the list of Scores of the problems in a section, as shown by progress_summary,
+    from the student's data in model_data_cache.
+
+    descendents: The descendants of the section, if they are known not to depend on
+        the student. Otherwise they are walked for this student.
+    """
+    graded = section_descriptor.lms.graded
+    scores = []
+
+    def create_module(descriptor):
+        '''creates an XModule instance given a descriptor'''
+        return get_module_for_descriptor(student, request, descriptor, model_data_cache, course.id)
+
+    if descendents is None:
+        descendents = yield_dynamic_descriptor_descendents(section_descriptor, create_module)
+
+    for module_descriptor in descendents:
+        (correct, total) = get_score(course.id, student, module_descriptor, create_module, model_data_cache)
+        if correct is None and total is None:
+            continue
+
+        scores.append(Score(correct, total, graded, module_descriptor.display_name_with_default))
+
+    return scores
+
+
 def get_score(course_id, user, problem_descriptor, module_creator, model_data_cache):
     """
     Return the score for a user on a problem, as a tuple (correct, total).
@@ -381,6 +817,13 @@ def get_score(course_id, user, problem_descriptor, module_creator, model_data_ca
     if student_module is not None and student_module.max_grade is not None:
         correct = student_module.grade if student_module.grade is not None else 0
         total = student_module.max_grade
+    elif (problem_descriptor.precomputed_max_score() is not None and
+          has_access(user, problem_descriptor, 'load', course_id)):
+        # The max score was computed when the problem was imported or saved,
+        # so there's no need to instantiate the problem. (Creating the module
+        # would have checked access, though, so do that here.)
+        correct = 0.0
+        total = problem_descriptor.precomputed_max_score()
     else:
         # If the problem was not in the cache, or hasn't been graded yet,
         # we need to instantiate the problem.
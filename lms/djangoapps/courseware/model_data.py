@@ -24,6 +24,26 @@ class InvalidWriteError(Exception):
     """
 
 
+# module class -> {scope: frozenset of the names of the fields in that scope}
+_FIELD_SCOPE_MAPS = {}
+
+
+def field_scope_map(module_class):
+    """
+    Returns a dict mapping each scope to the names of the fields of
+    module_class (including its lms fields) in that scope.  This is worked
+    out once per class.
+    """
+    scope_map = _FIELD_SCOPE_MAPS.get(module_class)
+    if scope_map is None:
+        names = defaultdict(set)
+        for field in chain(module_class.fields, module_class.lms.fields):
+            names[field.scope].add(field.name)
+        scope_map = dict((scope, frozenset(field_names)) for scope, field_names in names.items())
+        _FIELD_SCOPE_MAPS[module_class] = scope_map
+    return scope_map
+
+
 def chunks(items, chunk_size):
     """
     Yields the values from items in chunks of size chunk_size
@@ -55,6 +75,7 @@ class ModelDataCache(object):
         self.select_for_update = select_for_update
         self.course_id = course_id
         self.user = user
+        self._location_urls = None
 
         if user.is_authenticated():
             for scope, fields in self._fields_to_cache().items():
@@ -79,23 +100,24 @@ class ModelDataCache(object):
         def get_child_descriptors(descriptor, depth, descriptor_filter):
             """
             Return a list of all child descriptors down to the specified depth
-            that match the descriptor filter. Includes `descriptor`
+            that match the descriptor filter, in depth-first order. Includes `descriptor`
 
             descriptor: The parent to search inside
             depth: The number of levels to descend, or None for infinite depth
             descriptor_filter(descriptor): A function that returns True
                 if descriptor should be included in the results
             """
-            if descriptor_filter(descriptor):
-                descriptors = [descriptor]
-            else:
-                descriptors = []
-
-            if depth is None or depth > 0:
-                new_depth = depth - 1 if depth is not None else depth
-
-                for child in descriptor.get_children() + descriptor.get_required_module_descriptors():
-                    descriptors.extend(get_child_descriptors(child, new_depth, descriptor_filter))
+            descriptors = []
+            stack = [(descriptor, depth)]
+            while stack:
+                descriptor, depth = stack.pop()
+                if descriptor_filter(descriptor):
+                    descriptors.append(descriptor)
+
+                if depth is None or depth > 0:
+                    new_depth = depth - 1 if depth is not None else depth
+                    children = descriptor.get_children() + descriptor.get_required_module_descriptors()
+                    stack.extend((child, new_depth) for child in reversed(children))
 
             return descriptors
 
@@ -103,6 +125,48 @@ class ModelDataCache(object):
 
         return ModelDataCache(descriptors, course_id, user, select_for_update)
 
+    @classmethod
+    def cache_for_students(cls, descriptors, course_id, students, select_for_update=False):
+        """
+        Build a ModelDataCache for each of `students`, loading the data for all of them
+        with a single set of (chunked) queries, rather than one set of queries per student.
+
+        descriptors: A list of XModuleDescriptors.
+        course_id: the course in the context of which we want StudentModules.
+        students: A list of django users. Keep this list small enough that the
+            student ids fit in a single query (a few hundred at most).
+        select_for_update: Flag indicating whether the rows should be locked until end of transaction
+
+        Returns a dict mapping student id to the ModelDataCache for that student. Each
+        of these caches holds exactly what ModelDataCache(descriptors, course_id, student)
+        would have loaded.
+        """
+        descriptors = list(descriptors)
+        caches = {}
+        for student in students:
+            # Passing no descriptors here means that no queries are made
+            # while constructing the per-student caches
+            model_data_cache = cls([], course_id, student, select_for_update)
+            model_data_cache.descriptors = descriptors
+            if student.is_authenticated():
+                caches[student.id] = model_data_cache
+
+        if not caches:
+            return caches
+
+        loader = caches.itervalues().next()
+        for scope, fields in loader._fields_to_cache().items():
+            for field_object in loader._retrieve_fields(scope, fields, student_ids=caches.keys()):
+                cache_key = loader._cache_key_from_field_object(scope, field_object)
+                if scope in (Scope.content, Scope.settings):
+                    # content and settings fields aren't specific to a student
+                    for model_data_cache in caches.itervalues():
+                        model_data_cache.cache[cache_key] = field_object
+                else:
+                    caches[field_object.student_id].cache[cache_key] = field_object
+
+        return caches
+
     def _query(self, model_class, **kwargs):
         """
         Queries model_class with **kwargs, optionally adding select_for_update if
@@ -128,9 +192,35 @@ class ModelDataCache(object):
         )
         return res
 
-    def _retrieve_fields(self, scope, fields):
+    def _student_filter(self, student_ids):
+        """
+        Returns the query arguments that select the rows belonging to the students
+        with ids `student_ids`, or to self.user if `student_ids` is None
         """
-        Queries the database for all of the fields in the specified scope
+        if student_ids is None:
+            return {'student': self.user.pk}
+        return {'student__in': student_ids}
+
+    def _get_location_urls(self):
+        """
+        Returns the urls of the locations of self.descriptors, without duplicates
+        """
+        if self._location_urls is None:
+            seen = set()
+            self._location_urls = []
+            for descriptor in self.descriptors:
+                url = descriptor.location.url()
+                if url not in seen:
+                    seen.add(url)
+                    self._location_urls.append(url)
+        return self._location_urls
+
+    def _retrieve_fields(self, scope, field_names, student_ids=None):
+        """
+        Queries the database for all of the fields named field_names in the specified scope
+
+        student_ids: If not None, retrieve the fields of all of these students
+            rather than just those of self.user
         """
         if scope in (Scope.children, Scope.parent):
             return []
@@ -138,52 +228,49 @@ class ModelDataCache(object):
             return self._chunked_query(
                 StudentModule,
                 'module_state_key__in',
-                (descriptor.location.url() for descriptor in self.descriptors),
+                self._get_location_urls(),
                 course_id=self.course_id,
-                student=self.user.pk,
+                **self._student_filter(student_ids)
             )
         elif scope == Scope.content:
             return self._chunked_query(
                 XModuleContentField,
                 'definition_id__in',
-                (descriptor.location.url() for descriptor in self.descriptors),
-                field_name__in=set(field.name for field in fields),
+                self._get_location_urls(),
+                field_name__in=field_names,
             )
         elif scope == Scope.settings:
             return self._chunked_query(
                 XModuleSettingsField,
                 'usage_id__in',
-                (
-                    '%s-%s' % (self.course_id, descriptor.location.url())
-                    for descriptor in self.descriptors
-                ),
-                field_name__in=set(field.name for field in fields),
+                ['%s-%s' % (self.course_id, url) for url in self._get_location_urls()],
+                field_name__in=field_names,
             )
         elif scope == Scope.preferences:
             return self._chunked_query(
                 XModuleStudentPrefsField,
                 'module_type__in',
                 set(descriptor.module_class.__name__ for descriptor in self.descriptors),
-                student=self.user.pk,
-                field_name__in=set(field.name for field in fields),
+                field_name__in=field_names,
+                **self._student_filter(student_ids)
             )
         elif scope == Scope.user_info:
             return self._query(
                 XModuleStudentInfoField,
-                student=self.user.pk,
-                field_name__in=set(field.name for field in fields),
+                field_name__in=field_names,
+                **self._student_filter(student_ids)
             )
         else:
             raise InvalidScopeError(scope)
 
     def _fields_to_cache(self):
         """
-        Returns a map of scopes to fields in that scope that should be cached
+        Returns a map of scopes to the names of the fields in that scope that should be cached
         """
         scope_map = defaultdict(set)
-        for descriptor in self.descriptors:
-            for field in (descriptor.module_class.fields + descriptor.module_class.lms.fields):
-                scope_map[field.scope].add(field)
+        for module_class in set(descriptor.module_class for descriptor in self.descriptors):
+            for scope, field_names in field_scope_map(module_class).iteritems():
+                scope_map[scope].update(field_names)
         return scope_map
 
     def _cache_key_from_kvs_key(self, key):
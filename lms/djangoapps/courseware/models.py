@@ -12,9 +12,13 @@ file and check it in at the same time as your model changes. To do that,
 ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
+import json
+
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 
@@ -247,6 +251,68 @@ class OfflineComputedGrade(models.Model):
         return "[OfflineComputedGrade] %s: %s (%s) = %s" % (self.user, self.course_id, self.created, self.gradeset)
 
 
+class OfflineComputedSectionGrade(models.Model):
+    """
+    Cache of the scores in one graded section (subsection) of a course for a user,
+    as computed by grades.grade().
+
+    Rows are marked dirty whenever one of the StudentModules that can affect the
+    section changes, and the next call to grades.grade() recomputes only the dirty
+    sections.
+    """
+    user = models.ForeignKey(User, db_index=True)
+    course_id = models.CharField(max_length=255, db_index=True)
+    section = models.CharField(max_length=255)		# location url of the section
+
+    created = models.DateTimeField(auto_now_add=True, null=True, db_index=True)
+    updated = models.DateTimeField(auto_now=True, db_index=True)
+
+    # fingerprint of the course content the scores were computed from
+    signature = models.CharField(max_length=32, blank=True)
+
+    # module_state_keys of the StudentModules that can change the scores, stored as JSON
+    module_state_keys = models.TextField(default='[]')
+
+    # [earned, possible, graded, section] for each scored module, stored as JSON.
+    # null if the user hadn't attempted anything in the section.
+    scores = models.TextField(null=True, blank=True)
+
+    dirty = models.BooleanField(default=True)
+
+    # Incremented every time the row is marked dirty, so that scores computed from
+    # data read before the row was marked dirty are never saved as clean
+    generation = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = (('user', 'course_id', 'section'), )
+
+    @classmethod
+    def mark_dirty(cls, user_id, course_id, module_state_key):
+        """
+        Mark the sections of the course that contain module_state_key as dirty for the user
+        """
+        cls.objects.filter(
+            user=user_id,
+            course_id=course_id,
+            module_state_keys__contains=json.dumps(module_state_key),
+        ).update(dirty=True, generation=F('generation') + 1)
+
+    def __unicode__(self):
+        return "[OfflineComputedSectionGrade] %s: %s %s (%s) = %s" % (self.user, self.course_id, self.section,
+                                                                     'dirty' if self.dirty else 'clean', self.scores)
+
+
+@receiver(post_save, sender=StudentModule)
+@receiver(post_delete, sender=StudentModule)
+def invalidate_section_grades(sender, instance, **kwargs):
+    """
+    Mark the cached grades of the sections containing a StudentModule dirty
+    whenever it is written or deleted
+    """
+    if settings.MITX_FEATURES.get('ENABLE_SECTION_GRADE_CACHE'):
+        OfflineComputedSectionGrade.mark_dirty(instance.student_id, instance.course_id, instance.module_state_key)
+
+
 class OfflineComputedGradeLog(models.Model):
     """
     Log of when offline grades are computed.
@@ -263,3 +329,35 @@ class OfflineComputedGradeLog(models.Model):
 
     def __unicode__(self):
         return "[OCGLog] %s: %s" % (self.course_id, self.created)
+
+
+class OfflineComputedAnswerDistribution(models.Model):
+    """
+    Counts of the answers in a range of the problem StudentModules of a course,
+    as computed by grades.count_answers().
+
+    The problem StudentModules of a course are counted in ranges of consecutive
+    ids, each of which is only counted again once one of its StudentModules has
+    been modified since it was `computed`.
+    """
+    course_id = models.CharField(max_length=255, db_index=True)
+
+    # ids of the first and last StudentModules of the range
+    first_module_id = models.IntegerField()
+    last_module_id = models.IntegerField()
+
+    # number of problem StudentModules of the course in the range
+    num_modules = models.IntegerField(default=0)
+
+    # when the StudentModules were read
+    computed = models.DateTimeField()
+
+    # module_state_key -> answer id -> answer -> count, stored as JSON
+    counts = models.TextField(default='{}')
+
+    class Meta:
+        unique_together = (('course_id', 'first_module_id'), )
+
+    def __unicode__(self):
+        return "[OfflineComputedAnswerDistribution] %s: %s-%s (%s)" % (self.course_id, self.first_module_id,
+                                                                       self.last_module_id, self.computed)
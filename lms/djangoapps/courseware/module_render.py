@@ -19,6 +19,7 @@ from statsd import statsd
 
 from capa.xqueue_interface import XQueueInterface
 from mitxmako.shortcuts import render_to_string
+from xblock.core import Scope
 from xblock.runtime import DbModel
 from xmodule.error_module import ErrorDescriptor, NonStaffErrorDescriptor
 from xmodule.errortracker import exc_info_to_str
@@ -27,7 +28,7 @@ from xmodule.modulestore import Location
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.x_module import ModuleSystem
-from xmodule_modifiers import replace_course_urls, replace_static_urls, add_histogram, wrap_xmodule
+from xmodule_modifiers import replace_course_urls, replace_static_urls, add_histogram, wrap_xmodule, cache_html
 
 import static_replace
 from psychometrics.psychoanalyze import make_psychometrics_data_update_handler
@@ -35,12 +36,16 @@ from student.models import unique_id_for_user
 
 from courseware.access import has_access
 from courseware.masquerade import setup_masquerade
-from courseware.model_data import LmsKeyValueStore, LmsUsage, ModelDataCache
+from courseware.model_data import LmsKeyValueStore, LmsUsage, ModelDataCache, field_scope_map
 from courseware.models import StudentModule
+from request_cache.middleware import get_or_compute
 from util.sandboxing import can_execute_unsafe_code
 
 log = logging.getLogger(__name__)
 
+# the scopes of fields that hold data about the user
+USER_SCOPES = (Scope.user_state, Scope.preferences, Scope.user_info)
+
 
 if settings.XQUEUE_INTERFACE.get('basic_auth') is not None:
     requests_auth = HTTPBasicAuth(*settings.XQUEUE_INTERFACE['basic_auth'])
@@ -345,6 +350,7 @@ def get_module_for_descriptor_internal(user, descriptor, model_data_cache, cours
     # pass position specified in URL to module through ModuleSystem
     system.set('position', position)
     system.set('DEBUG', settings.DEBUG)
+    system.set('lazy_sequence_tabs', settings.MITX_FEATURES.get('ENABLE_LAZY_SEQUENCE_TABS', False))
     if settings.MITX_FEATURES.get('ENABLE_PSYCHOMETRICS'):
         system.set('psychometrics_handler',  # set callback for updating PsychometricsData
                    make_psychometrics_data_update_handler(course_id, user, descriptor.location.url()))
@@ -383,6 +389,11 @@ def get_module_for_descriptor_internal(user, descriptor, model_data_cache, cours
     #   hierarchy of this course
     module.get_html = replace_course_urls(module.get_html, course_id)
 
+    if settings.MITX_FEATURES.get('ENABLE_MODULE_HTML_CACHE'):
+        html_cache_key = get_html_cache_key(module, descriptor, course_id, wrap_xmodule_display)
+        if html_cache_key is not None:
+            module.get_html = cache_html(module.get_html, cache, html_cache_key, settings.MODULE_HTML_CACHE_TIMEOUT)
+
     if settings.MITX_FEATURES.get('DISPLAY_HISTOGRAMS_TO_STAFF'):
         if has_access(user, module, 'staff', course_id):
             module.get_html = add_histogram(module.get_html, module, user)
@@ -390,6 +401,35 @@ def get_module_for_descriptor_internal(user, descriptor, model_data_cache, cours
     return module
 
 
+def get_course_edited_on(location):
+    """
+    Returns when the course containing location was last edited in the
+    modulestore (see get_course_edited_on), remembered for the rest of the request
+    """
+    key = ('courseware.course_edited_on', location.org, location.course)
+    return get_or_compute(key, lambda: modulestore().get_course_edited_on(location))
+
+
+def get_html_cache_key(module, descriptor, course_id, wrap_xmodule_display):
+    """
+    Returns the key to cache the html of module under, or None if it can't be
+    cached: that is, unless the html is the same for every user, the module
+    has no fields about the user, and the modulestore can tell when the
+    course was last edited.  The key changes with each edit of the course.
+    """
+    if not module.has_static_html():
+        return None
+    scope_map = field_scope_map(descriptor.module_class)
+    if any(scope in scope_map for scope in USER_SCOPES):
+        return None
+    edited_on = get_course_edited_on(descriptor.location)
+    if edited_on is None:
+        return None
+    return "courseware.module_html.{0}.{1}.{2!r}.{3}".format(
+        course_id, descriptor.location.url(), edited_on, int(wrap_xmodule_display)
+    )
+
+
 @csrf_exempt
 def xqueue_callback(request, course_id, userid, mod_id, dispatch):
     '''
@@ -3,7 +3,7 @@ from mock import Mock
 from functools import partial
 
 from courseware.model_data import LmsKeyValueStore, InvalidWriteError
-from courseware.model_data import InvalidScopeError, ModelDataCache
+from courseware.model_data import InvalidScopeError, ModelDataCache, field_scope_map
 from courseware.models import StudentModule, XModuleContentField, XModuleSettingsField
 from courseware.models import XModuleStudentInfoField, XModuleStudentPrefsField
 
@@ -139,6 +139,64 @@ class TestStudentModuleStorage(TestCase):
         self.assertFalse(self.kvs.has(user_state_key('not_a_field')))
 
 
+class TestCacheForStudents(TestCase):
+
+    def setUp(self):
+        self.student_modules = [
+            StudentModuleFactory(state=json.dumps({'a_field': 'value_%d' % index}))
+            for index in range(3)
+        ]
+        self.users = [student_module.student for student_module in self.student_modules]
+        self.descriptors = [mock_descriptor([mock_field(Scope.user_state, 'a_field')])]
+
+    def test_cache_per_student(self):
+        "Test that each student's cache only holds that student's StudentModule"
+        caches = ModelDataCache.cache_for_students(self.descriptors, course_id, self.users)
+        self.assertEquals(set(user.id for user in self.users), set(caches))
+        for index, user in enumerate(self.users):
+            kvs = LmsKeyValueStore({}, caches[user.id])
+            self.assertEquals('value_%d' % index, kvs.get(user_state_key('a_field')))
+
+    def test_matches_single_student_cache(self):
+        "Test that the batched caches hold the same data as caches built one student at a time"
+        caches = ModelDataCache.cache_for_students(self.descriptors, course_id, self.users)
+        for user in self.users:
+            self.assertEquals(
+                ModelDataCache(self.descriptors, course_id, user).cache,
+                caches[user.id].cache
+            )
+
+
+class TestQueries(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory.create(username='user')
+        module_class = mock_descriptor(
+            [mock_field(Scope.user_state, 'a_field'), mock_field(Scope.content, 'b_field')],
+            [mock_field(Scope.settings, 'c_field')],
+        ).module_class
+        # many descriptors of the same class, some of them at the same location
+        self.descriptors = [mock_descriptor() for index in range(20)]
+        for index, descriptor in enumerate(self.descriptors):
+            descriptor.module_class = module_class
+            descriptor.location = location('def_id_%d' % (index % 10))
+
+    def test_one_query_per_scope(self):
+        "Test that each scope is loaded with a single query, however many descriptors there are"
+        with self.assertNumQueries(3):
+            mdc = ModelDataCache(self.descriptors, course_id, self.user)
+        self.assertEquals(10, len(mdc._get_location_urls()))
+
+    def test_field_scope_map_per_class(self):
+        "Test that the fields of each class are mapped to their scopes once"
+        module_class = self.descriptors[0].module_class
+        self.assertIs(field_scope_map(module_class), field_scope_map(module_class))
+        self.assertEquals(
+            {Scope.user_state: set(['a_field']), Scope.content: set(['b_field']), Scope.settings: set(['c_field'])},
+            field_scope_map(module_class)
+        )
+
+
 class TestMissingStudentModule(TestCase):
     def setUp(self):
         self.user = UserFactory.create(username='user')
@@ -1,6 +1,7 @@
-from mock import MagicMock
+from mock import MagicMock, patch
 import json
 
+from django.core.cache import cache
 from django.http import Http404, HttpResponse
 from django.core.urlresolvers import reverse
 from django.conf import settings
@@ -8,7 +9,9 @@ from django.test import TestCase
 from django.test.client import RequestFactory
 from django.test.utils import override_settings
 
+from xmodule.modulestore import Location
 from xmodule.modulestore.django import modulestore
+from request_cache.middleware import RequestCache
 import courseware.module_render as render
 from courseware.tests.tests import LoginEnrollmentTestCase
 from courseware.model_data import ModelDataCache
@@ -170,3 +173,53 @@ class TestTOC(TestCase):
 
         actual = render.toc_for_course(self.portal_user, request, self.toy_course, chapter, section, model_data_cache)
         assert reduce(lambda x, y: x and (y in actual), expected, True)
+
+
+@override_settings(MODULESTORE=TEST_DATA_XML_MODULESTORE)
+class TestModuleHtmlCache(TestCase):
+    """Check that the html of modules that is the same for every student is cached"""
+    def setUp(self):
+        self.course_id = 'edX/toy/2012_Fall'
+        self.user = UserFactory()
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user
+        self.descriptor = modulestore().get_instance(self.course_id, Location('i4x://edX/toy/html/secret:toylab'))
+        self.original_data = self.descriptor.data
+        self.addCleanup(setattr, self.descriptor, 'data', self.original_data)
+        cache.clear()
+        RequestCache().clear_request_cache()
+        self.addCleanup(RequestCache().clear_request_cache)
+
+    def get_html(self, descriptor):
+        model_data_cache = ModelDataCache([descriptor], self.course_id, self.user)
+        module = render.get_module_for_descriptor(self.user, self.request, descriptor, model_data_cache, self.course_id)
+        return module.get_html()
+
+    def test_cached_until_edited(self):
+        with patch.dict(settings.MITX_FEATURES, {'ENABLE_MODULE_HTML_CACHE': True}):
+            html = self.get_html(self.descriptor)
+            self.descriptor.data = u'<p>Changed</p>'
+            self.assertEquals(html, self.get_html(self.descriptor))
+
+            with patch.object(modulestore(), 'get_course_edited_on', return_value=0):
+                RequestCache().clear_request_cache()
+                self.assertIn('Changed', self.get_html(self.descriptor))
+
+    def test_not_cached_when_disabled(self):
+        with patch.dict(settings.MITX_FEATURES, {'ENABLE_MODULE_HTML_CACHE': False}):
+            self.get_html(self.descriptor)
+            self.descriptor.data = u'<p>Changed</p>'
+            self.assertIn('Changed', self.get_html(self.descriptor))
+
+    def test_user_specific_html_not_cached(self):
+        self.descriptor.data = u'<p>%%USER_ID%%</p>'
+        model_data_cache = ModelDataCache([self.descriptor], self.course_id, self.user)
+        module = render.get_module_for_descriptor(self.user, self.request, self.descriptor, model_data_cache, self.course_id)
+        self.assertIsNone(render.get_html_cache_key(module, self.descriptor, self.course_id, True))
+
+    def test_modules_with_user_state_not_cached(self):
+        descriptor = modulestore().get_instance(self.course_id, Location('i4x://edX/toy/video/Welcome'))
+        model_data_cache = ModelDataCache([descriptor], self.course_id, self.user)
+        module = render.get_module_for_descriptor(self.user, self.request, descriptor, model_data_cache, self.course_id)
+        with patch.object(module, 'has_static_html', return_value=True):
+            self.assertIsNone(render.get_html_cache_key(module, descriptor, self.course_id, True))
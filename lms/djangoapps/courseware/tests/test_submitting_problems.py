@@ -2,8 +2,10 @@
 
 # text processing dependancies
 import json
+from mock import patch
 from textwrap import dedent
 
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.test.client import RequestFactory
 from django.core.urlresolvers import reverse
@@ -12,6 +14,7 @@ from django.test.utils import override_settings
 # Need access to internal func to put users in the right group
 from courseware import grades
 from courseware.model_data import ModelDataCache
+from courseware.models import StudentModule
 
 from xmodule.modulestore.django import modulestore
 
@@ -475,6 +478,114 @@ class TestCourseGrader(TestSubmittingProblems):
         self.assertEqual(self.score_for_hw('homework3'), [1.0, 1.0])
 
 
+    @override_settings(MITX_FEATURES=dict(settings.MITX_FEATURES, ENABLE_SECTION_GRADE_CACHE=True))
+    def test_section_grade_cache(self):
+        """
+        Test that cached section scores are only recomputed once the section changes.
+        """
+        self.dropping_setup()
+        self.dropping_homework_stage1()
+        self.check_grade_percent(0.75)
+
+        # Every section is cached now, so none of them is recomputed
+        with patch('courseware.grades._section_scores') as mock_section_scores:
+            self.check_grade_percent(0.75)
+        self.assertFalse(mock_section_scores.called)
+
+        # Answering a problem only makes its own section dirty
+        self.submit_question_answer(self.hw3_names[0], {'2_1': 'Correct'})
+        with patch('courseware.grades._section_scores', wraps=grades._section_scores) as mock_section_scores:
+            self.assertEqual(self.earned_hw_scores(), [1.0, 2.0, 1.0])
+        self.assertEqual(mock_section_scores.call_count, 1)
+        self.check_grade_percent(0.75)
+
+        # The scores depend on the student's access too, so they are recomputed when it changes
+        self.student_user.is_staff = True
+        self.student_user.save()
+        with patch('courseware.grades._section_scores', wraps=grades._section_scores) as mock_section_scores:
+            self.check_grade_percent(0.75)
+        self.assertEqual(mock_section_scores.call_count, 3)
+
+    def test_progress_summary_section_grade_cache(self):
+        """
+        Test that the progress summary uses the cached section scores, without loading the student's data.
+        """
+        self.dropping_setup()
+        self.dropping_homework_stage1()
+        expected = self.get_progress_summary()
+
+        with override_settings(MITX_FEATURES=dict(settings.MITX_FEATURES, ENABLE_SECTION_GRADE_CACHE=True)):
+            # grading caches every section
+            self.check_grade_percent(0.75)
+            fake_request = self.factory.get(reverse('progress', kwargs={'course_id': self.course.id}))
+            with patch('courseware.grades._section_scores') as mock_section_scores:
+                with patch('courseware.grades.ModelDataCache.cache_for_descriptor_descendents') as mock_load:
+                    progress_summary = grades.progress_summary(self.student_user, fake_request, self.course)
+            self.assertFalse(mock_section_scores.called)
+            self.assertFalse(mock_load.called)
+
+        self.assertEqual(progress_summary, expected)
+
+    def test_grade_students_matches_grade(self):
+        """
+        Test that batch grading gives each student the same grades as grading them one at a time.
+        """
+        self.dropping_setup()
+        self.dropping_homework_stage1()
+
+        other_student = 'other@test.com'
+        self.create_account('u2', other_student, self.password)
+        self.activate_user(other_student)
+        other_user = User.objects.get(email=other_student)
+
+        fake_request = self.factory.get(reverse('progress',
+                                        kwargs={'course_id': self.course.id}))
+        students = [self.student_user, other_user]
+        gradesets = list(grades.grade_students(students, fake_request, self.course,
+                                               keep_raw_scores=True, chunk_size=1))
+
+        self.assertEqual([student for student, _ in gradesets], students)
+        for student, gradeset in gradesets:
+            self.assertEqual(gradeset, grades.grade(student, fake_request, self.course, keep_raw_scores=True))
+        self.assertEqual(gradesets[0][1]['percent'], 0.75)
+        self.assertEqual(gradesets[1][1]['percent'], 0.0)
+
+    @patch('courseware.grades.ANSWER_DISTRIBUTION_SHARD_SIZE', 1)
+    def test_answer_distributions(self):
+        """
+        Test that answers are counted from the StudentModules, and that only the StudentModules
+        modified or created since the last count are counted again.
+        """
+        self.basic_setup()
+        self.submit_question_answer('p1', {'2_1': 'Correct'})
+        self.submit_question_answer('p2', {'2_1': 'Incorrect'})
+
+        def answer_key(problem_url_name):
+            """The key of the answers to the problem in the answer distributions"""
+            answer_id = 'i4x-{0}-{1}-problem-{2}_2_1'.format(self.course.org, self.COURSE_SLUG, problem_url_name)
+            return (problem_url_name, problem_url_name, answer_id)
+
+        fake_request = self.factory.get(reverse('progress',
+                                        kwargs={'course_id': self.course.id}))
+        self.assertEqual(grades.answer_distributions(fake_request, self.course),
+                         {answer_key('p1'): {'Correct': 1}, answer_key('p2'): {'Incorrect': 1}})
+
+        self.reset_question_answer('p1')
+        self.submit_question_answer('p1', {'2_1': 'Incorrect'})
+        self.submit_question_answer('p3', {'2_1': 'Correct'})
+        with patch('courseware.grades.count_answers', wraps=grades.count_answers) as mock_count_answers:
+            self.assertEqual(grades.answer_distributions(fake_request, self.course),
+                             {answer_key('p1'): {'Incorrect': 1},
+                              answer_key('p2'): {'Incorrect': 1},
+                              answer_key('p3'): {'Correct': 1}})
+
+        module_ids = [StudentModule.objects.get(student=self.student_user,
+                                                module_state_key=self.problem_location(name)).id
+                      for name in ('p1', 'p2', 'p3')]
+        self.assertEqual([call[0][1:] for call in mock_count_answers.call_args_list],
+                         [(module_ids[0], module_ids[0]), (module_ids[1] + 1,), (module_ids[2] + 1,)])
+
+
 class TestPythonGradedResponse(TestSubmittingProblems):
     """
     Check that we can submit a schematic and custom response, and it answers properly.
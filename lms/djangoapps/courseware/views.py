@@ -263,7 +263,9 @@ def index(request, course_id, chapter=None, section=None,
     """
     user = User.objects.prefetch_related("groups").get(id=request.user.id)
     request.user = user	# keep just one instance of User
-    course = get_course_with_access(user, course_id, 'load', depth=2)
+    # the chapters and sections are only needed for the table of contents
+    with modulestore().structure_only():
+        course = get_course_with_access(user, course_id, 'load', depth=2)
     staff_access = has_access(user, course, 'staff')
     registered = registered_for_course(course, user)
     if not registered:
@@ -666,9 +668,14 @@ def progress(request, course_id, student_id=None):
     # additional DB lookup (this kills the Progress page in particular).
     student = User.objects.prefetch_related("groups").get(id=student.id)
 
-    model_data_cache = ModelDataCache.cache_for_descriptor_descendents(
-        course_id, student, course, depth=None)
+    model_data_cache = None
+    if not settings.MITX_FEATURES.get('ENABLE_SECTION_GRADE_CACHE'):
+        # Every section is scored, so load the student's data for all of them at once
+        model_data_cache = ModelDataCache.cache_for_descriptor_descendents(
+            course_id, student, course, depth=None)
 
+    # With the section grade cache, progress_summary scores (and caches) the graded
+    # sections that changed, so grade() then finds all of them cached
     courseware_summary = grades.progress_summary(student, request, course,
                                                  model_data_cache)
     grade_summary = grades.grade(student, request, course, model_data_cache)
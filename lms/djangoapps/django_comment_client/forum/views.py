@@ -1,3 +1,4 @@
+import functools
 import json
 import logging
 import xml.sax.saxutils as saxutils
@@ -26,10 +27,13 @@ log = logging.getLogger("edx.discussions")
 
 
 @login_required
-def get_threads(request, course_id, discussion_id=None, per_page=THREADS_PER_PAGE):
+def get_threads(request, course_id, discussion_id=None, per_page=THREADS_PER_PAGE, cc_user=None):
     """
     This may raise cc.utils.CommentClientError or
     cc.utils.CommentClientUnknownError if something goes wrong.
+
+    `cc_user` is the comments service user of request.user, if the caller
+    has already retrieved it.
     """
     default_query_params = {
         'page': 1,
@@ -45,15 +49,11 @@ def get_threads(request, course_id, discussion_id=None, per_page=THREADS_PER_PAG
 
     if not request.GET.get('sort_key'):
         # If the user did not select a sort key, use their last used sort key
-        cc_user = cc.User.from_django_user(request.user)
-        cc_user.retrieve()
+        if cc_user is None:
+            cc_user = cc.User.from_django_user(request.user)
+            cc_user.retrieve()
         # TODO: After the comment service is updated this can just be user.default_sort_key because the service returns the default value
         default_query_params['sort_key'] = cc_user.get('default_sort_key') or default_query_params['sort_key']
-    else:
-        # If the user clicked a sort key, update their default sort key
-        cc_user = cc.User.from_django_user(request.user)
-        cc_user.default_sort_key = request.GET.get('sort_key')
-        cc_user.save()
 
     #there are 2 dimensions to consider when executing a search with respect to group id
     #is user a moderator
@@ -81,7 +81,16 @@ def get_threads(request, course_id, discussion_id=None, per_page=THREADS_PER_PAG
                                                   'sort_order', 'text',
                                                   'tags', 'commentable_ids', 'flagged'])))
 
-    threads, page, num_pages = cc.Thread.search(query_params)
+    if request.GET.get('sort_key'):
+        # If the user clicked a sort key, update their default sort key while searching
+        sort_key_user = cc.User.from_django_user(request.user)
+        sort_key_user.default_sort_key = request.GET.get('sort_key')
+        (threads, page, num_pages), _ = cc.perform_requests([
+            functools.partial(cc.Thread.search, query_params),
+            sort_key_user.save,
+        ])
+    else:
+        threads, page, num_pages = cc.Thread.search(query_params)
 
     #now add the group name if the thread has a group id
     for thread in threads:
@@ -111,9 +120,11 @@ def inline_discussion(request, course_id, discussion_id):
     course = get_course_with_access(request.user, course_id, 'load')
 
     try:
-        threads, query_params = get_threads(request, course_id, discussion_id, per_page=INLINE_THREADS_PER_PAGE)
         cc_user = cc.User.from_django_user(request.user)
         user_info = cc_user.to_dict()
+        threads, query_params = get_threads(
+            request, course_id, discussion_id, per_page=INLINE_THREADS_PER_PAGE, cc_user=cc_user
+        )
     except (cc.utils.CommentClientError, cc.utils.CommentClientUnknownError):
         # TODO (vshnayder): since none of this code seems to be aware of the fact that
         # sometimes things go wrong, I suspect that the js client is also not
@@ -172,7 +183,9 @@ def forum_form_discussion(request, course_id):
     category_map = utils.get_discussion_category_map(course)
 
     try:
-        unsafethreads, query_params = get_threads(request, course_id)   # This might process a search query
+        user = cc.User.from_django_user(request.user)
+        user_info = user.to_dict()
+        unsafethreads, query_params = get_threads(request, course_id, cc_user=user)   # This might process a search query
         threads = [utils.safe_content(thread) for thread in unsafethreads]
     except cc.utils.CommentClientMaintenanceError:
         log.warning("Forum is in maintenance mode")
@@ -181,9 +194,6 @@ def forum_form_discussion(request, course_id):
         log.error("Error loading forum discussion threads: %s", str(err))
         raise Http404
 
-    user = cc.User.from_django_user(request.user)
-    user_info = user.to_dict()
-
     annotated_content_info = utils.get_metadata_for_threads(course_id, threads, request.user, user_info)
 
     for thread in threads:
@@ -240,13 +250,17 @@ def forum_form_discussion(request, course_id):
 def single_thread(request, course_id, discussion_id, thread_id):
     course = get_course_with_access(request.user, course_id, 'load')
     cc_user = cc.User.from_django_user(request.user)
-    user_info = cc_user.to_dict()
+    thread = cc.Thread.find(thread_id)
 
     try:
-        thread = cc.Thread.find(thread_id).retrieve(recursive=True, user_id=request.user.id)
+        cc.perform_requests([
+            cc_user.retrieve,
+            functools.partial(thread.retrieve, recursive=True, user_id=request.user.id),
+        ])
     except (cc.utils.CommentClientError, cc.utils.CommentClientUnknownError):
         log.error("Error loading single thread.")
         raise Http404
+    user_info = cc_user.to_dict()
 
     if request.is_ajax():
         courseware_context = get_courseware_context(thread, course)
@@ -267,7 +281,7 @@ def single_thread(request, course_id, discussion_id, thread_id):
         category_map = utils.get_discussion_category_map(course)
 
         try:
-            threads, query_params = get_threads(request, course_id)
+            threads, query_params = get_threads(request, course_id, cc_user=cc_user)
             threads.append(thread.to_dict())
         except (cc.utils.CommentClientError, cc.utils.CommentClientUnknownError):
             log.error("Error loading single thread.")
@@ -3,13 +3,18 @@ from util.cache import cache
 from django.core import cache
 cache = cache.get_cache('default')
 
+from django_comment_common.models import Role, FORUM_ROLE_STUDENT
+from xmodule.course_module import CourseDescriptor
+from xmodule.modulestore.django import modulestore
+
+CACHE_LIFESPAN = 60
+
 
 def cached_has_permission(user, permission, course_id=None):
     """
     Call has_permission if it's not cached. A change in a user's role or
     a role's permissions will only become effective after CACHE_LIFESPAN seconds.
     """
-    CACHE_LIFESPAN = 60
     key = "permission_%d_%s_%s" % (user.id, str(course_id), permission)
     val = cache.get(key, None)
     if val not in [True, False]:
@@ -25,6 +30,48 @@ def has_permission(user, permission, course_id=None):
     return False
 
 
+def get_permission_snapshot(user, course_id):
+    """
+    Returns a frozenset of the names of all the permissions that the user has
+    in the course, for checking many permissions at once (see
+    check_conditions_permissions).  Like cached_has_permission, a change in a
+    user's role or a role's permissions will only become effective after
+    CACHE_LIFESPAN seconds.
+    """
+    key = "permission_snapshot_%d_%s" % (user.id, str(course_id))
+    snapshot = cache.get(key, None)
+    if snapshot is None:
+        snapshot = _get_permission_snapshot(user, course_id)
+        cache.set(key, snapshot, CACHE_LIFESPAN)
+    return snapshot
+
+
+def _get_permission_snapshot(user, course_id):
+    """
+    Gets the permissions of all of the user's roles in the course in one
+    query, and applies the same rule as Role.has_permission for students in
+    courses that don't allow forum posts.
+    """
+    permissions = set()
+    student_posting_permissions = set()
+    rows = Role.objects.filter(users=user, course_id=course_id).values_list('name', 'permissions__name')
+    for role_name, permission in rows:
+        if permission is None:
+            # a role without any permissions
+            continue
+        if role_name == FORUM_ROLE_STUDENT and permission.startswith(('edit', 'update', 'create')):
+            student_posting_permissions.add(permission)
+        else:
+            permissions.add(permission)
+
+    student_posting_permissions -= permissions
+    if student_posting_permissions:
+        course = modulestore().get_instance(course_id, CourseDescriptor.id_to_location(course_id))
+        if course.forum_posts_allowed:
+            permissions |= student_posting_permissions
+    return frozenset(permissions)
+
+
 CONDITIONS = ['is_open', 'is_author']
 
 
@@ -49,18 +96,23 @@ def check_condition(user, condition, course_id, data):
     return handlers[condition](user, condition, course_id, data)
 
 
-def check_conditions_permissions(user, permissions, course_id, **kwargs):
+def check_conditions_permissions(user, permissions, course_id, permission_snapshot=None, **kwargs):
     """
     Accepts a list of permissions and proceed if any of the permission is valid.
     Note that ["can_view", "can_edit"] will proceed if the user has either
     "can_view" or "can_edit" permission. To use AND operator in between, wrap them in
     a list.
+
+    If `permission_snapshot` (from get_permission_snapshot) is given, the
+    permissions are checked against it instead of the cache.
     """
 
     def test(user, per, operator="or"):
         if isinstance(per, basestring):
             if per in CONDITIONS:
                 return check_condition(user, per, course_id, kwargs)
+            if permission_snapshot is not None:
+                return per in permission_snapshot
             return cached_has_permission(user, per, course_id=course_id)
         elif isinstance(per, list) and operator in ["and", "or"]:
             results = [test(user, x, operator="and") for x in per]
@@ -101,9 +153,9 @@ VIEW_PERMISSIONS = {
 }
 
 
-def check_permissions_by_view(user, course_id, content, name):
+def check_permissions_by_view(user, course_id, content, name, permission_snapshot=None):
     try:
         p = VIEW_PERMISSIONS[name]
     except KeyError:
         logging.warning("Permission for view named %s does not exist in permissions.py" % name)
-    return check_conditions_permissions(user, p, course_id, content=content)
+    return check_conditions_permissions(user, p, course_id, permission_snapshot=permission_snapshot, content=content)
@@ -5,7 +5,7 @@ from django.contrib.auth.models import User
 from django.test import TestCase
 
 from student.models import CourseEnrollment
-from django_comment_client.permissions import has_permission
+from django_comment_client.permissions import has_permission, get_permission_snapshot
 from django_comment_common.models import Role
 
 
@@ -48,3 +48,17 @@ class PermissionsTestCase(TestCase):
 
         self.student_role.add_permission(name)
         self.assertTrue(has_permission(self.student, name, self.course_id))
+
+    def testPermissionSnapshot(self):
+        name = self.random_str()
+        posting_name = 'create_' + self.random_str()
+        self.moderator_role.add_permission(name)
+        self.student_role.add_permission(posting_name)
+
+        moderator_snapshot = get_permission_snapshot(self.moderator, self.course_id)
+        self.assertIn(name, moderator_snapshot)
+        self.assertNotIn(posting_name, moderator_snapshot)
+
+        student_snapshot = get_permission_snapshot(self.student, self.course_id)
+        self.assertNotIn(name, student_snapshot)
+        self.assertEqual(posting_name in student_snapshot, has_permission(self.student, posting_name, self.course_id))
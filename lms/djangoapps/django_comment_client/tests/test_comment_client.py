@@ -0,0 +1,99 @@
+import threading
+
+from django.test import TestCase
+from mock import patch, Mock
+
+import comment_client as cc
+from comment_client import settings as cc_settings
+from comment_client import utils as cc_utils
+
+
+class PerformRequestTestCase(TestCase):
+
+    def setUp(self):
+        self.response = Mock(status_code=200, text='{"id": "1"}')
+        self.session = Mock()
+        self.session.request.return_value = self.response
+        patcher = patch('comment_client.utils._get_session', return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_uses_shared_session(self):
+        params = {'recursive': False}
+        self.assertEqual(cc_utils.perform_request('get', cc_settings.PREFIX + '/threads/1', params), {'id': '1'})
+        self.session.request.assert_called_once_with(
+            'get', cc_settings.PREFIX + '/threads/1',
+            params={'recursive': False, 'api_key': cc_settings.API_KEY}, timeout=5
+        )
+        # the params passed in aren't changed
+        self.assertEqual(params, {'recursive': False})
+
+    def test_errors(self):
+        self.response.status_code = 503
+        with self.assertRaises(cc_utils.CommentClientMaintenanceError):
+            cc_utils.perform_request('get', cc_settings.PREFIX + '/threads')
+
+        self.session.request.side_effect = Exception('Connection refused')
+        with self.assertRaises(cc_utils.CommentClientError):
+            cc_utils.perform_request('get', cc_settings.PREFIX + '/threads')
+
+    @patch('comment_client.utils.dog_stats_api')
+    def test_timed_by_endpoint(self, mock_dog_stats_api):
+        cc_utils.perform_request('put', cc_settings.PREFIX + '/threads/5190ee9e5c55d3fa03000006/votes')
+        mock_dog_stats_api.timer.assert_called_once_with(
+            'comment_client.request.time',
+            tags=['method:put', 'endpoint:/threads/:id/votes']
+        )
+
+    def test_endpoint_tags(self):
+        self.assertEqual(
+            cc_utils.endpoint_tags('get', cc_settings.PREFIX + '/i4x-MITx-999-course-Robot/threads'),
+            ['method:get', 'endpoint:/:id/threads']
+        )
+        self.assertEqual(
+            cc_utils.endpoint_tags('get', cc_settings.PREFIX + '/users/12/subscribed_threads'),
+            ['method:get', 'endpoint:/users/:id/subscribed_threads']
+        )
+        self.assertEqual(
+            cc_utils.endpoint_tags('get', cc_settings.PREFIX + '/search/threads'),
+            ['method:get', 'endpoint:/search/threads']
+        )
+
+
+class PerformRequestsTestCase(TestCase):
+
+    def test_results_in_order(self):
+        self.assertEqual(cc.perform_requests([lambda: 1, lambda: 2, lambda: 3]), [1, 2, 3])
+        self.assertEqual(cc.perform_requests([]), [])
+
+    def test_concurrent(self):
+        # each function waits for the other, so they only finish if they run at the same time
+        barrier = [threading.Event(), threading.Event()]
+
+        def wait_for_other(index):
+            barrier[index].set()
+            return barrier[1 - index].wait(5)
+
+        self.assertEqual(
+            cc.perform_requests([lambda: wait_for_other(0), lambda: wait_for_other(1)]),
+            [True, True]
+        )
+
+    def test_first_error_raised_after_all_finish(self):
+        finished = []
+
+        def fail(message):
+            raise cc_utils.CommentClientError(message)
+
+        def succeed():
+            finished.append(True)
+
+        with self.assertRaisesRegexp(cc_utils.CommentClientError, 'first'):
+            cc.perform_requests([succeed, lambda: fail('first'), lambda: fail('second'), succeed])
+        self.assertEqual(finished, [True, True])
+
+    @patch.object(cc_settings, 'MAX_CONCURRENT_REQUESTS', 1)
+    def test_not_concurrent(self):
+        threads = []
+        cc.perform_requests([lambda: threads.append(threading.current_thread())] * 2)
+        self.assertEqual(threads, [threading.current_thread()] * 2)
@@ -1,7 +1,9 @@
 from django.test import TestCase
+from mock import patch, Mock
 from student.tests.factories import UserFactory, CourseEnrollmentFactory
 from django_comment_common.models import Role, Permission
 from factories import RoleFactory
+from request_cache.middleware import RequestCache
 import django_comment_client.utils as utils
 
 
@@ -57,3 +59,84 @@ class AccessUtilsTestCase(TestCase):
 
         ret = utils.has_forum_access('student', self.course_id, 'NotARole')
         self.assertFalse(ret)
+
+
+class ContentInfoTestCase(TestCase):
+
+    @patch('django_comment_client.utils.get_permission_snapshot')
+    def test_get_metadata_for_threads(self, mock_snapshot):
+        mock_snapshot.return_value = frozenset(['create_sub_comment', 'update_comment', 'vote'])
+        user = Mock(id=1)
+        user_info = {'upvoted_ids': ['c1'], 'downvoted_ids': ['c2'], 'subscribed_thread_ids': ['t1']}
+        other_comment = {'id': 'c2', 'type': 'comment', 'closed': False, 'user_id': '2'}
+        own_comment = {'id': 'c1', 'type': 'comment', 'closed': False, 'user_id': '1', 'children': [other_comment]}
+        threads = [
+            {'id': 't1', 'type': 'thread', 'closed': False, 'user_id': '2', 'children': [own_comment]},
+            {'id': 't2', 'type': 'thread', 'closed': True, 'user_id': '1'},
+        ]
+
+        infos = utils.get_metadata_for_threads('edX/toy/2012_Fall', threads, user, user_info)
+
+        self.assertEqual(infos['t1'], {
+            'voted': '',
+            'subscribed': True,
+            'ability': {'editable': False, 'can_reply': False, 'can_endorse': False,
+                        'can_delete': False, 'can_openclose': False, 'can_vote': True},
+        })
+        self.assertEqual(infos['t2']['ability']['can_vote'], False)
+        self.assertEqual(infos['c1'], {
+            'voted': 'up',
+            'subscribed': False,
+            'ability': {'editable': True, 'can_reply': True, 'can_endorse': False,
+                        'can_delete': True, 'can_openclose': False, 'can_vote': True},
+        })
+        self.assertEqual(infos['c2'], {
+            'voted': 'down',
+            'subscribed': False,
+            'ability': {'editable': False, 'can_reply': True, 'can_endorse': False,
+                        'can_delete': False, 'can_openclose': False, 'can_vote': True},
+        })
+        # the permissions are only looked up once
+        self.assertEqual(mock_snapshot.call_count, 1)
+
+
+class DiscussionInfoTestCase(TestCase):
+
+    def setUp(self):
+        self.course = Mock(id='edX/toy/2012_Fall')
+        self.cache = {}
+        mock_cache = Mock(get=self.cache.get)
+        mock_cache.set = lambda key, value, timeout: self.cache.__setitem__(key, value)
+        patcher = patch('django_comment_client.utils.cache', mock_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        RequestCache().clear_request_cache()
+        self.addCleanup(RequestCache().clear_request_cache)
+
+    @patch('django_comment_client.utils.initialize_discussion_info')
+    @patch('django_comment_client.utils.modulestore')
+    def test_cached_until_edited(self, mock_modulestore, mock_initialize):
+        mock_modulestore.return_value.get_course_edited_on.return_value = 100.0
+        mock_initialize.return_value = {'id_map': {'a': {'title': 'A'}}, 'category_map': {}}
+
+        self.assertEqual(utils.get_discussion_id_map(self.course), {'a': {'title': 'A'}})
+        self.assertEqual(mock_initialize.call_count, 1)
+
+        # in the same request, and in later ones
+        utils.get_discussion_id_map(self.course)
+        RequestCache().clear_request_cache()
+        utils.get_discussion_id_map(self.course)
+        self.assertEqual(mock_initialize.call_count, 1)
+
+        mock_modulestore.return_value.get_course_edited_on.return_value = 200.0
+        utils.get_discussion_id_map(self.course)
+        self.assertEqual(mock_initialize.call_count, 2)
+
+    @patch('django_comment_client.utils.initialize_discussion_info')
+    @patch('django_comment_client.utils.modulestore')
+    def test_not_cached_without_edited_on(self, mock_modulestore, mock_initialize):
+        mock_modulestore.return_value.get_course_edited_on.return_value = None
+        mock_initialize.return_value = {'id_map': {}, 'category_map': {}}
+        utils.get_discussion_id_map(self.course)
+        utils.get_discussion_id_map(self.course)
+        self.assertEqual(mock_initialize.call_count, 2)
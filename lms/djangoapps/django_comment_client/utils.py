@@ -5,24 +5,29 @@ import urllib
 from datetime import datetime
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.db import connection
 from django.http import HttpResponse
 from django.utils import simplejson
 from django_comment_common.models import Role
-from django_comment_client.permissions import check_permissions_by_view
+from django_comment_client.permissions import check_permissions_by_view, check_condition, get_permission_snapshot
 
 from mitxmako import middleware
 import pystache_custom as pystache
 
 from xmodule.modulestore.django import modulestore
 from django.utils.timezone import UTC
+from request_cache.middleware import get_or_compute
 
 log = logging.getLogger(__name__)
 
+# How long the discussion info of a course is kept in the shared cache, in seconds.
+# It is rebuilt sooner if the course is edited.
+DISCUSSION_INFO_CACHE_TIMEOUT = 60 * 60
+
 # TODO these should be cached via django's caching rather than in-memory globals
 _FULLMODULES = None
-_DISCUSSIONINFO = defaultdict(dict)
 
 
 def extract(dic, keys):
@@ -73,19 +78,41 @@ def get_discussion_id_map(course):
     """
         return a dict of the form {category: modules}
     """
-    initialize_discussion_info(course)
-    return _DISCUSSIONINFO[course.id]['id_map']
+    return get_discussion_info(course)['id_map']
 
 
 def get_discussion_title(course, discussion_id):
-    initialize_discussion_info(course)
-    title = _DISCUSSIONINFO[course.id]['id_map'].get(discussion_id, {}).get('title', '(no title)')
+    title = get_discussion_info(course)['id_map'].get(discussion_id, {}).get('title', '(no title)')
     return title
 
 
 def get_discussion_category_map(course):
-    initialize_discussion_info(course)
-    return filter_unstarted_categories(_DISCUSSIONINFO[course.id]['category_map'])
+    return filter_unstarted_categories(get_discussion_info(course)['category_map'])
+
+
+def get_discussion_info(course):
+    """
+    Returns the discussion info of the course, as built by
+    initialize_discussion_info.  It is kept in the shared cache under the time
+    the course was last edited in the modulestore, so all processes share
+    it, and it's only rebuilt after the course is changed in Studio.  It is
+    also kept for the rest of the request.
+    """
+    edited_on = modulestore().get_course_edited_on(course.location)
+    if edited_on is None:
+        # there's no way to tell if it is still up to date
+        return initialize_discussion_info(course)
+
+    key = "django_comment_client.discussion_info.{0}.{1!r}".format(course.id, edited_on)
+
+    def load_info():
+        info = cache.get(key)
+        if info is None:
+            info = initialize_discussion_info(course)
+            cache.set(key, info, DISCUSSION_INFO_CACHE_TIMEOUT)
+        return info
+
+    return get_or_compute(key, load_info)
 
 
 def filter_unstarted_categories(category_map):
@@ -137,14 +164,20 @@ def sort_map_entries(category_map):
 
 
 def initialize_discussion_info(course):
+    """
+    Builds the discussion info of the course: a dict with the 'id_map' of
+    its discussions by id, and the 'category_map' of the discussion
+    categories shown in the forum.  Use get_discussion_info, which caches it.
+    """
     course_id = course.id
 
     discussion_id_map = {}
     unexpanded_category_map = defaultdict(list)
 
-    # get all discussion models within this course_id
-    all_modules = modulestore().get_items(['i4x', course.location.org, course.location.course,
-                                          'discussion', None], course_id=course_id)
+    # get all discussion models within this course_id (only their settings are used)
+    with modulestore().structure_only():
+        all_modules = modulestore().get_items(['i4x', course.location.org, course.location.course,
+                                              'discussion', None], course_id=course_id)
 
     for module in all_modules:
         skip_module = False
@@ -213,9 +246,11 @@ def initialize_discussion_info(course):
                                           "start_date": datetime.now(UTC())}
     sort_map_entries(category_map)
 
-    _DISCUSSIONINFO[course.id]['id_map'] = discussion_id_map
-    _DISCUSSIONINFO[course.id]['category_map'] = category_map
-    _DISCUSSIONINFO[course.id]['timestamp'] = datetime.now(UTC())
+    return {
+        'id_map': discussion_id_map,
+        'category_map': category_map,
+        'timestamp': datetime.now(UTC()),
+    }
 
 
 class JsonResponse(HttpResponse):
@@ -272,14 +307,20 @@ class QueryCountDebugMiddleware(object):
         return response
 
 
-def get_ability(course_id, content, user):
+def get_ability(course_id, content, user, permission_snapshot=None):
+    if permission_snapshot is None:
+        permission_snapshot = get_permission_snapshot(user, course_id)
+
+    def check(name):
+        return check_permissions_by_view(user, course_id, content, name, permission_snapshot=permission_snapshot)
+
     return {
-        'editable': check_permissions_by_view(user, course_id, content, "update_thread" if content['type'] == 'thread' else "update_comment"),
-        'can_reply': check_permissions_by_view(user, course_id, content, "create_comment" if content['type'] == 'thread' else "create_sub_comment"),
-        'can_endorse': check_permissions_by_view(user, course_id, content, "endorse_comment") if content['type'] == 'comment' else False,
-        'can_delete': check_permissions_by_view(user, course_id, content, "delete_thread" if content['type'] == 'thread' else "delete_comment"),
-        'can_openclose': check_permissions_by_view(user, course_id, content, "openclose_thread") if content['type'] == 'thread' else False,
-        'can_vote': check_permissions_by_view(user, course_id, content, "vote_for_thread" if content['type'] == 'thread' else "vote_for_comment"),
+        'editable': check("update_thread" if content['type'] == 'thread' else "update_comment"),
+        'can_reply': check("create_comment" if content['type'] == 'thread' else "create_sub_comment"),
+        'can_endorse': check("endorse_comment") if content['type'] == 'comment' else False,
+        'can_delete': check("delete_thread" if content['type'] == 'thread' else "delete_comment"),
+        'can_openclose': check("openclose_thread") if content['type'] == 'thread' else False,
+        'can_vote': check("vote_for_thread" if content['type'] == 'thread' else "vote_for_comment"),
     }
 
 # TODO: RENAME
@@ -289,16 +330,7 @@ def get_annotated_content_info(course_id, content, user, user_info):
     """
     Get metadata for an individual content (thread or comment)
     """
-    voted = ''
-    if content['id'] in user_info['upvoted_ids']:
-        voted = 'up'
-    elif content['id'] in user_info['downvoted_ids']:
-        voted = 'down'
-    return {
-        'voted': voted,
-        'subscribed': content['id'] in user_info['subscribed_thread_ids'],
-        'ability': get_ability(course_id, content, user),
-    }
+    return _content_annotator(course_id, user, user_info)(content)
 
 # TODO: RENAME
 
@@ -307,22 +339,59 @@ def get_annotated_content_infos(course_id, thread, user, user_info):
     """
     Get metadata for a thread and its children
     """
-    infos = {}
+    return get_metadata_for_threads(course_id, [thread], user, user_info)
 
-    def annotate(content):
-        infos[str(content['id'])] = get_annotated_content_info(course_id, content, user, user_info)
-        for child in content.get('children', []):
-            annotate(child)
-    annotate(thread)
+
+def get_metadata_for_threads(course_id, threads, user, user_info):
+    """
+    Get metadata for threads and all their children, keyed by content id
+    """
+    annotate = _content_annotator(course_id, user, user_info)
+    infos = {}
+    contents = list(reversed(threads))
+    while contents:
+        content = contents.pop()
+        infos[str(content['id'])] = annotate(content)
+        contents.extend(reversed(content.get('children', [])))
     return infos
 
 
-def get_metadata_for_threads(course_id, threads, user, user_info):
-    def infogetter(thread):
-        return get_annotated_content_infos(course_id, thread, user, user_info)
+def _content_annotator(course_id, user, user_info):
+    """
+    Returns a function that gets the metadata for a content (thread or comment).
 
-    metadata = reduce(merge_dict, map(infogetter, threads), {})
-    return metadata
+    The user's permissions are looked up once, and as the abilities only
+    depend on the type of the content, whether it is open and whether the
+    user is its author, they are only worked out once for each combination.
+    """
+    permission_snapshot = get_permission_snapshot(user, course_id)
+    upvoted_ids = set(user_info['upvoted_ids'])
+    downvoted_ids = set(user_info['downvoted_ids'])
+    subscribed_thread_ids = set(user_info['subscribed_thread_ids'])
+    abilities = {}
+
+    def annotate(content):
+        voted = ''
+        if content['id'] in upvoted_ids:
+            voted = 'up'
+        elif content['id'] in downvoted_ids:
+            voted = 'down'
+
+        data = {'content': content}
+        key = (
+            content['type'],
+            check_condition(user, 'is_open', course_id, data),
+            check_condition(user, 'is_author', course_id, data),
+        )
+        if key not in abilities:
+            abilities[key] = get_ability(course_id, content, user, permission_snapshot)
+
+        return {
+            'voted': voted,
+            'subscribed': content['id'] in subscribed_thread_ids,
+            'ability': dict(abilities[key]),
+        }
+    return annotate
 
 # put this method in utils.py to avoid circular import dependency between helpers and mustache_helpers
 
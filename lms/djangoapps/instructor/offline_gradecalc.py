@@ -49,8 +49,7 @@ def offline_grade_calculation(course_id):
     print "%d enrolled students" % len(enrolled_students)
     course = get_course_by_id(course_id)
 
-    for student in enrolled_students:
-        gradeset = grades.grade(student, request, course, keep_raw_scores=True)
+    for student, gradeset in grades.grade_students(enrolled_students, request, course, keep_raw_scores=True):
         gs = enc.encode(gradeset)
         ocg, created = models.OfflineComputedGrade.objects.get_or_create(user=student, course_id=course_id)
         ocg.gradeset = gs
@@ -93,3 +92,17 @@ def student_grades(student, request, course, keep_raw_scores=False, use_offline=
                     msg='Error: no offline gradeset available for %s, %s' % (student, course.id))
 
     return json.loads(ocg.gradeset)
+
+
+def iterate_student_grades(students, request, course, keep_raw_scores=False, use_offline=False):
+    '''
+    Yields (student, gradeset) for each of the students, where gradeset is what student_grades
+    returns for that student.  When grading online, the students are graded in batches.
+    '''
+    if not use_offline:
+        for student, gradeset in grades.grade_students(students, request, course, keep_raw_scores=keep_raw_scores):
+            yield student, gradeset
+        return
+
+    for student in students:
+        yield student, student_grades(student, request, course, keep_raw_scores=keep_raw_scores, use_offline=True)
@@ -2,6 +2,8 @@
 Tests of the instructor dashboard gradebook
 """
 
+from mock import Mock
+
 from django.test.utils import override_settings
 from django.core.urlresolvers import reverse
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
@@ -12,6 +14,7 @@ from capa.tests.response_xml_factory import StringResponseXMLFactory
 from courseware.tests.factories import StudentModuleFactory
 from xmodule.modulestore import Location
 from xmodule.modulestore.django import modulestore
+from instructor_task.api import submit_grade_report
 
 
 USER_COUNT = 11
@@ -22,7 +25,7 @@ class TestGradebook(ModuleStoreTestCase):
     grading_policy = None
 
     def setUp(self):
-        instructor = AdminFactory.create()
+        self.instructor = instructor = AdminFactory.create()
         self.client.login(username=instructor.username, password='test')
 
         modulestore().request_cache = modulestore().metadata_inheritance_cache_subsystem = None
@@ -149,3 +152,46 @@ class TestLetterCutoffPolicy(TestGradebook):
         # User 0 has 0 on the class [1]
         # One use at the top of the page [1]
         self.assertEquals(3, self.response.content.count('grade_None'))
+
+
+class TestGradebookFromReport(TestDefaultGradingPolicy):
+    """The gradebook shows the same grades from a grade report"""
+    def setUp(self):
+        super(TestGradebookFromReport, self).setUp()
+        request = Mock(user=self.instructor, META={'REMOTE_ADDR': '127.0.0.1', 'SERVER_NAME': 'testhost'})
+        request.get_host = Mock(return_value='testhost')
+        request.is_secure = Mock(return_value=False)
+        submit_grade_report(request, self.course.id)
+
+        self.response = self.client.get(reverse('gradebook', args=(self.course.id,)))
+
+    def test_from_report(self):
+        self.assertIn('Grades from the grade report', self.response.content)
+
+    def test_live(self):
+        response = self.client.get(reverse('gradebook', args=(self.course.id,)), {'live': 1})
+        self.assertNotIn('Grades from the grade report', response.content)
+
+    def test_old_report(self):
+        with override_settings(GRADEBOOK_MAX_REPORT_AGE=0):
+            response = self.client.get(reverse('gradebook', args=(self.course.id,)))
+        self.assertNotIn('Grades from the grade report', response.content)
+
+
+@override_settings(GRADEBOOK_PAGE_SIZE=5)
+class TestGradebookPages(TestGradebook):
+    def test_pages(self):
+        content = unicode(self.response.content, 'utf-8')
+        # the links to the students' progress pages
+        links = [u'>{0}</a>'.format(username) for username in sorted(user.username for user in self.users)]
+        for link in links[:5]:
+            self.assertIn(link, content)
+        for link in links[5:]:
+            self.assertNotIn(link, content)
+        self.assertIn('?page=2', content)
+
+        response = self.client.get(reverse('gradebook', args=(self.course.id,)), {'page': 3})
+        content = unicode(response.content, 'utf-8')
+        self.assertIn(links[10], content)
+        self.assertIn('?page=2', content)
+        self.assertNotIn('?page=4', content)
@@ -3,6 +3,7 @@ Instructor Views
 """
 from collections import defaultdict
 import csv
+from itertools import islice
 import json
 import logging
 from markupsafe import escape
@@ -11,12 +12,15 @@ import re
 import requests
 from requests.status_codes import codes
 from collections import OrderedDict
+from datetime import datetime, timedelta
+from pytz import UTC
 
 from StringIO import StringIO
 
 from django.conf import settings
 from django.contrib.auth.models import User, Group
-from django.http import HttpResponse
+from django.core.servers.basehttp import FileWrapper
+from django.http import HttpResponse, Http404
 from django_future.csrf import ensure_csrf_cookie
 from django.views.decorators.cache import cache_control
 from django.core.urlresolvers import reverse
@@ -36,12 +40,18 @@ from django_comment_common.models import (Role,
                                           FORUM_ROLE_MODERATOR,
                                           FORUM_ROLE_COMMUNITY_TA)
 from django_comment_client.utils import has_forum_access
-from instructor.offline_gradecalc import student_grades, offline_grades_available
+from instructor.offline_gradecalc import offline_grades_available, iterate_student_grades
 from instructor_task.api import (get_running_instructor_tasks,
                                  get_instructor_task_history,
+                                 get_grade_reports,
+                                 get_grade_report_name,
+                                 get_grade_report_storage,
+                                 submit_grade_report,
                                  submit_rescore_problem_for_all_students,
                                  submit_rescore_problem_for_student,
                                  submit_reset_problem_attempts_for_all_students)
+from instructor_task.api_helper import AlreadyRunningError
+from instructor_task.models import InstructorTask
 from instructor_task.views import get_task_completion_info
 from mitxmako.shortcuts import render_to_response
 from psychometrics import psychoanalyze
@@ -246,6 +256,15 @@ def instructor_dashboard(request, course_id):
         return return_csv('grades_{0}_raw.csv'.format(course_id),
                           get_student_grade_summary_data(request, course, course_id, get_raw_scores=True, use_offline=use_offline))
 
+    elif action in ['Generate grade report', 'Generate RAW grade report']:
+        raw_scores = 'RAW' in action
+        try:
+            submit_grade_report(request, course_id, raw_scores=raw_scores)
+            msg += '<font color="green">The grade report is being generated, and will be listed below when it is ready.</font>'
+            track.views.server_track(request, "generate-grade-report", {"raw": raw_scores, "course": course_id}, page="idashboard")
+        except AlreadyRunningError:
+            msg += '<font color="red">The grade report is already being generated.</font>'
+
     elif 'Download CSV of answer distributions' in action:
         track.views.server_track(request, "dump-answer-dist-csv", {}, page="idashboard")
         return return_csv('answer_dist_{0}.csv'.format(course_id), get_answers_distribution(request, course_id))
@@ -710,9 +729,18 @@ def instructor_dashboard(request, course_id):
     if use_offline:
         msg += "<br/><font color='orange'>Grades from %s</font>" % offline_grades_available(course_id)
 
-    # generate list of pending background tasks
+    # generate list of pending background tasks, and of the grade reports they generated
+    grade_reports = None
     if settings.MITX_FEATURES.get('ENABLE_INSTRUCTOR_BACKGROUND_TASKS'):
         instructor_tasks = get_running_instructor_tasks(course_id)
+        if idash_mode == 'Grades':
+            grade_reports = [
+                {'name': os.path.basename(get_grade_report_name(instructor_task)),
+                 'url': reverse('grade_report', kwargs={'course_id': course_id, 'task_id': instructor_task.task_id}),
+                 'created': instructor_task.created}
+                for instructor_task in get_grade_reports(course_id)[:settings.GRADE_REPORTS_LISTED]
+                if get_grade_report_name(instructor_task) is not None
+            ]
     else:
         instructor_tasks = None
 
@@ -736,6 +764,7 @@ def instructor_dashboard(request, course_id):
                'plots': plots,			# psychometrics
                'course_errors': modulestore().get_item_errors(course.location),
                'instructor_tasks': instructor_tasks,
+               'grade_reports': grade_reports,
                'djangopid': os.getpid(),
                'mitx_version': getattr(settings, 'MITX_VERSION_STRING', ''),
                'offline_grade_log': offline_grades_available(course_id),
@@ -972,20 +1001,17 @@ def get_student_grade_summary_data(request, course, course_id, get_grades=True,
 
     header = ['ID', 'Username', 'Full Name', 'edX email', 'External email']
     assignments = []
-    if get_grades and enrolled_students.count() > 0:
-        # just to construct the header
-        gradeset = student_grades(enrolled_students[0], request, course, keep_raw_scores=get_raw_scores, use_offline=use_offline)
-        # log.debug('student {0} gradeset {1}'.format(enrolled_students[0], gradeset))
-        if get_raw_scores:
-            assignments += [score.section for score in gradeset['raw_scores']]
-        else:
-            assignments += [x['label'] for x in gradeset['section_breakdown']]
-    header += assignments
 
     datatable = {'header': header, 'assignments': assignments, 'students': enrolled_students}
     data = []
 
-    for student in enrolled_students:
+    if get_grades:
+        student_gradesets = iterate_student_grades(enrolled_students, request, course,
+                                                   keep_raw_scores=get_raw_scores, use_offline=use_offline)
+    else:
+        student_gradesets = ((student, None) for student in enrolled_students)
+
+    for student, gradeset in student_gradesets:
         datarow = [student.id, student.username, student.profile.name, student.email]
         try:
             datarow.append(student.externalauthmap.external_email)
@@ -993,8 +1019,14 @@ def get_student_grade_summary_data(request, course, course_id, get_grades=True,
             datarow.append('')
 
         if get_grades:
-            gradeset = student_grades(student, request, course, keep_raw_scores=get_raw_scores, use_offline=use_offline)
             log.debug('student={0}, gradeset={1}'.format(student, gradeset))
+            if not data:
+                # the first student's gradeset is used to construct the header
+                if get_raw_scores:
+                    assignments += [score.section for score in gradeset['raw_scores']]
+                else:
+                    assignments += [x['label'] for x in gradeset['section_breakdown']]
+                header += assignments
             if get_raw_scores:
                 # TODO (ichuang) encode Score as dict instead of as list, so score[0] -> score['earned']
                 sgrades = [(getattr(score, 'earned', '') or score[0]) for score in gradeset['raw_scores']]
@@ -1010,27 +1042,85 @@ def get_student_grade_summary_data(request, course, course_id, get_grades=True,
 #-----------------------------------------------------------------------------
 
 
+def _get_latest_grade_report(course_id):
+    """
+    Returns the InstructorTask of the most recent grade report (without raw scores) of the course,
+    if it is less than settings.GRADEBOOK_MAX_REPORT_AGE seconds old, or None.
+    """
+    oldest = datetime.now(UTC) - timedelta(seconds=settings.GRADEBOOK_MAX_REPORT_AGE)
+    for instructor_task in get_grade_reports(course_id).filter(created__gte=oldest):
+        if not json.loads(instructor_task.task_input).get('raw_scores'):
+            return instructor_task if get_grade_report_name(instructor_task) is not None else None
+    return None
+
+
+def _read_grade_report(instructor_task, first, count):
+    """
+    Reads the students from `first` to `first + count` from the grade report of `instructor_task`.
+
+    Returns the student info for the gradebook of each of those students, and whether the report
+    has more students after them.
+    """
+    with get_grade_report_storage().open(get_grade_report_name(instructor_task)) as report:
+        reader = csv.reader(report)
+        header = next(reader)
+        # the columns are those of get_student_grade_summary_data, and then the total grade
+        labels = [label.decode('utf-8') for label in header[5:-1]]
+        rows = list(islice(reader, first, first + count + 1))
+
+    student_info = []
+    for row in rows[:count]:
+        row = [value.decode('utf-8') for value in row]
+        student_info.append({
+            'username': row[1],
+            'id': int(row[0]),
+            'email': row[3],
+            'grade_summary': {
+                'section_breakdown': [{'label': label, 'percent': float(percent)}
+                                      for label, percent in zip(labels, row[5:-1])],
+                'percent': float(row[-1]),
+            },
+            'realname': row[2],
+        })
+    return student_info, len(rows) > count
+
+
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
 def gradebook(request, course_id):
     """
     Show the gradebook for this course:
     - only displayed to course staff
-    - shows students who are enrolled.
+    - shows students who are enrolled, settings.GRADEBOOK_PAGE_SIZE at a time, in order of username.
+
+    The grades are read from the latest grade report generated for the course, if there is one
+    that is less than settings.GRADEBOOK_MAX_REPORT_AGE seconds old and the `live` parameter isn't
+    set, and computed otherwise.
     """
     course = get_course_with_access(request.user, course_id, 'staff', depth=None)
 
-    enrolled_students = User.objects.filter(courseenrollment__course_id=course_id).order_by('username').select_related("profile")
-
-    # TODO (vshnayder): implement pagination.
-    enrolled_students = enrolled_students[:1000]   # HACK!
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+    page_size = settings.GRADEBOOK_PAGE_SIZE
+    first = (page - 1) * page_size
+
+    live = bool(request.GET.get('live'))
+    grade_report = None if live else _get_latest_grade_report(course_id)
+    if grade_report is not None:
+        student_info, has_next = _read_grade_report(grade_report, first, page_size)
+    else:
+        enrolled_students = User.objects.filter(courseenrollment__course_id=course_id).order_by('username').select_related("profile")
+        enrolled_students = list(enrolled_students.prefetch_related("groups")[first:first + page_size + 1])
+        has_next = len(enrolled_students) > page_size
 
-    student_info = [{'username': student.username,
-                     'id': student.id,
-                     'email': student.email,
-                     'grade_summary': student_grades(student, request, course),
-                     'realname': student.profile.name,
-                     }
-                    for student in enrolled_students]
+        student_info = [{'username': student.username,
+                         'id': student.id,
+                         'email': student.email,
+                         'grade_summary': gradeset,
+                         'realname': student.profile.name,
+                         }
+                        for student, gradeset in iterate_student_grades(enrolled_students[:page_size], request, course)]
 
     return render_to_response('courseware/gradebook.html', {
         'students': student_info,
@@ -1039,9 +1129,34 @@ def gradebook(request, course_id):
         # Checked above
         'staff_access': True,
         'ordered_grades': sorted(course.grade_cutoffs.items(), key=lambda i: i[1], reverse=True),
+        'grade_report': grade_report,
+        'live': live,
+        'previous_page': page - 1 if page > 1 else None,
+        'next_page': page + 1 if has_next else None,
     })
 
 
+@cache_control(no_cache=True, no_store=True, must_revalidate=True)
+def grade_report(request, course_id, task_id):
+    """
+    Download the grade report generated by the task `task_id` for this course.
+    """
+    get_course_with_access(request.user, course_id, 'staff')
+
+    try:
+        instructor_task = get_grade_reports(course_id).get(task_id=task_id)
+    except InstructorTask.DoesNotExist:
+        raise Http404
+
+    report_name = get_grade_report_name(instructor_task)
+    if report_name is None:
+        # the report was deleted, see instructor_task.api.get_grade_reports
+        raise Http404
+    response = HttpResponse(FileWrapper(get_grade_report_storage().open(report_name)), mimetype='text/csv')
+    response['Content-Disposition'] = 'attachment; filename={0}'.format(os.path.basename(report_name))
+    return response
+
+
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
 def grade_summary(request, course_id):
     """Display the grade summary for a course."""
@@ -7,18 +7,23 @@ arguments.
 
 """
 
-from celery.states import READY_STATES
+import json
+
+from celery.states import READY_STATES, SUCCESS
 
 from xmodule.modulestore.django import modulestore
 
 from instructor_task.models import InstructorTask
 from instructor_task.tasks import (rescore_problem,
                                    reset_problem_attempts,
-                                   delete_problem_state)
+                                   delete_problem_state,
+                                   generate_grade_report)
 
 from instructor_task.api_helper import (check_arguments_for_rescoring,
                                         encode_problem_and_student_input,
+                                        encode_grade_report_input,
                                         submit_task)
+from instructor_task.tasks_helper import get_grade_report_storage
 
 
 def get_running_instructor_tasks(course_id):
@@ -45,6 +50,28 @@ def get_instructor_task_history(course_id, problem_url, student=None):
     return instructor_tasks.order_by('-id')
 
 
+def get_grade_reports(course_id):
+    """
+    Returns a query of the InstructorTask objects of the grade reports that have been
+    generated for a given course, most recent first.
+
+    The name of each report in the grade report storage (see get_grade_report_storage) is the
+    `report_name` in its task_output.  Only the settings.GRADE_REPORTS_LISTED most recent reports
+    are kept: the `report_name` of older ones is None.
+    """
+    instructor_tasks = InstructorTask.objects.filter(course_id=course_id, task_type='generate_grade_report',
+                                                     task_state=SUCCESS)
+    return instructor_tasks.order_by('-id')
+
+
+def get_grade_report_name(instructor_task):
+    """
+    Returns the name in the grade report storage of the report of the grade report task
+    `instructor_task`, or None if the report has been deleted.
+    """
+    return json.loads(instructor_task.task_output)['report_name']
+
+
 def submit_rescore_problem_for_student(request, course_id, problem_url, student):
     """
     Request a problem to be rescored as a background task.
@@ -162,3 +189,26 @@ def submit_delete_problem_state_for_all_students(request, course_id, problem_url
     task_class = delete_problem_state
     task_input, task_key = encode_problem_and_student_input(problem_url)
     return submit_task(request, task_type, task_class, course_id, task_input, task_key)
+
+
+def submit_grade_report(request, course_id, raw_scores=False):
+    """
+    Request a report of the grades of all students enrolled in a course, as a background task.
+
+    The report is a CSV file with a row for each student, holding the grade of each assignment
+    or, if `raw_scores` is True, the score of each graded problem.  Once the task has
+    succeeded, it is listed by get_grade_reports.
+
+    AlreadyRunningError is raised if the same report is already being generated for the course.
+
+    This method makes sure the InstructorTask entry is committed.
+    When called from any view that is wrapped by TransactionMiddleware,
+    and thus in a "commit-on-success" transaction, an autocommit buried within here
+    will cause any pending transaction to be committed by a successful
+    save here.  Any future database operations will take place in a
+    separate transaction.
+    """
+    task_type = 'generate_grade_report'
+    task_class = generate_grade_report
+    task_input, task_key = encode_grade_report_input(raw_scores)
+    return submit_task(request, task_type, task_class, course_id, task_input, task_key)
@@ -9,6 +9,7 @@ from courseware.module_render import get_xqueue_callback_url_prefix
 
 from xmodule.modulestore.django import modulestore
 from instructor_task.models import InstructorTask, PROGRESS
+from instructor_task.tasks_helper import aggregate_task_progress
 
 
 log = logging.getLogger(__name__)
@@ -142,6 +143,29 @@ def _update_instructor_task(instructor_task, task_result):
         instructor_task.save()
 
 
+def _update_instructor_task_from_subtasks(instructor_task, task_progress):
+    """
+    Updates the output of an InstructorTask entry, whose task was split into subtasks,
+    with the combined progress of the subtasks.
+
+    `task_progress` is the progress the entry was saved with when the subtasks were started.
+    The entry is updated in-place, but not saved: the task records its own result once all of
+    its subtasks have finished, and a failing subtask records the failure.
+    """
+    subtask_progresses = []
+    for index in range(task_progress['subtasks']):
+        result = AsyncResult(instructor_task.get_subtask_id(index))
+        returned_result = result.result
+        if result.state in [PROGRESS, SUCCESS] and isinstance(returned_result, dict):
+            subtask_progresses.append(returned_result)
+
+    progress = aggregate_task_progress(task_progress['action_name'], subtask_progresses)
+    # subtasks that haven't started don't count their modules yet
+    progress['total'] = task_progress['total']
+    progress['subtasks'] = task_progress['subtasks']
+    instructor_task.task_output = InstructorTask.create_output_for_success(progress)
+
+
 def get_updated_instructor_task(task_id):
     """
     Returns InstructorTask object corresponding to a given `task_id`.
@@ -159,8 +183,12 @@ def get_updated_instructor_task(task_id):
     # if the task is not already known to be done, then we need to query
     # the underlying task's result object:
     if instructor_task.task_state not in READY_STATES:
-        result = AsyncResult(task_id)
-        _update_instructor_task(instructor_task, result)
+        task_progress = json.loads(instructor_task.task_output) if instructor_task.task_output else {}
+        if 'subtasks' in task_progress:
+            _update_instructor_task_from_subtasks(instructor_task, task_progress)
+        else:
+            result = AsyncResult(task_id)
+            _update_instructor_task(instructor_task, result)
 
     return instructor_task
 
@@ -232,6 +260,16 @@ def encode_problem_and_student_input(problem_url, student=None):
     return task_input, task_key
 
 
+def encode_grade_report_input(raw_scores=False):
+    """
+    Encode whether a grade report holds the `raw_scores` of the graded problems into
+    task_key and task_input values.
+    """
+    task_input = {'raw_scores': raw_scores}
+    task_key = hashlib.md5("grade_report{raw}".format(raw='_raw' if raw_scores else '')).hexdigest()
+    return task_input, task_key
+
+
 def submit_task(request, task_type, task_class, course_id, task_input, task_key):
     """
     Helper method to submit a task.
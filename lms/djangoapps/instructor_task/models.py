@@ -121,6 +121,13 @@ class InstructorTask(models.Model):
         """
         self.save()
 
+    def get_subtask_id(self, index):
+        """
+        Returns the id used by celery for subtask number `index` of this task, for tasks
+        that are split into subtasks.  The number of subtasks is then in the task_output.
+        """
+        return '{task_id}.{index}'.format(task_id=self.task_id, index=index)
+
     @staticmethod
     def create_output_for_success(returned_result):
         """
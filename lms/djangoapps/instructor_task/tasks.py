@@ -18,14 +18,36 @@ object contains a 'task_input' row which is a JSON-encoded dict containing
 a problem URL and optionally a student.  These are used to set up the initial value
 of the query for traversing StudentModule objects.
 
+Tasks that update the modules of many students split the work into subtasks over
+ranges of StudentModule ids, which run in parallel as a chord.  The subtasks find their
+update and filter functions from the task_type of the InstructorTask.
+
 """
 from celery import task
+
+from instructor_task.models import InstructorTask
 from instructor_task.tasks_helper import (update_problem_module_state,
+                                          write_grade_report,
+                                          perform_problem_module_state_subtask,
+                                          record_problem_module_state_subtasks,
                                           rescore_problem_module_state,
                                           reset_attempts_module_state,
                                           delete_problem_module_state)
 
 
+def _filter_rescorable(modules_to_update):
+    """Only rescore the problems that have been answered"""
+    return modules_to_update.filter(state__contains='"done": true')
+
+
+# task_type -> (update function, action name, filter function)
+MODULE_STATE_UPDATES = {
+    'rescore_problem': (rescore_problem_module_state, 'rescored', _filter_rescorable),
+    'reset_problem_attempts': (reset_attempts_module_state, 'reset', None),
+    'delete_problem_state': (delete_problem_module_state, 'deleted', None),
+}
+
+
 @task
 def rescore_problem(entry_id, xmodule_instance_args):
     """Rescores a problem in a course, for all students or one specific student.
@@ -45,9 +67,7 @@ def rescore_problem(entry_id, xmodule_instance_args):
     `xmodule_instance_args` provides information needed by _get_module_instance_for_task()
     to instantiate an xmodule instance.
     """
-    action_name = 'rescored'
-    update_fcn = rescore_problem_module_state
-    filter_fcn = lambda(modules_to_update): modules_to_update.filter(state__contains='"done": true')
+    update_fcn, action_name, filter_fcn = MODULE_STATE_UPDATES['rescore_problem']
     return update_problem_module_state(entry_id,
                                        update_fcn, action_name, filter_fcn=filter_fcn,
                                        xmodule_instance_args=xmodule_instance_args)
@@ -68,8 +88,7 @@ def reset_problem_attempts(entry_id, xmodule_instance_args):
     `xmodule_instance_args` provides information needed by _get_module_instance_for_task()
     to instantiate an xmodule instance.
     """
-    action_name = 'reset'
-    update_fcn = reset_attempts_module_state
+    update_fcn, action_name, _ = MODULE_STATE_UPDATES['reset_problem_attempts']
     return update_problem_module_state(entry_id,
                                        update_fcn, action_name, filter_fcn=None,
                                        xmodule_instance_args=xmodule_instance_args)
@@ -90,8 +109,46 @@ def delete_problem_state(entry_id, xmodule_instance_args):
     `xmodule_instance_args` provides information needed by _get_module_instance_for_task()
     to instantiate an xmodule instance.
     """
-    action_name = 'deleted'
-    update_fcn = delete_problem_module_state
+    update_fcn, action_name, _ = MODULE_STATE_UPDATES['delete_problem_state']
     return update_problem_module_state(entry_id,
                                        update_fcn, action_name, filter_fcn=None,
                                        xmodule_instance_args=xmodule_instance_args)
+
+
+@task
+def update_problem_module_state_subtask(entry_id, first_id, last_id, xmodule_instance_args):
+    """Performs the part of an InstructorTask for the StudentModules with ids from `first_id` to `last_id`.
+
+    `entry_id` is the id value of the InstructorTask entry that corresponds to the whole task,
+    whose `task_type` is one of MODULE_STATE_UPDATES.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    update_fcn, action_name, filter_fcn = MODULE_STATE_UPDATES[entry.task_type]
+    return perform_problem_module_state_subtask(entry_id, first_id, last_id,
+                                                update_fcn, action_name, filter_fcn,
+                                                xmodule_instance_args=xmodule_instance_args)
+
+
+@task
+def finish_problem_module_state_subtasks(subtask_progresses, entry_id, start_time):
+    """Records the combined results of the subtasks of an InstructorTask, once they have all finished.
+
+    `subtask_progresses` are the results of the subtasks, and `entry_id` is the id value of the
+    InstructorTask entry that corresponds to the whole task.
+    """
+    return record_problem_module_state_subtasks(subtask_progresses, entry_id, start_time)
+
+
+@task
+def generate_grade_report(entry_id, xmodule_instance_args):
+    """Writes a CSV report of the grades of all students enrolled in a course.
+
+    `entry_id` is the id value of the InstructorTask entry that corresponds to this task.
+    The entry contains the `course_id` that identifies the course, as well as the
+    `task_input`, which may set `raw_scores` to report the scores of each graded problem
+    instead of the grade of each assignment.
+
+    The report is saved in the grade report storage, under the `report_name` in the task's output.
+    """
+    action_name = 'graded'
+    return write_grade_report(entry_id, action_name, xmodule_instance_args)
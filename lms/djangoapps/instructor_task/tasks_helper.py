@@ -4,28 +4,42 @@ running state of a course.
 
 """
 
+from collections import OrderedDict
+import csv
 import json
 from time import time
 from sys import exc_info
+from tempfile import NamedTemporaryFile
 from traceback import format_exc
 
-from celery import current_task
+from celery import current_task, chord, subtask
 from celery.utils.log import get_task_logger
 from celery.signals import worker_process_init
 from celery.states import SUCCESS, FAILURE
 
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.files import File
+from django.core.files.storage import get_storage_class
 from django.db import transaction
+from django.test.client import RequestFactory
 from dogapi import dog_stats_api
 
+from capa.responsetypes import StudentInputError, ResponseError, LoncapaProblemError
+from statsd import statsd
+from xmodule.exceptions import NotFoundError
 from xmodule.modulestore.django import modulestore
 
 import mitxmako.middleware as middleware
+from external_auth.models import ExternalAuthMap
 from track.views import task_track
 
+from courseware.courses import get_course_by_id
+from courseware.grades import grade_students
 from courseware.models import StudentModule
 from courseware.model_data import ModelDataCache
-from courseware.module_render import get_module_for_descriptor_internal
+from courseware.access import has_access
+from courseware.module_render import get_module_for_descriptor_internal, get_score_bucket
 from instructor_task.models import InstructorTask, PROGRESS
 
 # define different loggers for use within tasks and on client side
@@ -34,6 +48,9 @@ TASK_LOG = get_task_logger(__name__)
 # define value to use when no task_id is provided:
 UNKNOWN_TASK_ID = 'unknown-task_id'
 
+# the number of problems (one for each seed) that a ProblemRescorer keeps
+MAX_RESCORE_PROBLEMS = 100
+
 
 def initialize_mako(sender=None, conf=None, **kwargs):
     """
@@ -70,8 +87,70 @@ def _get_current_task():
     return current_task
 
 
+def _get_modules_to_update(course_id, module_state_key, student_identifier, filter_fcn):
+    """
+    Returns the query for the StudentModule instances to update.
+
+    StudentModule instances are those that match the specified `course_id` and `module_state_key`.
+    If `student_identifier` is not None, it is used as an additional filter to limit the modules to those belonging
+    to that student. If `student_identifier` is None, the query is for the modules of all students on the specified problem.
+
+    If a `filter_fcn` is not None, it is applied to the query that has been constructed.  It takes one
+    argument, which is the query being filtered, and returns the filtered version of the query.
+    """
+    # find the module in question
+    modules_to_update = StudentModule.objects.filter(course_id=course_id,
+                                                     module_state_key=module_state_key)
+
+    # give the option of rescoring an individual student. If not specified,
+    # then rescores all students who have responded to a problem so far
+    student = None
+    if student_identifier is not None:
+        # if an identifier is supplied, then look for the student,
+        # and let it throw an exception if none is found.
+        if "@" in student_identifier:
+            student = User.objects.get(email=student_identifier)
+        elif student_identifier is not None:
+            student = User.objects.get(username=student_identifier)
+
+    if student is not None:
+        modules_to_update = modules_to_update.filter(student_id=student.id)
+
+    if filter_fcn is not None:
+        modules_to_update = filter_fcn(modules_to_update)
+
+    return modules_to_update
+
+
+def _get_subtask_id_ranges(ids, subtask_size):
+    """
+    Splits the sorted StudentModule `ids` into ranges holding at most `subtask_size` modules each.
+
+    Returns a list of (first id, last id) pairs.
+    """
+    return [
+        (ids[index], ids[min(index + subtask_size, len(ids)) - 1])
+        for index in xrange(0, len(ids), subtask_size)
+    ]
+
+
+def aggregate_task_progress(action_name, progresses):
+    """
+    Returns the progress of a task made of subtasks, from the progress dicts of the subtasks
+    (see _perform_module_state_update).  The results of failed subtasks, which are exceptions
+    rather than dicts, are left out.
+    """
+    progresses = [progress for progress in progresses if isinstance(progress, dict)]
+    return {'action_name': action_name,
+            'attempted': sum(progress['attempted'] for progress in progresses),
+            'updated': sum(progress['updated'] for progress in progresses),
+            'total': sum(progress['total'] for progress in progresses),
+            'duration_ms': max([progress['duration_ms'] for progress in progresses] or [0]),
+            }
+
+
 def _perform_module_state_update(course_id, module_state_key, student_identifier, update_fcn, action_name, filter_fcn,
-                                 xmodule_instance_args):
+                                 xmodule_instance_args, id_range=None):
     """
     Performs generic update by visiting StudentModule instances with the update_fcn provided.
 
@@ -82,6 +161,9 @@ def _perform_module_state_update(course_id, module_state_key, student_identifier
     If a `filter_fcn` is not None, it is applied to the query that has been constructed.  It takes one
     argument, which is the query being filtered, and returns the filtered version of the query.
 
+    If `id_range` is not None, only the StudentModules with ids from its first to its last
+    value (inclusive) are updated.
+
     The `update_fcn` is called on each StudentModule that passes the resulting filtering.
     It is passed three arguments:  the module_descriptor for the module pointed to by the
     module_state_key, the particular StudentModule to update, and the xmodule_instance_args being
@@ -109,26 +191,14 @@ def _perform_module_state_update(course_id, module_state_key, student_identifier
     # find the problem descriptor:
     module_descriptor = modulestore().get_instance(course_id, module_state_key)
 
-    # find the module in question
-    modules_to_update = StudentModule.objects.filter(course_id=course_id,
-                                                     module_state_key=module_state_key)
+    modules_to_update = _get_modules_to_update(course_id, module_state_key, student_identifier, filter_fcn)
+    if id_range is not None:
+        modules_to_update = modules_to_update.filter(id__gte=id_range[0], id__lte=id_range[1])
 
-    # give the option of rescoring an individual student. If not specified,
-    # then rescores all students who have responded to a problem so far
-    student = None
-    if student_identifier is not None:
-        # if an identifier is supplied, then look for the student,
-        # and let it throw an exception if none is found.
-        if "@" in student_identifier:
-            student = User.objects.get(email=student_identifier)
-        elif student_identifier is not None:
-            student = User.objects.get(username=student_identifier)
-
-    if student is not None:
-        modules_to_update = modules_to_update.filter(student_id=student.id)
-
-    if filter_fcn is not None:
-        modules_to_update = filter_fcn(modules_to_update)
+    # some updates share work between the modules they update (see BULK_UPDATE_CLASSES)
+    bulk_update_class = BULK_UPDATE_CLASSES.get(update_fcn)
+    if bulk_update_class is not None:
+        update_fcn = bulk_update_class(course_id, module_descriptor)
 
     # perform the main loop
     num_updated = 0
@@ -148,20 +218,71 @@ def _perform_module_state_update(course_id, module_state_key, student_identifier
 
     task_progress = get_task_progress()
     _get_current_task().update_state(state=PROGRESS, meta=task_progress)
-    for module_to_update in modules_to_update:
-        num_attempted += 1
-        # There is no try here:  if there's an error, we let it throw, and the task will
-        # be marked as FAILED, with a stack trace.
-        with dog_stats_api.timer('instructor_tasks.module.time.step', tags=['action:{name}'.format(name=action_name)]):
-            if update_fcn(module_descriptor, module_to_update, xmodule_instance_args):
-                # If the update_fcn returns true, then it performed some kind of work.
-                # Logging of failures is left to the update_fcn itself.
-                num_updated += 1
-
-        # update task status:
-        task_progress = get_task_progress()
-        _get_current_task().update_state(state=PROGRESS, meta=task_progress)
+    last_progress_time = time()
+    try:
+        for module_to_update in modules_to_update.select_related('student'):
+            num_attempted += 1
+            # There is no try here:  if there's an error, we let it throw, and the task will
+            # be marked as FAILED, with a stack trace.
+            with dog_stats_api.timer('instructor_tasks.module.time.step', tags=['action:{name}'.format(name=action_name)]):
+                if update_fcn(module_descriptor, module_to_update, xmodule_instance_args):
+                    # If the update_fcn returns true, then it performed some kind of work.
+                    # Logging of failures is left to the update_fcn itself.
+                    num_updated += 1
+
+            # update task status, every so many modules or seconds:
+            task_progress = get_task_progress()
+            if (num_attempted % settings.INSTRUCTOR_TASK_PROGRESS_MODULES == 0 or
+                    time() - last_progress_time >= settings.INSTRUCTOR_TASK_PROGRESS_SECONDS):
+                _get_current_task().update_state(state=PROGRESS, meta=task_progress)
+                last_progress_time = time()
+    finally:
+        if bulk_update_class is not None:
+            # save the modules that were updated before any error, as they were counted as updated
+            update_fcn.save()
+
+    return task_progress
+
+
+def _record_task_failure(entry):
+    """
+    Records the exception being handled as the failure of the task of the InstructorTask `entry`
+    """
+    _, exception, traceback = exc_info()
+    traceback_string = format_exc(traceback) if traceback is not None else ''
+    TASK_LOG.warning("background task (%s) failed: %s %s", entry.task_id, exception, traceback_string)
+    entry.task_output = InstructorTask.create_output_for_failure(exception, traceback_string)
+    entry.task_state = FAILURE
+    entry.save_now()
+
+
+def _start_module_state_subtasks(entry, id_ranges, num_total, action_name, xmodule_instance_args):
+    """
+    Starts a subtask to update the StudentModules in each of `id_ranges` (`num_total` modules in all)
+    for the InstructorTask `entry`, as a chord whose callback records the combined result in the entry.
 
+    The entry is marked as in progress, with the number of subtasks in its output, so that the
+    progress of the task is read from the subtasks (see InstructorTask.get_subtask_id).
+    Returns that initial progress.
+    """
+    task_progress = {'action_name': action_name,
+                     'attempted': 0,
+                     'updated': 0,
+                     'total': num_total,
+                     'duration_ms': 0,
+                     'subtasks': len(id_ranges),
+                     }
+    entry.task_output = InstructorTask.create_output_for_success(task_progress)
+    entry.task_state = PROGRESS
+    entry.save_now()
+
+    header = [
+        subtask('instructor_task.tasks.update_problem_module_state_subtask',
+                args=(entry.id, first_id, last_id, xmodule_instance_args),
+                task_id=entry.get_subtask_id(index))
+        for index, (first_id, last_id) in enumerate(id_ranges)
+    ]
+    chord(header)(subtask('instructor_task.tasks.finish_problem_module_state_subtasks', args=(entry.id, time())))
     return task_progress
 
 
@@ -230,6 +351,19 @@ def update_problem_module_state(entry_id, update_fcn, action_name, filter_fcn,
             TASK_LOG.error(message)
             raise UpdateProblemModuleStateError(message)
 
+        # Split updates of many students into subtasks, which run in parallel:
+        if student_ident is None and settings.INSTRUCTOR_TASK_SUBTASK_SIZE:
+            modules_to_update = _get_modules_to_update(course_id, module_state_key, None, filter_fcn)
+            ids = list(modules_to_update.order_by('id').values_list('id', flat=True))
+            id_ranges = _get_subtask_id_ranges(ids, settings.INSTRUCTOR_TASK_SUBTASK_SIZE)
+            if len(id_ranges) > 1:
+                task_progress = _start_module_state_subtasks(entry, id_ranges, len(ids), action_name,
+                                                             xmodule_instance_args)
+                fmt = 'Started {count} subtasks of task "{task_id}": course "{course_id}" problem "{state_key}"'
+                TASK_LOG.info(fmt.format(count=len(id_ranges), task_id=task_id, course_id=course_id,
+                                         state_key=module_state_key))
+                return task_progress
+
         # Now do the work:
         with dog_stats_api.timer('instructor_tasks.module.time.overall', tags=['action:{name}'.format(name=action_name)]):
             task_progress = _perform_module_state_update(course_id, module_state_key, student_ident, update_fcn,
@@ -243,12 +377,7 @@ def update_problem_module_state(entry_id, update_fcn, action_name, filter_fcn,
 
     except Exception:
         # try to write out the failure to the entry before failing
-        _, exception, traceback = exc_info()
-        traceback_string = format_exc(traceback) if traceback is not None else ''
-        TASK_LOG.warning("background task (%s) failed: %s %s", task_id, exception, traceback_string)
-        entry.task_output = InstructorTask.create_output_for_failure(exception, traceback_string)
-        entry.task_state = FAILURE
-        entry.save_now()
+        _record_task_failure(entry)
         raise
 
     # log and exit, returning task_progress info as task result:
@@ -257,6 +386,62 @@ def update_problem_module_state(entry_id, update_fcn, action_name, filter_fcn,
     return task_progress
 
 
+def perform_problem_module_state_subtask(entry_id, first_id, last_id, update_fcn, action_name, filter_fcn,
+                                         xmodule_instance_args):
+    """
+    Performs the part of the update of the InstructorTask with id `entry_id` (see update_problem_module_state)
+    for the StudentModules with ids from `first_id` to `last_id`.
+
+    Returns the progress dict of this part.  If an exception is raised, it is recorded as the failure
+    of the whole task, and the remaining subtasks do nothing.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    if entry.task_state == FAILURE:
+        TASK_LOG.info('Skipping subtask of failed task "%s"', entry.task_id)
+        return aggregate_task_progress(action_name, [])
+
+    task_input = json.loads(entry.task_input)
+    module_state_key = task_input.get('problem_url')
+
+    # add task_id to xmodule_instance_args, so that it can be output with tracking info:
+    if xmodule_instance_args is not None:
+        xmodule_instance_args['task_id'] = entry.task_id
+
+    try:
+        with dog_stats_api.timer('instructor_tasks.module.time.subtask', tags=['action:{name}'.format(name=action_name)]):
+            return _perform_module_state_update(entry.course_id, module_state_key, None, update_fcn, action_name,
+                                                filter_fcn, xmodule_instance_args, id_range=(first_id, last_id))
+    except Exception:
+        _record_task_failure(entry)
+        raise
+
+
+def record_problem_module_state_subtasks(subtask_progresses, entry_id, start_time):
+    """
+    Records the combined result of the subtasks of the InstructorTask with id `entry_id`,
+    which was started at `start_time`, as its output, and returns it.
+
+    If a subtask failed, its failure is already recorded as the output of the task, and the
+    output is returned as it is.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    if entry.task_state == FAILURE:
+        TASK_LOG.info('Subtasks of failed task "%s" have finished', entry.task_id)
+        return json.loads(entry.task_output)
+
+    action_name = json.loads(entry.task_output)['action_name']
+    task_progress = aggregate_task_progress(action_name, subtask_progresses)
+    task_progress['duration_ms'] = int((time() - start_time) * 1000)
+    entry.task_output = InstructorTask.create_output_for_success(task_progress)
+    entry.task_state = SUCCESS
+    entry.save_now()
+
+    fmt = 'Finishing task "{task_id}": course "{course_id}" subtasks: {count}: final: {progress}'
+    TASK_LOG.info(fmt.format(task_id=entry.task_id, course_id=entry.course_id, count=len(subtask_progresses),
+                             progress=task_progress))
+    return task_progress
+
+
 def _get_task_id_from_xmodule_args(xmodule_instance_args):
     """Gets task_id from `xmodule_instance_args` dict, or returns default value if missing."""
     return xmodule_instance_args.get('task_id', UNKNOWN_TASK_ID) if xmodule_instance_args is not None else UNKNOWN_TASK_ID
@@ -346,6 +531,156 @@ def rescore_problem_module_state(module_descriptor, student_module, xmodule_inst
         return True
 
 
+class ProblemRescorer(object):
+    """
+    Rescores the answers of many students to the problem `module_descriptor`.
+
+    Instead of creating a CapaModule for each student, which parses the problem and runs its
+    scripts, a ProblemRescorer creates one for the first student with each seed, and then grades
+    the answers of every student with that seed with its LoncapaProblem.  The StudentModules
+    are saved in batches of settings.INSTRUCTOR_TASK_RESCORE_BATCH_SIZE, each in one transaction.
+
+    It is called like rescore_problem_module_state, which it is used in place of, and save() must
+    be called after the last module.
+    """
+    def __init__(self, course_id, module_descriptor):
+        self.course_id = course_id
+        self.module_descriptor = module_descriptor
+        # seed -> LoncapaProblem, least recently used first
+        self.problems = OrderedDict()
+        self.modules_to_save = []
+
+    def __call__(self, module_descriptor, student_module, xmodule_instance_args=None):
+        """
+        Rescores the answers in `student_module`, and returns True if that succeeded.
+        """
+        student = student_module.student
+        module_state_key = student_module.module_state_key
+        state = json.loads(student_module.state) if student_module.state else {}
+
+        if settings.MITX_FEATURES.get('ENABLE_PSYCHOMETRICS') or state.get('seed') is None:
+            # psychometrics are recorded by each student's CapaModule, and without a seed
+            # the CapaModule has to choose one
+            return rescore_problem_module_state(module_descriptor, student_module, xmodule_instance_args)
+
+        if not has_access(student, module_descriptor, 'load', self.course_id):
+            msg = "No module {loc} for student {student}--access denied?".format(loc=module_state_key,
+                                                                                 student=student)
+            TASK_LOG.debug(msg)
+            raise UpdateProblemModuleStateError(msg)
+
+        problem = self._get_problem(student_module, state['seed'], xmodule_instance_args)
+        problem.load_state(state)
+
+        # get request-related tracking information from args passthrough, and supplement with task-specific
+        # information, as the CapaModule of the student would:
+        request_info = xmodule_instance_args.get('request_info', {}) if xmodule_instance_args is not None else {}
+        task_info = {"student": student.username, "task_id": _get_task_id_from_xmodule_args(xmodule_instance_args)}
+
+        def track_function(event_type, event):
+            """Logs an event of the rescoring for this student"""
+            task_track(request_info, task_info, event_type, event, page='x_module_task')
+
+        event_info = {'state': problem.get_state(), 'problem_id': module_state_key}
+        if not problem.supports_rescoring():
+            event_info['failure'] = 'unsupported'
+            track_function('problem_rescore_fail', event_info)
+            raise NotImplementedError("Problem's definition does not support rescoring")
+
+        if not problem.done:
+            event_info['failure'] = 'unanswered'
+            track_function('problem_rescore_fail', event_info)
+            raise NotFoundError('Problem must be answered before it can be graded again')
+
+        orig_score = problem.get_score()
+        event_info['orig_score'] = orig_score['score']
+        event_info['orig_total'] = orig_score['total']
+
+        try:
+            correct_map = problem.rescore_existing_answers()
+        except (StudentInputError, ResponseError, LoncapaProblemError) as inst:
+            TASK_LOG.warning(u"error processing rescore call for course {course}, problem {loc} and student {student}: "
+                             "{msg}".format(msg=inst.message, course=self.course_id, loc=module_state_key, student=student))
+            event_info['failure'] = 'input_error'
+            track_function('problem_rescore_fail', event_info)
+            return False
+        except Exception:
+            event_info['failure'] = 'unexpected'
+            track_function('problem_rescore_fail', event_info)
+            raise
+
+        # rescoring has no effect on attempts, so only the state of the problem changes
+        state.update(problem.get_state())
+        new_score = problem.get_score()
+        student_module.state = json.dumps(state)
+        student_module.grade = new_score['score']
+        student_module.max_grade = new_score['total']
+        self._add_module_to_save(student_module)
+
+        success = 'correct' if all(correct_map.is_correct(answer_id) for answer_id in correct_map) else 'incorrect'
+        event_info['new_score'] = new_score['score']
+        event_info['new_total'] = new_score['total']
+        event_info['correct_map'] = correct_map.get_dict()
+        event_info['success'] = success
+        event_info['attempts'] = state.get('attempts', 0)
+        track_function('problem_rescore', event_info)
+
+        TASK_LOG.debug(u"successfully processed rescore call for course {course}, problem {loc} and student {student}: "
+                       "{msg}".format(msg=success, course=self.course_id, loc=module_state_key, student=student))
+        return True
+
+    def _get_problem(self, student_module, seed, xmodule_instance_args):
+        """
+        Returns the LoncapaProblem for `seed`, creating it from the CapaModule of the student of
+        `student_module` if there isn't one yet.
+        """
+        problem = self.problems.pop(seed, None)
+        if problem is None:
+            instance = _get_module_instance_for_task(self.course_id, student_module.student, self.module_descriptor,
+                                                     xmodule_instance_args, grade_bucket_type='rescore')
+            if instance is None:
+                msg = "No module {loc} for student {student}--access denied?".format(
+                    loc=student_module.module_state_key, student=student_module.student)
+                TASK_LOG.debug(msg)
+                raise UpdateProblemModuleStateError(msg)
+            if not hasattr(instance, 'rescore_problem'):
+                msg = "Specified problem does not support rescoring."
+                raise UpdateProblemModuleStateError(msg)
+            problem = instance.lcp
+
+        self.problems[seed] = problem
+        while len(self.problems) > MAX_RESCORE_PROBLEMS:
+            self.problems.popitem(last=False)
+        return problem
+
+    def _add_module_to_save(self, student_module):
+        """
+        Saves `student_module` with the next batch
+        """
+        self.modules_to_save.append(student_module)
+        if len(self.modules_to_save) >= settings.INSTRUCTOR_TASK_RESCORE_BATCH_SIZE:
+            self.save()
+
+    def save(self):
+        """
+        Saves the rescored StudentModules that haven't been saved yet, in one transaction
+        """
+        with transaction.commit_on_success():
+            for student_module in self.modules_to_save:
+                student_module.save()
+
+        org, course_num, run = self.course_id.split("/")
+        for student_module in self.modules_to_save:
+            score_bucket = get_score_bucket(student_module.grade, student_module.max_grade)
+            statsd.increment("lms.courseware.question_answered",
+                             tags=["org:{0}".format(org),
+                                   "course:{0}".format(course_num),
+                                   "run:{0}".format(run),
+                                   "score_bucket:{0}".format(score_bucket),
+                                   "type:rescore"])
+        self.modules_to_save = []
+
+
 @transaction.autocommit
 def reset_attempts_module_state(_module_descriptor, student_module, xmodule_instance_args=None):
     """
@@ -386,3 +721,189 @@ def delete_problem_module_state(_module_descriptor, student_module, xmodule_inst
     task_info = {"student": student_module.student.username, "task_id": _get_task_id_from_xmodule_args(xmodule_instance_args)}
     task_track(request_info, task_info, 'problem_delete_state', {}, page='x_module_task')
     return True
+
+
+def _get_enrolled_students(course_id):
+    """
+    Yields the students enrolled in the course `course_id`, in order of username, as the
+    gradebook lists them.
+
+    The students are read settings.GRADE_REPORT_CHUNK_SIZE at a time, each chunk starting
+    after the username of the last student of the previous chunk, so that no query has to skip
+    over the students that have been read already.
+    """
+    last_username = ''
+    while True:
+        students = list(User.objects.filter(courseenrollment__course_id=course_id, username__gt=last_username)
+                        .order_by('username').select_related('profile').prefetch_related('groups')
+                        [:settings.GRADE_REPORT_CHUNK_SIZE])
+        if not students:
+            return
+        for student in students:
+            yield student
+        last_username = students[-1].username
+
+
+def _get_grading_request():
+    """
+    Returns a request to grade students with in a task, where there is no request from a user.
+    """
+    request = RequestFactory().get('/')
+    request.user = None
+    return request
+
+
+def get_grade_report_storage():
+    """
+    Returns the storage that grade reports are saved in, as configured by settings.GRADE_REPORT_STORAGE.
+
+    The reports hold the names and emails of students, so the storage must not be public: the
+    reports are only served through instructor.views.grade_report.
+    """
+    storage_class = get_storage_class(settings.GRADE_REPORT_STORAGE['STORAGE_CLASS'])
+    return storage_class(**settings.GRADE_REPORT_STORAGE.get('STORAGE_KWARGS', {}))
+
+
+def _get_grade_report_storage_name(course_id, task_id, raw_scores):
+    """
+    Returns the name in the grade report storage of the grade report generated by the task `task_id`.
+    """
+    filename = 'grades_{course}{raw}.csv'.format(course=course_id.replace('/', '_'),
+                                                 raw='_raw' if raw_scores else '')
+    return '/'.join([course_id.replace('/', '_'), task_id, filename])
+
+
+def _prune_grade_reports(course_id, storage):
+    """
+    Deletes the files of the grade reports of the course `course_id` that are no longer listed
+    on the instructor dashboard, which are all but the settings.GRADE_REPORTS_LISTED most recent.
+
+    The `report_name` of each of them is set to None once its file is deleted.
+    """
+    old_reports = InstructorTask.objects.filter(course_id=course_id, task_type='generate_grade_report',
+                                                task_state=SUCCESS).order_by('-id')[settings.GRADE_REPORTS_LISTED:]
+    for instructor_task in old_reports:
+        task_output = json.loads(instructor_task.task_output)
+        if task_output.get('report_name') is None:
+            continue
+        storage.delete(task_output['report_name'])
+        task_output['report_name'] = None
+        instructor_task.task_output = json.dumps(task_output)
+        instructor_task.save_now()
+
+
+def write_grade_report(entry_id, action_name, xmodule_instance_args):
+    """
+    Grades all the students enrolled in the course of the InstructorTask with id `entry_id`, and
+    writes their grades to a CSV file in the grade report storage (see get_grade_report_storage),
+    as instructor.views.return_csv would write the grade summary data of the course.  The students
+    are in order of username.
+
+    The students are graded in chunks (see courseware.grades.grade_students), and their rows are
+    written to a temporary file as they are graded, so that the grades of all students never
+    have to be held in memory.  The report has a last "Total" column with the overall grade of
+    each student, unless the task_input asks for the `raw_scores` of the graded problems.
+
+    Progress is reported like for update_problem_module_state, and the task result also
+    holds the `report_name` of the file in the storage.  Failures are recorded in the
+    entry as they are for update_problem_module_state.
+    """
+    start_time = time()
+    entry = InstructorTask.objects.get(pk=entry_id)
+    task_id = entry.task_id
+    course_id = entry.course_id
+    raw_scores = json.loads(entry.task_input).get('raw_scores', False)
+
+    fmt = 'Starting grade report as task "{task_id}": course "{course_id}"'
+    TASK_LOG.info(fmt.format(task_id=task_id, course_id=course_id))
+
+    try:
+        request_task_id = _get_current_task().request.id
+        if task_id != request_task_id:
+            fmt = 'Requested task "{task_id}" did not match actual task "{actual_id}"'
+            message = fmt.format(task_id=task_id, actual_id=request_task_id)
+            TASK_LOG.error(message)
+            raise UpdateProblemModuleStateError(message)
+
+        course = get_course_by_id(course_id, depth=None)
+        num_total = User.objects.filter(courseenrollment__course_id=course_id).count()
+        num_graded = 0
+
+        def get_task_progress():
+            """Return a dict containing info about current task"""
+            return {'action_name': action_name,
+                    'attempted': num_graded,
+                    'updated': num_graded,
+                    'total': num_total,
+                    'duration_ms': int((time() - start_time) * 1000),
+                    }
+
+        _get_current_task().update_state(state=PROGRESS, meta=get_task_progress())
+        last_progress_time = time()
+
+        with NamedTemporaryFile() as report:
+            writer = csv.writer(report, dialect='excel', quotechar='"', quoting=csv.QUOTE_ALL)
+            header = ['ID', 'Username', 'Full Name', 'edX email', 'External email']
+            student_gradesets = grade_students(_get_enrolled_students(course_id), _get_grading_request(), course,
+                                               keep_raw_scores=raw_scores, chunk_size=settings.GRADE_REPORT_CHUNK_SIZE)
+            with dog_stats_api.timer('instructor_tasks.grade_report.time.overall'):
+                for student, gradeset in student_gradesets:
+                    if header is not None:
+                        # the first student's gradeset is used to construct the header
+                        if raw_scores:
+                            header += [score.section for score in gradeset['raw_scores']]
+                        else:
+                            header += [section['label'] for section in gradeset['section_breakdown']] + ['Total']
+                        writer.writerow(header)
+                        header = None
+
+                    row = [student.id, student.username, student.profile.name, student.email]
+                    try:
+                        row.append(student.externalauthmap.external_email)
+                    except ExternalAuthMap.DoesNotExist:
+                        row.append('')
+                    if raw_scores:
+                        row += [score.earned for score in gradeset['raw_scores']]
+                    else:
+                        row += [section['percent'] for section in gradeset['section_breakdown']]
+                        row.append(gradeset['percent'])
+                    writer.writerow([unicode(value).encode('utf-8') for value in row])
+
+                    num_graded += 1
+                    if (num_graded % settings.INSTRUCTOR_TASK_PROGRESS_MODULES == 0 or
+                            time() - last_progress_time >= settings.INSTRUCTOR_TASK_PROGRESS_SECONDS):
+                        _get_current_task().update_state(state=PROGRESS, meta=get_task_progress())
+                        last_progress_time = time()
+
+            if header is not None:
+                writer.writerow(header)
+            report.seek(0)
+            storage = get_grade_report_storage()
+            report_name = storage.save(_get_grade_report_storage_name(course_id, task_id, raw_scores), File(report))
+
+        task_progress = get_task_progress()
+        task_progress['report_name'] = report_name
+        entry.task_output = InstructorTask.create_output_for_success(task_progress)
+        entry.task_state = SUCCESS
+        entry.save_now()
+
+    except Exception:
+        # try to write out the failure to the entry before failing
+        _record_task_failure(entry)
+        raise
+
+    try:
+        _prune_grade_reports(course_id, storage)
+    except Exception:
+        # the new report is ready anyway, so the old ones are deleted by the next report
+        TASK_LOG.exception('Failed to delete old grade reports of course "{course_id}"'.format(course_id=course_id))
+
+    fmt = 'Finishing grade report as task "{task_id}": course "{course_id}" final: {progress}'
+    TASK_LOG.info(fmt.format(task_id=task_id, course_id=course_id, progress=task_progress))
+    return task_progress
+
+
+# update function -> class that performs the same update for many modules of a problem
+BULK_UPDATE_CLASSES = {
+    rescore_problem_module_state: ProblemRescorer,
+}
@@ -5,6 +5,7 @@ Runs tasks on answers to course problems to validate that code
 paths actually work.
 
 """
+import csv
 import logging
 import json
 from mock import patch
@@ -13,6 +14,7 @@ import textwrap
 from celery.states import SUCCESS, FAILURE
 from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
+from django.test.utils import override_settings
 
 from capa.tests.response_xml_factory import (CodeResponseXMLFactory,
                                              CustomResponseXMLFactory)
@@ -20,11 +22,15 @@ from xmodule.modulestore.tests.factories import ItemFactory
 
 from courseware.model_data import StudentModule
 
-from instructor_task.api import (submit_rescore_problem_for_all_students,
+from instructor_task.api import (get_grade_report_name,
+                                 get_grade_report_storage,
+                                 submit_grade_report,
+                                 submit_rescore_problem_for_all_students,
                                  submit_rescore_problem_for_student,
                                  submit_reset_problem_attempts_for_all_students,
                                  submit_delete_problem_state_for_all_students)
 from instructor_task.models import InstructorTask
+from instructor_task import tasks_helper
 from instructor_task.tests.test_base import (InstructorTaskModuleTestCase, TEST_COURSE_ORG, TEST_COURSE_NUMBER,
                                              OPTION_1, OPTION_2)
 from capa.responsetypes import StudentInputError
@@ -188,6 +194,25 @@ class TestRescoringTask(TestIntegrationTask):
         self.check_state('u3', descriptor, 1, 2, 1)
         self.check_state('u4', descriptor, 2, 2, 1)
 
+    def test_rescoring_shares_problem(self):
+        """Rescoring all students with the same seed creates their problem once"""
+        problem_url_name = 'H1P1'
+        self.define_option_problem(problem_url_name)
+        location = InstructorTaskModuleTestCase.problem_location(problem_url_name)
+        descriptor = self.module_store.get_instance(self.course.id, location)
+        self.submit_student_answer('u1', problem_url_name, [OPTION_1, OPTION_1])
+        self.submit_student_answer('u2', problem_url_name, [OPTION_1, OPTION_2])
+        self.submit_student_answer('u3', problem_url_name, [OPTION_2, OPTION_2])
+
+        self.redefine_option_problem(problem_url_name)
+        with patch('instructor_task.tasks_helper._get_module_instance_for_task',
+                   wraps=tasks_helper._get_module_instance_for_task) as mock_get_module:
+            self.submit_rescore_all_student_answers('instructor', problem_url_name)
+        self.assertEqual(mock_get_module.call_count, 1)
+        self.check_state('u1', descriptor, 0, 2, 1)
+        self.check_state('u2', descriptor, 1, 2, 1)
+        self.check_state('u3', descriptor, 2, 2, 1)
+
     def test_rescoring_failure(self):
         """Simulate a failure in rescoring a problem"""
         problem_url_name = 'H1P1'
@@ -472,3 +497,67 @@ class TestDeleteProblemTask(TestIntegrationTask):
         instructor_task = self.delete_problem_state('instructor', problem_url_name)
         instructor_task = InstructorTask.objects.get(id=instructor_task.id)
         self.assertEqual(instructor_task.task_state, SUCCESS)
+
+
+class TestGradeReportTask(TestIntegrationTask):
+    """
+    Tests for generating grade reports in a background task.
+    """
+
+    def setUp(self):
+        self.initialize_course()
+        self.create_instructor('instructor')
+        self.create_student('u1')
+        self.create_student('u2')
+
+    def _read_report(self, instructor_task):
+        """Returns the rows of the report of the grade report task `instructor_task`"""
+        with get_grade_report_storage().open(get_grade_report_name(instructor_task)) as report:
+            return list(csv.reader(report))
+
+    def test_grade_report(self):
+        instructor_task = submit_grade_report(self.create_task_request('instructor'), self.course.id)
+        instructor_task = InstructorTask.objects.get(id=instructor_task.id)
+        self.assertEqual(instructor_task.task_state, SUCCESS)
+        status = json.loads(instructor_task.task_output)
+        self.assertEqual(status['attempted'], 3)
+        self.assertEqual(status['total'], 3)
+
+        rows = self._read_report(instructor_task)
+        self.assertEqual(rows[0][:5], ['ID', 'Username', 'Full Name', 'edX email', 'External email'])
+        self.assertEqual(rows[0][-1], 'Total')
+        self.assertEqual([row[1] for row in rows[1:]], ['instructor', 'u1', 'u2'])
+        self.assertTrue(all(len(row) == len(rows[0]) for row in rows))
+
+        status = InstructorTaskModuleTestCase.get_task_status(instructor_task.task_id)
+        self.assertEqual(status['message'], "Grade report of 3 students is ready")
+
+    def test_raw_grade_report(self):
+        instructor_task = submit_grade_report(self.create_task_request('instructor'), self.course.id, raw_scores=True)
+        instructor_task = InstructorTask.objects.get(id=instructor_task.id)
+        self.assertEqual(instructor_task.task_state, SUCCESS)
+        self.assertTrue(get_grade_report_name(instructor_task).endswith('_raw.csv'))
+        # there are no graded problems in the course
+        rows = self._read_report(instructor_task)
+        self.assertEqual(rows[0], ['ID', 'Username', 'Full Name', 'edX email', 'External email'])
+        self.assertEqual(len(rows), 4)
+
+    @override_settings(GRADE_REPORTS_LISTED=1)
+    def test_old_reports_deleted(self):
+        old_task = submit_grade_report(self.create_task_request('instructor'), self.course.id)
+        old_report_name = get_grade_report_name(InstructorTask.objects.get(id=old_task.id))
+        self.assertTrue(get_grade_report_storage().exists(old_report_name))
+
+        new_task = submit_grade_report(self.create_task_request('instructor'), self.course.id)
+        self.assertFalse(get_grade_report_storage().exists(old_report_name))
+        self.assertIsNone(get_grade_report_name(InstructorTask.objects.get(id=old_task.id)))
+        new_report_name = get_grade_report_name(InstructorTask.objects.get(id=new_task.id))
+        self.assertTrue(get_grade_report_storage().exists(new_report_name))
+
+    def test_grade_report_failure(self):
+        with patch('instructor_task.tasks_helper.grade_students') as mock_grade_students:
+            mock_grade_students.side_effect = ZeroDivisionError("bad things happened")
+            instructor_task = submit_grade_report(self.create_task_request('instructor'), self.course.id)
+        instructor_task = InstructorTask.objects.get(id=instructor_task.id)
+        self.assertEqual(instructor_task.task_state, FAILURE)
+        self.assertEqual(json.loads(instructor_task.task_output)['message'], "bad things happened")
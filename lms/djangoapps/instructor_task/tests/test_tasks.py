@@ -13,17 +13,22 @@ from mock import Mock, patch
 
 from celery.states import SUCCESS, FAILURE
 
+from django.test.utils import override_settings
+
 from xmodule.modulestore.exceptions import ItemNotFoundError
 
 from courseware.model_data import StudentModule
 from courseware.tests.factories import StudentModuleFactory
 from student.tests.factories import UserFactory
 
-from instructor_task.models import InstructorTask
+from instructor_task.models import InstructorTask, PROGRESS
 from instructor_task.tests.test_base import InstructorTaskModuleTestCase
 from instructor_task.tests.factories import InstructorTaskFactory
-from instructor_task.tasks import rescore_problem, reset_problem_attempts, delete_problem_state
-from instructor_task.tasks_helper import UpdateProblemModuleStateError, update_problem_module_state
+from instructor_task.tasks import (rescore_problem, reset_problem_attempts, delete_problem_state,
+                                   update_problem_module_state_subtask, finish_problem_module_state_subtasks)
+from instructor_task.tasks_helper import (UpdateProblemModuleStateError, update_problem_module_state,
+                                          _get_subtask_id_ranges, aggregate_task_progress,
+                                          reset_attempts_module_state, BULK_UPDATE_CLASSES)
 
 
 PROBLEM_URL_NAME = "test_urlname"
@@ -186,6 +191,99 @@ class TestInstructorTasks(InstructorTaskModuleTestCase):
                                           student=student,
                                           module_state_key=self.problem_url)
 
+    @override_settings(INSTRUCTOR_TASK_SUBTASK_SIZE=4)
+    def test_reset_in_subtasks(self):
+        input_state = json.dumps({'attempts': 3})
+        num_students = 10
+        students = self._create_students_with_state(num_students, input_state)
+        task_entry = self._create_input_entry()
+        with patch('instructor_task.tasks_helper.chord') as mock_chord:
+            status = self._run_task_with_mock_celery(reset_problem_attempts, task_entry.id, task_entry.task_id)
+        # the work is left to three subtasks
+        self.assertEquals(status.get('total'), num_students)
+        self.assertEquals(status.get('subtasks'), 3)
+        entry = InstructorTask.objects.get(id=task_entry.id)
+        self.assertEquals(entry.task_state, PROGRESS)
+        self._assert_num_attempts(students, 3)
+        header = mock_chord.call_args[0][0]
+        self.assertEquals([signature.options['task_id'] for signature in header],
+                          [entry.get_subtask_id(index) for index in range(3)])
+
+        # run the subtasks, and then the callback of the chord
+        with patch('instructor_task.tasks_helper._get_current_task'):
+            progresses = [update_problem_module_state_subtask(*signature.args) for signature in header]
+        self.assertEquals([progress['attempted'] for progress in progresses], [4, 4, 2])
+        status = finish_problem_module_state_subtasks(progresses, entry.id, 0)
+        self.assertEquals(status.get('attempted'), num_students)
+        self.assertEquals(status.get('updated'), num_students)
+        self.assertEquals(status.get('total'), num_students)
+        self.assertEquals(status.get('action_name'), 'reset')
+        entry = InstructorTask.objects.get(id=task_entry.id)
+        self.assertEquals(entry.task_state, SUCCESS)
+        self.assertEquals(json.loads(entry.task_output), status)
+        self._assert_num_attempts(students, 0)
+
+    @override_settings(INSTRUCTOR_TASK_SUBTASK_SIZE=4)
+    def test_subtask_failure(self):
+        self._create_students_with_state(10, json.dumps({'attempts': 3}))
+        task_entry = self._create_input_entry()
+        with patch('instructor_task.tasks_helper.chord') as mock_chord:
+            self._run_task_with_mock_celery(reset_problem_attempts, task_entry.id, task_entry.task_id)
+        header = mock_chord.call_args[0][0]
+
+        # the second subtask fails, which is recorded as the failure of the task, and the third
+        # subtask then does nothing
+        with patch('instructor_task.tasks_helper._get_current_task'):
+            progresses = [update_problem_module_state_subtask(*header[0].args)]
+            entry = InstructorTask.objects.get(id=task_entry.id)
+            entry.task_state = FAILURE
+            entry.task_output = InstructorTask.create_output_for_failure(TestTaskFailure('subtask failed'), '')
+            entry.save_now()
+            progresses.append(TestTaskFailure('subtask failed'))
+            progresses.append(update_problem_module_state_subtask(*header[2].args))
+
+        # celery passes the exception of the failed subtask to the callback as its result
+        status = finish_problem_module_state_subtasks(progresses, entry.id, 0)
+        self.assertEquals(status['message'], 'subtask failed')
+        entry = InstructorTask.objects.get(id=task_entry.id)
+        self.assertEquals(entry.task_state, FAILURE)
+        self.assertEquals(aggregate_task_progress('reset', progresses)['attempted'], 4)
+
+    @override_settings(INSTRUCTOR_TASK_PROGRESS_MODULES=4, INSTRUCTOR_TASK_PROGRESS_SECONDS=60)
+    def test_progress_updates_throttled(self):
+        num_students = 10
+        self._create_students_with_state(num_students, json.dumps({'attempts': 3}))
+        task_entry = self._create_input_entry()
+        self._run_task_with_mock_celery(reset_problem_attempts, task_entry.id, task_entry.task_id)
+        # once at the start, and then after the 4th and 8th modules
+        self.assertEquals(self.current_task.update_state.call_count, 3)
+
+    def test_bulk_update_saved_on_failure(self):
+        self._create_students_with_state(3, json.dumps({'attempts': 3}))
+        task_entry = self._create_input_entry()
+        bulk_update = Mock(side_effect=[True, TestTaskFailure('failed on the second module')])
+        with patch.dict(BULK_UPDATE_CLASSES, {reset_attempts_module_state: Mock(return_value=bulk_update)}):
+            with self.assertRaises(TestTaskFailure):
+                self._run_task_with_mock_celery(reset_problem_attempts, task_entry.id, task_entry.task_id)
+        # the module updated before the failure is saved anyway
+        self.assertEquals(bulk_update.call_count, 2)
+        bulk_update.save.assert_called_once_with()
+
+    def test_subtask_id_ranges(self):
+        self.assertEquals(_get_subtask_id_ranges([1, 2, 5, 7, 8], 2), [(1, 2), (5, 7), (8, 8)])
+        self.assertEquals(_get_subtask_id_ranges([1, 2, 5, 7], 2), [(1, 2), (5, 7)])
+        self.assertEquals(_get_subtask_id_ranges([], 2), [])
+
+    def test_aggregate_task_progress(self):
+        progresses = [
+            {'action_name': 'reset', 'attempted': 4, 'updated': 3, 'total': 4, 'duration_ms': 20},
+            {'action_name': 'reset', 'attempted': 1, 'updated': 1, 'total': 2, 'duration_ms': 30},
+        ]
+        self.assertEquals(
+            aggregate_task_progress('reset', progresses),
+            {'action_name': 'reset', 'attempted': 5, 'updated': 4, 'total': 6, 'duration_ms': 30}
+        )
+
     def _test_reset_with_student(self, use_email):
         """Run a reset task for one student, with several StudentModules for the problem defined."""
         num_students = 10
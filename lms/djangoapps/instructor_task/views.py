@@ -141,6 +141,15 @@ def get_task_completion_info(instructor_task):
     else:
         student = task_input.get('student')
 
+    if instructor_task.task_type == 'generate_grade_report':
+        # grade reports are about students rather than problems:
+        if instructor_task.task_state == PROGRESS:
+            msg_format = "Progress: {action} {updated} of {total} students so far"
+        else:
+            succeeded = True
+            msg_format = "Grade report of {updated} students is ready"
+        return (succeeded, msg_format.format(action=action_name, updated=num_updated, total=num_total))
+
     if instructor_task.task_state == PROGRESS:
         # special message for providing progress updates:
         msg_format = "Progress: {action} {updated} of {attempted} so far"
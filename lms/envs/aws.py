@@ -115,6 +115,9 @@ if ENV_TOKENS.get('SESSION_COOKIE_NAME', None):
 
 BOOK_URL = ENV_TOKENS['BOOK_URL']
 MEDIA_URL = ENV_TOKENS['MEDIA_URL']
+STATIC_CONTENT_CACHE_CONTROL = ENV_TOKENS.get('STATIC_CONTENT_CACHE_CONTROL', STATIC_CONTENT_CACHE_CONTROL)
+STATIC_CONTENT_DISK_CACHE = ENV_TOKENS.get('STATIC_CONTENT_DISK_CACHE', STATIC_CONTENT_DISK_CACHE)
+MAKO_PRECOMPILED_DIR = ENV_TOKENS.get('MAKO_PRECOMPILED_DIR', MAKO_PRECOMPILED_DIR)
 LOG_DIR = ENV_TOKENS['LOG_DIR']
 
 CACHES = ENV_TOKENS['CACHES']
@@ -163,6 +166,11 @@ VIRTUAL_UNIVERSITIES = ENV_TOKENS.get('VIRTUAL_UNIVERSITIES', [])
 META_UNIVERSITIES = ENV_TOKENS.get('META_UNIVERSITIES', {})
 COMMENTS_SERVICE_URL = ENV_TOKENS.get("COMMENTS_SERVICE_URL", '')
 COMMENTS_SERVICE_KEY = ENV_TOKENS.get("COMMENTS_SERVICE_KEY", '')
+COMMENTS_SERVICE_CONNECTION_POOL_SIZE = ENV_TOKENS.get("COMMENTS_SERVICE_CONNECTION_POOL_SIZE",
+                                                       COMMENTS_SERVICE_CONNECTION_POOL_SIZE)
+COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS = ENV_TOKENS.get("COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS",
+                                                          COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS)
+INSTRUCTOR_TASK_SUBTASK_SIZE = ENV_TOKENS.get('INSTRUCTOR_TASK_SUBTASK_SIZE', INSTRUCTOR_TASK_SUBTASK_SIZE)
 CERT_QUEUE = ENV_TOKENS.get("CERT_QUEUE", 'test-pull')
 ZENDESK_URL = ENV_TOKENS.get("ZENDESK_URL")
 FEEDBACK_SUBMISSION_EMAIL = ENV_TOKENS.get("FEEDBACK_SUBMISSION_EMAIL")
@@ -197,6 +205,16 @@ AWS_ACCESS_KEY_ID = AUTH_TOKENS["AWS_ACCESS_KEY_ID"]
 AWS_SECRET_ACCESS_KEY = AUTH_TOKENS["AWS_SECRET_ACCESS_KEY"]
 AWS_STORAGE_BUCKET_NAME = AUTH_TOKENS.get('AWS_STORAGE_BUCKET_NAME','edxuploads')
 
+# Grade reports are private to the bucket, which defaults to the one of the uploads
+GRADE_REPORT_STORAGE = {
+    'STORAGE_CLASS': 'storages.backends.s3boto.S3BotoStorage',
+    'STORAGE_KWARGS': {
+        'bucket': AUTH_TOKENS.get('GRADE_REPORT_BUCKET', AWS_STORAGE_BUCKET_NAME),
+        'location': 'grade_reports',
+        'acl': 'private',
+    },
+}
+
 DATABASES = AUTH_TOKENS['DATABASES']
 
 XQUEUE_INTERFACE = AUTH_TOKENS['XQUEUE_INTERFACE']
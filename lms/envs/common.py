@@ -44,6 +44,11 @@ DISCUSSION_SETTINGS = {
     'MAX_COMMENT_DEPTH': 2,
 }
 
+# The number of connections to the comments service that each process keeps
+# alive, and the number of requests to it that a view can make at the same time
+COMMENTS_SERVICE_CONNECTION_POOL_SIZE = 10
+COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS = 4
+
 
 # Features
 MITX_FEATURES = {
@@ -77,6 +82,7 @@ MITX_FEATURES = {
 
     'ENABLE_DJANGO_ADMIN_SITE': False,  # set true to enable django's admin site, even on prod (e.g. for course ops)
     'ENABLE_SQL_TRACKING_LOGS': False,
+    'ENABLE_ASYNC_TRACKING_LOGS': False,  # write tracking logs in batches from a background thread
     'ENABLE_LMS_MIGRATION': False,
     'ENABLE_MANUAL_GIT_RELOAD': False,
 
@@ -144,8 +150,23 @@ MITX_FEATURES = {
 
     # Allow use of the hint managment instructor view.
     'ENABLE_HINTER_INSTRUCTOR_VIEW': False,
+
+    # Cache the scores of each graded section of a course per student, and only
+    # recompute the sections that have changed when grading the student
+    'ENABLE_SECTION_GRADE_CACHE': False,
+
+    # Only render the active tab of a sequence with the page, and render the
+    # other tabs when the student goes to them
+    'ENABLE_LAZY_SEQUENCE_TABS': False,
+
+    # Cache the html of modules that is the same for every student (such as
+    # html components), until the course is edited
+    'ENABLE_MODULE_HTML_CACHE': False,
 }
 
+# How long the html of a module is cached for, with ENABLE_MODULE_HTML_CACHE
+MODULE_HTML_CACHE_TIMEOUT = 60 * 60
+
 # Used for A/B testing
 DEFAULT_GROUPS = []
 
@@ -193,6 +214,10 @@ OPENID_PROVIDER_TRUSTED_ROOTS = ['cs50.net', '*.cs50.net']
 # templates
 from tempdir import mkdtemp_clean
 MAKO_MODULE_DIR = mkdtemp_clean('mako')
+# If set, the directory that the compile_mako_templates command compiles all
+# the templates into ahead of time, so that they're loaded from there rather
+# than compiled by each process
+MAKO_PRECOMPILED_DIR = None
 MAKO_TEMPLATES = {}
 MAKO_TEMPLATES['main'] = [PROJECT_ROOT / 'templates',
                           COMMON_ROOT / 'templates',
@@ -250,6 +275,13 @@ DEV_CONTENT = True
 TRACK_MAX_EVENT = 10000
 DEBUG_TRACK_LOG = False
 
+# With MITX_FEATURES['ENABLE_ASYNC_TRACKING_LOGS'], the number of tracking events that can be
+# waiting to be written, the number written together, and the seconds a request waits
+# to queue an event when the queue is full before dropping it
+TRACK_QUEUE_SIZE = 10000
+TRACK_QUEUE_BATCH_SIZE = 100
+TRACK_QUEUE_TIMEOUT = 0.1
+
 MITX_ROOT_URL = ''
 
 LOGIN_REDIRECT_URL = MITX_ROOT_URL + '/accounts/login'
@@ -356,6 +388,21 @@ STATIC_URL = '/static/'
 ADMIN_MEDIA_PREFIX = '/static/admin/'
 STATIC_ROOT = ENV_ROOT / "staticfiles"
 
+# Cache-Control header sent with course assets (/c4x/...) served by
+# contentserver.middleware.StaticContentServer, e.g. 'public, max-age=3600'.
+# Assets also get an ETag and Last-Modified header, so clients can revalidate cheaply.
+STATIC_CONTENT_CACHE_CONTROL = None
+
+# Optional node-local disk cache for course assets that are too large for
+# memcache; see contentserver.disk_cache.  For example:
+# {
+#     'ROOT': '/var/cache/edx/static_content',
+#     'MAX_SIZE': 10 * 1024 * 1024 * 1024,
+#     'SENDFILE_HEADER': 'X-Accel-Redirect',
+#     'SENDFILE_URL_PREFIX': '/static_content_cache/',
+# }
+STATIC_CONTENT_DISK_CACHE = None
+
 STATICFILES_DIRS = [
     COMMON_ROOT / "static",
     PROJECT_ROOT / "static",
@@ -679,6 +726,39 @@ CELERY_QUEUES = {
     DEFAULT_PRIORITY_QUEUE: {}
 }
 
+############################## Instructor Tasks ################################
+
+# Instructor tasks that update the problem state of more students than this
+# are split into subtasks of this many students, which run in parallel.
+# Set to None to run each task as a single task.
+INSTRUCTOR_TASK_SUBTASK_SIZE = 1000
+
+# Instructor tasks write their progress to the result store after this many
+# students, or after this many seconds, whichever comes first
+INSTRUCTOR_TASK_PROGRESS_MODULES = 100
+INSTRUCTOR_TASK_PROGRESS_SECONDS = 5
+
+# Rescoring tasks save the rescored students' problem state in transactions of
+# this many students
+INSTRUCTOR_TASK_RESCORE_BATCH_SIZE = 100
+
+# Grade reports are written to this storage, grading this many students at a time.
+# The reports hold the names and emails of students, so the storage must not be
+# public: the reports are only served through the instructor dashboard.
+GRADE_REPORT_STORAGE = {
+    'STORAGE_CLASS': 'django.core.files.storage.FileSystemStorage',
+    'STORAGE_KWARGS': {'location': ENV_ROOT / "grade_reports"},
+}
+GRADE_REPORT_CHUNK_SIZE = 100
+# The number of most recent grade reports of a course listed on the instructor
+# dashboard.  The files of older reports are deleted.
+GRADE_REPORTS_LISTED = 5
+
+# The number of students on each page of the gradebook, and the age in seconds of
+# the latest grade report after which the gradebook grades students itself instead
+GRADEBOOK_PAGE_SIZE = 100
+GRADEBOOK_MAX_REPORT_AGE = 24 * 60 * 60
+
 ################################### APPS ######################################
 INSTALLED_APPS = (
     # Standard ones that are always installed...
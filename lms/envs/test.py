@@ -160,6 +160,10 @@ DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
 MEDIA_ROOT = TEST_ROOT / "uploads"
 MEDIA_URL = "/static/uploads/"
 STATICFILES_DIRS.append(("uploads", MEDIA_ROOT))
+GRADE_REPORT_STORAGE = {
+    'STORAGE_CLASS': 'django.core.files.storage.FileSystemStorage',
+    'STORAGE_KWARGS': {'location': TEST_ROOT / "grade_reports"},
+}
 
 new_staticfiles_dirs = []
 # Strip out any static files that aren't in the repository root
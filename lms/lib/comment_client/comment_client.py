@@ -5,7 +5,7 @@ from .thread import Thread
 from .user import User
 from .commentable import Commentable
 
-from .utils import perform_request
+from .utils import perform_request, perform_requests
 
 import settings
 
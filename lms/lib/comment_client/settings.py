@@ -11,3 +11,15 @@ if hasattr(settings, "COMMENTS_SERVICE_KEY"):
     API_KEY = settings.COMMENTS_SERVICE_KEY
 else:
     API_KEY = "PUT_YOUR_API_KEY_HERE"
+
+# The number of connections to the comments service kept alive by each process
+if hasattr(settings, "COMMENTS_SERVICE_CONNECTION_POOL_SIZE"):
+    CONNECTION_POOL_SIZE = settings.COMMENTS_SERVICE_CONNECTION_POOL_SIZE
+else:
+    CONNECTION_POOL_SIZE = 10
+
+# The number of requests that utils.perform_requests makes at the same time
+if hasattr(settings, "COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS"):
+    MAX_CONCURRENT_REQUESTS = settings.COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS
+else:
+    MAX_CONCURRENT_REQUESTS = 4
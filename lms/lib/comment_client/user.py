@@ -79,7 +79,7 @@ class User(models.Model):
         url = self.url(action='get', params=self.attributes)
         retrieve_params = self.default_retrieve_params
         if self.attributes.get('course_id'):
-            retrieve_params['course_id'] = self.course_id
+            retrieve_params = merge_dict(retrieve_params, {'course_id': self.course_id})
         response = perform_request('get', url, retrieve_params)
         self.update_attributes(**response)
 
@@ -1,8 +1,10 @@
 from dogapi import dog_stats_api
 import json
 import logging
+from multiprocessing.pool import ThreadPool
 import requests
 import settings
+import threading
 
 log = logging.getLogger(__name__)
 
@@ -28,16 +30,78 @@ def merge_dict(dic1, dic2):
     return dict(dic1.items() + dic2.items())
 
 
+# The segments of the paths of the comments service API that aren't ids,
+# used to tag the request timings by endpoint
+ENDPOINT_NAMES = frozenset([
+    'abuse_flag', 'abuse_unflag', 'active_threads', 'autocomplete', 'commentables',
+    'comments', 'more_like_this', 'pin', 'recent_active', 'search', 'subscribed_threads',
+    'subscriptions', 'tags', 'threads', 'trending', 'unpin', 'users', 'votes',
+])
+
+_session = None
+_thread_pool = None
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def _get_session():
+    """
+    The requests session shared by all the requests to the comments service.
+    It keeps connections to the service alive, so that each request doesn't
+    have to open a new one.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = requests.session(config={
+                    'keep_alive': True,
+                    'pool_connections': settings.CONNECTION_POOL_SIZE,
+                    'pool_maxsize': settings.CONNECTION_POOL_SIZE,
+                    'store_cookies': False,
+                })
+    return _session
+
+
+def _get_thread_pool():
+    """
+    The pool of threads that perform_requests runs functions on.  It is
+    created when it is first needed, so that it isn't shared by forked processes.
+    """
+    global _thread_pool
+    if _thread_pool is None:
+        with _lock:
+            if _thread_pool is None:
+                _thread_pool = ThreadPool(settings.MAX_CONCURRENT_REQUESTS)
+    return _thread_pool
+
+
+def endpoint_tags(method, url):
+    """
+    Returns the tags for the timing of a request, which identify the endpoint
+    but not the ids in its url, e.g. ['method:get', 'endpoint:/threads/:id/comments']
+    """
+    if url.startswith(settings.PREFIX):
+        path = url[len(settings.PREFIX):]
+    else:
+        path = url
+    segments = [
+        segment if segment in ENDPOINT_NAMES else ':id'
+        for segment in path.strip('/').split('/')
+    ]
+    return ['method:{0}'.format(method), 'endpoint:/{0}'.format('/'.join(segments))]
+
+
 def perform_request(method, url, data_or_params=None, *args, **kwargs):
-    if data_or_params is None:
-        data_or_params = {}
+    # copied, because the params are often a class attribute of a model
+    data_or_params = dict(data_or_params or {})
     data_or_params['api_key'] = settings.API_KEY
     try:
-        with dog_stats_api.timer('comment_client.request.time'):
+        with dog_stats_api.timer('comment_client.request.time', tags=endpoint_tags(method, url)):
             if method in ['post', 'put', 'patch']:
-                response = requests.request(method, url, data=data_or_params, timeout=5)
+                response = _get_session().request(method, url, data=data_or_params, timeout=5)
             else:
-                response = requests.request(method, url, params=data_or_params, timeout=5)
+                response = _get_session().request(method, url, params=data_or_params, timeout=5)
     except Exception as err:
         # remove API key if it is in the params
         if 'api_key' in data_or_params:
@@ -62,6 +126,37 @@ def perform_request(method, url, data_or_params=None, *args, **kwargs):
             return json.loads(response.text)
 
 
+def _call_in_pool(function):
+    """
+    Calls `function` on a thread of the pool, marking the thread so that
+    perform_requests doesn't wait on the pool from inside it
+    """
+    _local.in_pool = True
+    return function()
+
+
+def perform_requests(functions):
+    """
+    Calls each of `functions`, which take no arguments and make independent
+    requests to the comments service (e.g. `thread.retrieve`, or
+    `functools.partial(perform_request, 'get', url, params)`), at the same
+    time, and returns their results in order.
+
+    All of them are finished before this returns or raises; if any of them
+    raised an exception, the exception of the first one is raised.
+
+    The functions run on other threads, so they shouldn't use the database.
+    """
+    if len(functions) < 2 or settings.MAX_CONCURRENT_REQUESTS < 2 or getattr(_local, 'in_pool', False):
+        return [function() for function in functions]
+
+    pool = _get_thread_pool()
+    results = [pool.apply_async(_call_in_pool, (function,)) for function in functions]
+    for result in results:
+        result.wait()
+    return [result.get() for result in results]
+
+
 class CommentClientError(Exception):
     def __init__(self, msg):
         self.message = msg